@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+from fastapi import APIRouter
+
+from app.schemas.cache_schema import CacheStatsResponse
+from app.services.cache_service import get_response_cache
+
+router = APIRouter(prefix="/cache", tags=["cache"])
+
+
+@router.get("/stats", response_model=CacheStatsResponse)
+async def cache_stats() -> CacheStatsResponse:
+    return get_response_cache().stats()
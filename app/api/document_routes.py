@@ -2,15 +2,19 @@ from __future__ import annotations
 
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models.document import Document
 from app.db.session import get_db_session
 from app.schemas.document_schema import DocumentOut, DocumentsResponse
+from app.services.cache_service import cache_key, get_response_cache, patient_tag
+from app.services.page_lifecycle_service import get_page_lifecycle_service
+from app.services.replica_service import patient_tags, read_session
 
 router = APIRouter(prefix="/documents", tags=["documents"])
+response_cache = get_response_cache()
 
 
 @router.get("", response_model=DocumentsResponse)
@@ -19,8 +23,15 @@ async def list_documents(
     hospital_id: str = Query(...),
     doc_type: Optional[str] = Query(None),
     status_filter: Optional[str] = Query(None, alias="status"),
-    session: AsyncSession = Depends(get_db_session),
-) -> DocumentsResponse:
+    session: AsyncSession = Depends(read_session(patient_tags)),
+) -> Response:
+    key = cache_key("documents", hospital_id, patient_id, doc_type, status_filter)
+    cached = await response_cache.get(key)
+    if cached:
+        return cached.response()
+    tags = [patient_tag(hospital_id, patient_id)]
+    marker = response_cache.marker(tags)
+
     stmt = select(Document).where(Document.patient_id == patient_id, Document.hospital_id == hospital_id)
     if doc_type:
         stmt = stmt.where(Document.doc_type == doc_type)
@@ -28,5 +39,15 @@ async def list_documents(
         stmt = stmt.where(Document.status == status_filter)
 
     documents = (await session.scalars(stmt)).all()
-    return DocumentsResponse(documents=[DocumentOut.model_validate(doc, from_attributes=True) for doc in documents])
-
+    response = DocumentsResponse(documents=[DocumentOut.model_validate(doc, from_attributes=True) for doc in documents])
+    return (await response_cache.put(key, response, tags, marker)).response()
+
+
+@router.post("/{document_id}/rehydrate")
+async def rehydrate_document(document_id: str, session: AsyncSession = Depends(get_db_session)) -> dict:
+    """Restore the page images of a compacted document before it is reprocessed."""
+    document = await session.get(Document, document_id)
+    if not document:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
+    restored = await get_page_lifecycle_service().rehydrate(session, document)
+    return {"documentId": document_id, "pagesRestored": restored}
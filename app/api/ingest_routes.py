@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import get_settings
+from app.db.models.ingest_batch import IngestBatch
+from app.db.session import get_db_session
+from app.pipeline.base import INGEST_STAGE, StageCall
+from app.pipeline.executors import get_executor
+from app.schemas.ingest_schema import IngestBatchResponse, IngestJobOut, IngestJobsResponse
+from app.services.ingest_service import IngestError, get_ingest_service
+
+router = APIRouter(prefix="/ingest", tags=["ingest"])
+ingest_service = get_ingest_service()
+
+
+@router.post("", response_model=IngestBatchResponse, status_code=status.HTTP_202_ACCEPTED)
+async def ingest_archive(
+    archive: UploadFile = File(...),
+    manifest: UploadFile | None = File(None),
+    priority: int = Query(get_settings().bulk_ingest_priority, ge=0, le=9),
+    auto_start: bool = True,
+    session: AsyncSession = Depends(get_db_session),
+) -> IngestBatchResponse:
+    """Accept a ZIP of documents plus a CSV manifest (``file,patient_id,hospital_id,doc_type``).
+
+    The manifest is either uploaded separately or stored as ``manifest.csv`` in the archive.
+    """
+    try:
+        batch = await ingest_service.create_batch(session, archive, manifest, priority, auto_start)
+    except IngestError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    await get_executor().submit([StageCall(INGEST_STAGE, batch.batch_id, priority=batch.priority)])
+    return _batch_response(batch)
+
+
+@router.get("/{batch_id}", response_model=IngestBatchResponse)
+async def get_ingest_batch(batch_id: str, session: AsyncSession = Depends(get_db_session)) -> IngestBatchResponse:
+    batch = await session.get(IngestBatch, batch_id)
+    if not batch:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ingest batch not found")
+    return _batch_response(batch)
+
+
+@router.get("/{batch_id}/jobs", response_model=IngestJobsResponse)
+async def list_ingest_jobs(
+    batch_id: str,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    session: AsyncSession = Depends(get_db_session),
+) -> IngestJobsResponse:
+    if not await session.get(IngestBatch, batch_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ingest batch not found")
+    total, jobs = await ingest_service.jobs(session, batch_id, limit, offset)
+    return IngestJobsResponse(
+        batch_id=batch_id,
+        total=total,
+        jobs=[IngestJobOut(job_id=job.job_id, status=job.status, documents=documents) for job, documents in jobs],
+    )
+
+
+def _batch_response(batch: IngestBatch) -> IngestBatchResponse:
+    response = IngestBatchResponse.model_validate(batch)
+    if batch.rows_total:
+        response.progress = f"{batch.rows_done / batch.rows_total * 100:.1f}%"
+    return response
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.profiling_service import get_profiling_service
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_OBJECT_HEADER = b"x-profile-object"
+
+
+class ProfilingMiddleware:
+    """Profiles a single request when it carries ``X-Profile: cprofile|sample``.
+
+    Plain ASGI rather than ``BaseHTTPMiddleware`` so requests without the header pass straight
+    through. The profile is stored under the ``job_id`` path parameter when the route has one,
+    and its object path is returned in ``X-Profile-Object``.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        mode = next((value.decode("latin-1") for name, value in scope["headers"] if name == PROFILE_HEADER), None)
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        service = get_profiling_service()
+        label = f"{scope['method']}-{scope['path'].strip('/').replace('/', '_') or 'root'}"
+        run = service.start(mode.strip().lower(), label)
+        if run is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_profile(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Routing has filled in the path parameters by the time the response starts.
+                run.job_id = scope.get("path_params", {}).get("job_id")
+                headers = list(message.get("headers", []))
+                headers.append((PROFILE_OBJECT_HEADER, service.path(run.job_id, run.name).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            await service.finish(run)
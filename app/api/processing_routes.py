@@ -1,25 +1,82 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.db.models.job import DEFAULT_PRIORITY, Job
 from app.db.session import get_db_session
-from app.schemas.process_schema import ProcessRequest
-from app.services.processing_service import get_processing_service
+from app.schemas.process_schema import ProcessRequest, ProfileListResponse, ProfileOut, QueueStatsResponse
+from app.pipeline.executors import get_executor
+from app.services.processing_service import JobStateError, get_processing_service
+from app.services.profiling_service import get_profiling_service
 
 router = APIRouter(prefix="/process", tags=["processing"])
 processing_service = get_processing_service()
 
 
+@router.get("/queues", response_model=QueueStatsResponse)
+async def queue_stats() -> QueueStatsResponse:
+    return await get_executor().queue_stats()
+
+
 @router.post("/{job_id}", status_code=status.HTTP_202_ACCEPTED)
 async def process_job(
     job_id: str,
-    _: ProcessRequest | None = None,
+    request: ProcessRequest | None = None,
     session: AsyncSession = Depends(get_db_session),
 ) -> dict:
+    priority = request.priority if request and request.priority is not None else DEFAULT_PRIORITY
+    profile = request.profile if request else None
+    callback_url = str(request.callback_url) if request and request.callback_url else None
+    try:
+        await processing_service.start_job(
+            session, job_id, priority=priority, profile=profile, callback_url=callback_url
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+    except JobStateError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from exc
+    return {
+        "jobId": job_id,
+        "message": "Processing started",
+        "priority": priority,
+        "profile": profile,
+        "callbackUrl": callback_url,
+    }
+
+
+@router.post("/{job_id}/cancel", status_code=status.HTTP_202_ACCEPTED)
+async def cancel_job(job_id: str, session: AsyncSession = Depends(get_db_session)) -> dict:
     try:
-        await processing_service.start_job(session, job_id)
+        revoked = await processing_service.cancel_job(session, job_id)
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
-    return {"jobId": job_id, "message": "Processing started"}
+    except JobStateError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from exc
+    return {"jobId": job_id, "message": "Cancellation requested", "revokedTasks": revoked}
+
+
+@router.get("/{job_id}/profiles", response_model=ProfileListResponse)
+async def list_profiles(job_id: str, session: AsyncSession = Depends(get_db_session)) -> ProfileListResponse:
+    if not await session.get(Job, job_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    profiles = await get_profiling_service().list_profiles(job_id)
+    return ProfileListResponse(
+        job_id=job_id,
+        profiles=[ProfileOut(name=p.name, size=p.size, last_modified=p.last_modified) for p in profiles],
+    )
 
+
+@router.get("/{job_id}/profiles/{name}")
+async def download_profile(job_id: str, name: str) -> Response:
+    try:
+        data = await get_profiling_service().fetch(job_id, name)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    except Exception as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found") from exc
+    return Response(
+        content=data,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{name}"'},
+    )
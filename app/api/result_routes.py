@@ -1,56 +1,76 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+import gzip
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models.document import Document
-from app.db.models.document_page import DocumentPage
-from app.db.models.job import Job
-from app.db.models.ocr_raw_text import OcrRawText
-from app.db.models.ocr_spellchecked_text import OcrSpellcheckedText
-from app.db.models.ocr_deidentified_text import OcrDeidentifiedText
-from app.db.session import get_db_session
+from app.db.models.job import Job, JobStatusEnum
+from app.db.session import AsyncSessionLocal
 from app.schemas.result_schema import ResultResponse
+from app.services.cache_service import CacheEntry, cache_key, get_response_cache, job_tag
+from app.services.replica_service import job_tags, read_session
+from app.services.result_service import get_result_service
 
 router = APIRouter(prefix="/result", tags=["result"])
+result_service = get_result_service()
+response_cache = get_response_cache()
 
 
 @router.get("/{job_id}", response_model=ResultResponse)
-async def job_result(job_id: str, session: AsyncSession = Depends(get_db_session)) -> ResultResponse:
+async def job_result(
+    job_id: str,
+    request: Request,
+    session: AsyncSession = Depends(read_session(job_tags)),
+) -> ResultResponse | Response:
+    key = cache_key("result", job_id)
+    cached = await response_cache.get(key)
+    if cached:
+        return _respond(cached, request)
+    tags = [job_tag(job_id)]
+    marker = response_cache.marker(tags)
+
     job = await session.get(Job, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    documents = (await session.scalars(select(Document).where(Document.job_id == job_id))).all()
-    document_payload: list[dict] = []
-    for doc in documents:
-        pages = (
-            await session.scalars(select(DocumentPage).where(DocumentPage.document_id == doc.document_id).order_by(DocumentPage.page_number))
-        ).all()
-        extraction_entries = []
-        for page in pages:
-            raw = await session.scalar(select(OcrRawText).where(OcrRawText.page_id == page.page_id))
-            spellchecked = await session.scalar(
-                select(OcrSpellcheckedText).where(OcrSpellcheckedText.page_id == page.page_id)
-            )
-            deid = await session.scalar(select(OcrDeidentifiedText).where(OcrDeidentifiedText.page_id == page.page_id))
-            image_path = f"{doc.file_path}/page_{page.page_number}.png"
-            extraction_entries.append(
-                {
-                    "image_path": image_path,
-                    "extracted_text": raw.raw_text if raw else "",
-                    "spellchecked_text": spellchecked.spellchecked_text if spellchecked else "",
-                    "deid_text": deid.deid_text if deid else "",
-                }
-            )
-        document_payload.append(
-            {
-                "doc_id": doc.document_id,
-                "original_file_path": doc.original_file_path,
-                "extraction": extraction_entries,
-            }
-        )
-
-    return ResultResponse(job_id=job.job_id, status=job.status, document=document_payload)
+    if job.status != JobStatusEnum.COMPLETED.value:
+        result = await result_service.build(session, job)
+        return _respond(await response_cache.put(key, result, tags, marker), request)
+
+    # Completed results never change: serve the stored snapshot and let clients revalidate by ETag.
+    if job.result_etag and _etag_matches(request.headers.get("if-none-match"), job.result_etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": f'"{job.result_etag}"'})
+
+    snapshot = await result_service.read_snapshot(job)
+    if snapshot is None:
+        # Jobs completed before snapshots existed, or whose snapshot was lost, get one now.
+        result = await result_service.build(session, job)
+        async with AsyncSessionLocal() as primary:
+            await result_service.write_snapshot(primary, job, result)
+            await primary.commit()
+        marker = response_cache.marker(tags)
+        snapshot = gzip.compress(result.model_dump_json().encode("utf-8"))
+
+    entry = await response_cache.put(key, snapshot, tags, marker, gzipped=True, etag=job.result_etag)
+    return _respond(entry, request)
+
+
+def _respond(entry: CacheEntry, request: Request) -> Response:
+    if not entry.etag:
+        return entry.response()
+    if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": f'"{entry.etag}"'})
+
+    headers = {"ETag": f'"{entry.etag}"', "Vary": "Accept-Encoding"}
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+    return Response(content=gzip.decompress(entry.body), media_type="application/json", headers=headers)
+
 
+def _etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    candidates = {value.strip().removeprefix("W/").strip('"') for value in header.split(",")}
+    return "*" in candidates or etag in candidates
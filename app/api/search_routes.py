@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas.search_schema import SearchResponse
+from app.schemas.upload_schema import DocTypeEnum
+from app.services.replica_service import patient_tags, read_session
+from app.services.search_service import SearchFilters, get_search_service
+
+router = APIRouter(prefix="/search", tags=["search"])
+search_service = get_search_service()
+
+
+@router.get("", response_model=SearchResponse)
+async def search_documents(
+    q: str = Query(..., min_length=1),
+    hospital_id: str = Query(...),
+    patient_id: Optional[str] = Query(None),
+    doc_type: Optional[DocTypeEnum] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    session: AsyncSession = Depends(read_session(patient_tags)),
+) -> SearchResponse:
+    filters = SearchFilters(
+        hospital_id=hospital_id,
+        patient_id=patient_id,
+        doc_type=doc_type.value if doc_type else None,
+    )
+    total, hits = await search_service.search(session, q, filters, limit=limit, offset=offset)
+    return SearchResponse(query=q, total=total, limit=limit, offset=offset, results=hits)
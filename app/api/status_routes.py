@@ -1,115 +1,212 @@
 from __future__ import annotations
 
-from __future__ import annotations
-
+import asyncio
 from pathlib import Path
-from typing import List
+from typing import AsyncIterator, List
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config.settings import get_settings
 from app.db.models.document import Document
-from app.db.models.document_page import DocumentPage
+from app.db.models.document_page import DocumentPage, PageSkipEnum
 from app.db.models.job import Job, JobStatusEnum
-from app.db.models.ocr_deidentified_text import OcrDeidentifiedText
-from app.db.models.ocr_raw_text import OcrRawText
-from app.db.models.ocr_spellchecked_text import OcrSpellcheckedText
-from app.db.session import get_db_session
-from app.schemas.process_schema import FileStageStatus, StatusResponse
-from app.services.pipeline_service import get_pipeline_service
+from app.db.session import AsyncSessionLocal
+from app.schemas.process_schema import FileStageStatus, StatusResponse, TimelineResponse
+from app.services.cache_service import cache_key, get_response_cache, job_tag
+from app.services.processing_service import TERMINAL_JOB_STATUSES, get_processing_service
+from app.services.progress_feed_service import DocumentProgress, JobProgress, get_progress_feed
+from app.services.replica_service import get_replica_router, job_tags, read_session
+from app.services.stage_timing_service import get_stage_timing_service
 
 router = APIRouter(prefix="/status", tags=["status"])
-pipeline_service = get_pipeline_service()
+processing_service = get_processing_service()
+response_cache = get_response_cache()
+progress_feed = get_progress_feed()
 
 
 @router.get("/{job_id}", response_model=StatusResponse)
-async def job_status(job_id: str, session: AsyncSession = Depends(get_db_session)) -> StatusResponse:
+async def job_status(job_id: str, session: AsyncSession = Depends(read_session(job_tags))) -> StatusResponse | Response:
+    key = cache_key("status", job_id)
+    cached = await response_cache.get(key)
+    if cached:
+        return cached.response()
+    tags = [job_tag(job_id)]
+    marker = response_cache.marker(tags)
+
+    # Jobs the progress feed follows are answered without touching the database.
+    progress = progress_feed.get(job_id)
+    if progress is None:
+        job = await session.get(Job, job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        if job.status == JobStatusEnum.PENDING.value:
+            # Not cached: polling a pending job is what starts it.
+            await _start_pending(job)
+            return _build_status(JobProgress(job.job_id, job.status))
+        progress = await _track_progress(session, job)
+
+    response = _build_status(progress)
+    return (await response_cache.put(key, response, tags, marker)).response()
+
+
+@router.get("/{job_id}/events")
+async def job_events(
+    job_id: str,
+    request: Request,
+    session: AsyncSession = Depends(read_session(job_tags)),
+) -> StreamingResponse:
+    """Server-sent ``status`` events carrying the job's status each time its progress changes, until it ends."""
     job = await session.get(Job, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
-
     if job.status == JobStatusEnum.PENDING.value:
-        await pipeline_service.ensure_started(job.job_id)
+        await _start_pending(job)
+    heartbeat = get_settings().progress_stream_heartbeat_seconds
+
+    async def stream() -> AsyncIterator[str]:
+        last = None
+        with progress_feed.subscribe(job_id) as changed:
+            while not await request.is_disconnected():
+                changed.clear()
+                progress = await _current_progress(job_id)
+                if progress is None:
+                    break
+                body = _build_status(progress).model_dump_json()
+                if body != last:
+                    yield f"event: status\ndata: {body}\n\n"
+                    last = body
+                if progress.status in TERMINAL_JOB_STATUSES:
+                    break
+                try:
+                    await asyncio.wait_for(changed.wait(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@router.get("/{job_id}/timeline", response_model=TimelineResponse)
+async def job_timeline(job_id: str, session: AsyncSession = Depends(read_session(job_tags))) -> TimelineResponse:
+    """Queue wait and run time per stage, and the critical path of the job's slowest page."""
+    if not await session.get(Job, job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return await get_stage_timing_service().timeline(session, job_id)
+
+
+async def _start_pending(job: Job) -> None:
+    # The read session may be a replica.
+    async with AsyncSessionLocal() as primary:
+        await processing_service.start_job(primary, job.job_id, priority=job.priority, only_if_pending=True)
+
+
+async def _current_progress(job_id: str) -> JobProgress | None:
+    progress = progress_feed.get(job_id)
+    if progress is not None:
+        return progress
+    sessionmaker = await get_replica_router().sessionmaker_for([job_tag(job_id)])
+    async with sessionmaker() as session:
+        job = await session.get(Job, job_id)
+        if not job:
+            return None
+        if job.status == JobStatusEnum.PENDING.value:
+            return JobProgress(job.job_id, job.status)
+        return await _track_progress(session, job)
+
+
+async def _track_progress(session: AsyncSession, job: Job) -> JobProgress:
+    """Load the job's progress and hand it to the progress feed to keep current."""
+    progress_feed.begin(job.job_id)
+    progress = await _load_progress(session, job)
+    progress_feed.seed(progress)
+    return progress
+
+
+async def _load_progress(session: AsyncSession, job: Job) -> JobProgress:
+    documents = (await session.scalars(select(Document).where(Document.job_id == job.job_id))).all()
+    skipped = await _skipped_pages(session, job.job_id)
+    progress = JobProgress(job.job_id, job.status)
+    for doc in documents:
+        progress.documents[doc.document_id] = DocumentProgress(
+            document_id=doc.document_id,
+            file=Path(doc.original_file_path).name if doc.original_file_path else doc.document_id,
+            pages_total=doc.pages_total,
+            pages_ocr_done=doc.pages_ocr_done,
+            pages_spellchecked=doc.pages_spellchecked,
+            pages_done=doc.pages_done,
+            pages_blank=skipped.get((doc.document_id, PageSkipEnum.BLANK.value), 0),
+            pages_duplicate=skipped.get((doc.document_id, PageSkipEnum.DUPLICATE.value), 0),
+        )
+    return progress
+
+
+def _build_status(progress: JobProgress) -> StatusResponse:
+    if progress.status == JobStatusEnum.PENDING.value:
         return StatusResponse(
-            job_id=job.job_id,
+            job_id=progress.job_id,
             status="Starting",
             message="Initializing processing...",
         )
 
-    if job.status == JobStatusEnum.PROCESSING.value:
-        await pipeline_service.ensure_started(job.job_id)
-
-    files, progress = await _gather_progress(session, job.job_id)
-
-    status_label = _format_status(job.status)
-    if job.status == JobStatusEnum.PROCESSING.value:
+    files, overall = _gather_progress(progress)
+    status_label = _format_status(progress.status)
+    if progress.status == JobStatusEnum.PROCESSING.value:
         return StatusResponse(
-            job_id=job.job_id,
+            job_id=progress.job_id,
             status=status_label,
-            overall_progress=f"{progress:.0f}%",
+            overall_progress=f"{overall:.0f}%",
             files=files,
         )
 
-    if job.status == JobStatusEnum.COMPLETED.value:
+    if progress.status == JobStatusEnum.COMPLETED.value:
         return StatusResponse(
-            job_id=job.job_id,
+            job_id=progress.job_id,
             status=status_label,
             overall_progress="100%",
             files=files,
             message="Process Completed",
         )
 
+    if progress.status == JobStatusEnum.CANCELLED.value:
+        return StatusResponse(
+            job_id=progress.job_id,
+            status=status_label,
+            overall_progress=f"{overall:.0f}%",
+            files=files,
+            message="Processing cancelled",
+        )
+
     return StatusResponse(
-        job_id=job.job_id,
-        status=status_label if job.status != JobStatusEnum.FAILED.value else "Failed",
+        job_id=progress.job_id,
+        status=status_label if progress.status != JobStatusEnum.FAILED.value else "Failed",
         message="Processing failed. Please retry the job.",
         files=files,
     )
 
 
-async def _gather_progress(session: AsyncSession, job_id: str) -> tuple[List[FileStageStatus], float]:
-    documents = (await session.scalars(select(Document).where(Document.job_id == job_id))).all()
-    total_stage_slots = max(len(documents) * 3, 1)
+def _gather_progress(progress: JobProgress) -> tuple[List[FileStageStatus], float]:
+    total_stage_slots = max(len(progress.documents) * 3, 1)
     completed_slots = 0
     files: List[FileStageStatus] = []
 
-    for doc in documents:
-        total_pages = await session.scalar(
-            select(func.count()).select_from(DocumentPage).where(DocumentPage.document_id == doc.document_id)
-        ) or 0
-
-        ocr_pages = await session.scalar(
-            select(func.count())
-            .select_from(OcrRawText)
-            .join(DocumentPage, OcrRawText.page_id == DocumentPage.page_id)
-            .where(DocumentPage.document_id == doc.document_id)
-        ) or 0
-        spell_pages = await session.scalar(
-            select(func.count())
-            .select_from(OcrSpellcheckedText)
-            .join(DocumentPage, OcrSpellcheckedText.page_id == DocumentPage.page_id)
-            .where(DocumentPage.document_id == doc.document_id)
-        ) or 0
-        deid_pages = await session.scalar(
-            select(func.count())
-            .select_from(OcrDeidentifiedText)
-            .join(DocumentPage, OcrDeidentifiedText.page_id == DocumentPage.page_id)
-            .where(DocumentPage.document_id == doc.document_id)
-        ) or 0
-
-        ocr_status = _stage_status(total_pages, ocr_pages)
-        spell_status = _stage_status(total_pages, spell_pages)
-        deid_status = _stage_status(total_pages, deid_pages)
+    for doc in progress.documents.values():
+        ocr_status = _stage_status(doc.pages_total, doc.pages_ocr_done)
+        spell_status = _stage_status(doc.pages_total, doc.pages_spellchecked)
+        deid_status = _stage_status(doc.pages_total, doc.pages_done)
 
         completed_slots += sum(status == "completed" for status in (ocr_status, spell_status, deid_status))
 
         files.append(
             FileStageStatus(
-                file=Path(doc.original_file_path).name if doc.original_file_path else doc.document_id,
+                file=doc.file,
                 ocr=ocr_status,
                 spellcheck=spell_status,
                 deid=deid_status,
+                pages_total=doc.pages_total,
+                pages_blank=doc.pages_blank,
+                pages_duplicate=doc.pages_duplicate,
             )
         )
 
@@ -117,6 +214,16 @@ async def _gather_progress(session: AsyncSession, job_id: str) -> tuple[List[Fil
     return files, overall_progress
 
 
+async def _skipped_pages(session: AsyncSession, job_id: str) -> dict[tuple[str, str], int]:
+    rows = await session.execute(
+        select(DocumentPage.document_id, DocumentPage.skip_reason, func.count())
+        .join(Document, DocumentPage.document_id == Document.document_id)
+        .where(Document.job_id == job_id, DocumentPage.skip_reason.is_not(None))
+        .group_by(DocumentPage.document_id, DocumentPage.skip_reason)
+    )
+    return {(document_id, reason): count for document_id, reason, count in rows.tuples()}
+
+
 def _stage_status(total_pages: int, processed_pages: int) -> str:
     if total_pages == 0:
         return "pending"
@@ -134,5 +241,7 @@ def _format_status(status: str) -> str:
         return "Completed"
     if status == JobStatusEnum.FAILED.value:
         return "Failed"
+    if status == JobStatusEnum.CANCELLED.value:
+        return "Cancelled"
     return status.capitalize()
 
@@ -2,11 +2,13 @@ from __future__ import annotations
 
 from typing import List
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile, status
+from pydantic import HttpUrl
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_db_session
 from app.schemas.upload_schema import DocTypeEnum, UploadMetadata, UploadResponse
+from app.services.admission_service import AdmissionRejectedError, get_admission_service
 from app.services.upload_service import get_upload_service
 from app.utils.pdf_to_image import PopplerNotInstalledError
 
@@ -20,15 +22,26 @@ async def upload_documents(
     hospital_id: str,
     doc_type: DocTypeEnum,
     files: List[UploadFile] = File(...),
+    callback_url: HttpUrl | None = Query(None, description="Completion webhook for the job"),
     session: AsyncSession = Depends(get_db_session),
 ) -> UploadResponse:
     metadata = UploadMetadata(patient_id=patient_id, hospital_id=hospital_id, doc_type=doc_type)
+    admission_service = get_admission_service()
     try:
-        job_id = await upload_service.create_job_with_documents(session, files, metadata)
-        return UploadResponse(job_id=job_id)
-    except PopplerNotInstalledError as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
+        admission = await admission_service.admit_upload(hospital_id, files)
+    except AdmissionRejectedError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail, headers=exc.headers) from exc
+    try:
+        job_id = await upload_service.create_job_with_documents(
+            session, files, metadata, callback_url=str(callback_url) if callback_url else None
         )
-
+    except Exception as e:
+        # No job was created, so the upload must not count against the hospital's quota.
+        await admission_service.refund(admission)
+        if isinstance(e, PopplerNotInstalledError):
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=str(e)
+            )
+        raise
+    return UploadResponse(job_id=job_id)
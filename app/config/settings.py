@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
+from typing import Any
 
 
 class Settings(BaseSettings):
@@ -8,6 +9,8 @@ class Settings(BaseSettings):
     api_port: int = 8000
 
     database_url: str
+    # Schema changes ship as Alembic migrations; the API only verifies the revision on boot.
+    db_schema_check_on_startup: bool = True
 
     minio_endpoint: str = "localhost:9000"
     minio_access_key: str = "minioadmin"
@@ -17,6 +20,161 @@ class Settings(BaseSettings):
 
     celery_broker_url: str = "redis://localhost:6379/0"
     celery_result_backend: str = "redis://localhost:6379/1"
+    redis_url: str = "redis://localhost:6379/2"
+
+    # Celery worker pools per resource class (python -m app.workers cpu|io, see app.workers.routing).
+    # None runs one CPU worker process per core.
+    celery_cpu_concurrency: int | None = None
+    celery_cpu_max_tasks_per_child: int = 200
+    celery_io_concurrency: int = 32
+    celery_visibility_timeout_seconds: int = 4 * 3600
+    # Open a connection per session instead of pooling; set by the threaded I/O workers.
+    database_null_pool: bool = False
+
+    # GET /documents, /status, /result and /search read from this replica when set. Reads of a job or
+    # patient written in the last replica_lag_window_seconds go to the primary, and so does every read
+    # while the replica's measured lag exceeds the window. Workers need it too: they record their writes.
+    database_replica_url: str | None = None
+    replica_lag_window_seconds: float = 5.0
+    replica_lag_check_interval_seconds: float = 1.0
+
+    # "celery" for clustered workers, "local" to run the pipeline inside the API process
+    # (process pool for CPU-bound stages, no broker or Redis needed).
+    pipeline_executor: str = "celery"
+    local_executor_processes: int | None = None
+    local_executor_io_concurrency: int = 8
+
+    # Bounded queues between the download, rasterize, encode and persist steps of process_job;
+    # together they cap how many originals and rendered pages a worker holds at once.
+    ingest_download_queue_size: int = 2
+    ingest_raster_queue_size: int = 8
+    ingest_encode_queue_size: int = 8
+    ingest_raster_chunk_pages: int = 4
+    ingest_persist_batch_pages: int = 8
+
+    # Born-digital PDF pages with at least this many characters of embedded text skip OCR.
+    pdf_text_layer_enabled: bool = True
+    pdf_text_layer_min_chars: int = 32
+
+    # Rendered pages with at most this ink coverage are blank. Earlier pages of the same patient within
+    # the hash distance are compared pixel for pixel; only an identical page reuses their texts.
+    page_screening_enabled: bool = True
+    page_blank_max_ink: float = 0.002
+    page_duplicate_max_distance: int = 6
+
+    # Grayscale, border/margin crop, deskew and adaptive threshold before OCR, with per-doc_type
+    # profile overrides, e.g. {"lab_reports": {"scale": 0.8}} (see app/utils/image_preprocess.py).
+    ocr_preprocess_enabled: bool = True
+    ocr_preprocess_workers: int = 2
+    ocr_preprocess_profiles: dict[str, dict[str, Any]] = {}
+
+    scheduler_max_inflight_pages: int = 64
+    scheduler_inflight_timeout_seconds: int = 900
+    scheduler_hospital_weights: dict[str, float] = {}
+    scheduler_wait_samples: int = 1000
+
+    upload_max_files_per_request: int = 50
+    upload_max_bytes_per_request: int = 200 * 1024 * 1024
+    upload_hospital_window_seconds: int = 3600
+    upload_hospital_max_files_per_window: int = 5000
+    upload_hospital_max_bytes_per_window: int = 10 * 1024 * 1024 * 1024
+    admission_max_queue_depth: int = 5000
+    admission_max_pending_pages: int = 20000
+    admission_retry_after_seconds: int = 30
+    admission_backlog_cache_seconds: float = 2.0
+
+    # POST /ingest: archive rows are turned into jobs this many per transaction, with up to
+    # ``bulk_ingest_storage_concurrency`` entries streaming to storage at once. Bulk jobs default
+    # to the low priority class so backfills never delay interactive uploads.
+    bulk_ingest_chunk_rows: int = 200
+    bulk_ingest_storage_concurrency: int = 8
+    bulk_ingest_max_errors: int = 100
+    bulk_ingest_priority: int = 2
+
+    response_cache_enabled: bool = True
+    response_cache_ttl_seconds: int = 30
+    response_cache_max_entries: int = 10000
+    response_cache_max_bytes: int = 64 * 1024 * 1024
+    # Also share entries between API processes through Redis (celery executor only).
+    response_cache_shared: bool = False
+
+    # Progress commits also NOTIFY this channel; the API holds one LISTEN connection and serves
+    # /status from the per-job progress map it keeps (see ProgressFeed). Enable it for the API and
+    # the workers alike. NOTIFY takes a database-wide lock at commit, so very high page rates may
+    # prefer polling.
+    progress_notify_enabled: bool = True
+    progress_notify_channel: str = "pipeline_progress"
+    progress_feed_max_jobs: int = 10000
+    progress_feed_reconnect_seconds: float = 5.0
+    # GET /status/{job_id}/events sends a keepalive (and re-reads the job) after this much silence.
+    progress_stream_heartbeat_seconds: float = 15.0
+
+    # Completion webhooks (callback_url on POST /upload or /process): jobs that complete or fail are
+    # queued in the webhook_deliveries outbox and posted in batches of up to webhook_batch_max_events
+    # per endpoint, with exponential backoff between attempts.
+    webhook_delivery_interval_seconds: float = 5.0
+    webhook_claim_limit: int = 1000
+    # Claimed deliveries of a delivery run that died are retried after this long.
+    webhook_claim_lease_seconds: float = 300.0
+    webhook_batch_max_events: int = 100
+    webhook_delivery_concurrency: int = 8
+    webhook_timeout_seconds: float = 10.0
+    webhook_max_attempts: int = 10
+    webhook_retry_base_seconds: float = 10.0
+    webhook_retry_max_seconds: float = 3600.0
+    # Signs every request body: X-Webhook-Signature: sha256=<HMAC-SHA256 hex digest>.
+    webhook_signing_secret: str | None = None
+
+    cancellation_flag_ttl_seconds: int = 7 * 24 * 3600
+
+    # On-demand profiling: the X-Profile request header or POST /process {"profile": ...}.
+    profiling_enabled: bool = True
+    profiling_sample_interval_ms: float = 5.0
+    profiling_storage_prefix: str = "profiles"
+
+    # ``logs`` is partitioned by day: partitions are created this many days ahead, and days older
+    # than the retention are archived to object storage (zstd CSV) and dropped.
+    log_retention_days: int = 30
+    log_partition_days_ahead: int = 7
+    log_archive_enabled: bool = True
+    log_archive_prefix: str = "log-archive"
+    log_maintenance_interval_seconds: int = 3600
+
+    # Page images leave Postgres once their document is completed: they are written to object
+    # storage under page_archive_prefix and image_base64 is cleared (see PageLifecycleService).
+    # The sweep catches documents the on-completion pass missed.
+    page_compaction_on_complete: bool = True
+    page_compaction_batch_pages: int = 50
+    page_compaction_delay_seconds: int = 600
+    page_compaction_sweep_documents: int = 500
+    page_compaction_interval_seconds: int = 3600
+    page_archive_prefix: str = "page-archive"
+    page_archive_storage_concurrency: int = 8
+    # Longest side of archived images; None keeps them as rendered. A reprocessed page is OCR'd
+    # from its archived copy.
+    page_archive_max_dimension: int | None = None
+    # MinIO tier archived images transition to after page_archive_transition_days; None disables it.
+    page_archive_tier: str | None = None
+    page_archive_transition_days: int = 30
+
+    # Per-call stage timings (GET /status/{job_id}/timeline), written in multi-row inserts.
+    stage_timing_enabled: bool = True
+    stage_timing_batch_size: int = 200
+    stage_timing_flush_seconds: float = 5.0
+    stage_timing_buffer_max: int = 10000
+
+    # Spellcheck and de-identification run in batches grouped across jobs: a batch goes out once it
+    # holds stage_batch_max_pages pages, or stage_batch_max_wait_ms after its first page arrived.
+    stage_batching_enabled: bool = True
+    stage_batch_max_pages: int = 64
+    stage_batch_max_wait_ms: float = 50.0
+
+    resume_stale_after_seconds: int = 1800
+    resume_sweep_interval_seconds: int = 300
+
+    # "plain" stores every stage text in full; "compact" stores raw text zstd-compressed and the
+    # spellchecked/de-identified texts as deltas (see TextStoreService).
+    text_storage_mode: str = "plain"
 
     ocr_provider: str = "tesseract"
     spellcheck_dictionary_path: str | None = None
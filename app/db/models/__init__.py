@@ -5,6 +5,9 @@ from app.db.models.ocr_raw_text import OcrRawText
 from app.db.models.ocr_spellchecked_text import OcrSpellcheckedText
 from app.db.models.ocr_deidentified_text import OcrDeidentifiedText
 from app.db.models.log_entry import LogEntry
+from app.db.models.ingest_batch import IngestBatch
+from app.db.models.stage_timing import StageTiming
+from app.db.models.webhook_delivery import WebhookDelivery
 
 __all__ = [
     "Job",
@@ -14,5 +17,8 @@ __all__ = [
     "OcrSpellcheckedText",
     "OcrDeidentifiedText",
     "LogEntry",
+    "IngestBatch",
+    "StageTiming",
+    "WebhookDelivery",
 ]
 
@@ -5,7 +5,7 @@ import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, ForeignKey, String
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -16,6 +16,7 @@ class DocumentStatusEnum(str, enum.Enum):
     PROCESSING = "processing"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
 
 
 if TYPE_CHECKING:
@@ -25,6 +26,7 @@ if TYPE_CHECKING:
 
 class Document(Base):
     __tablename__ = "documents"
+    __table_args__ = (Index("ix_documents_hospital_patient_doc_type", "hospital_id", "patient_id", "doc_type"),)
 
     document_id: Mapped[str] = mapped_column(
         String(36),
@@ -38,6 +40,11 @@ class Document(Base):
     file_path: Mapped[str] = mapped_column(String(255), nullable=False)
     original_file_path: Mapped[str | None] = mapped_column(String(255), nullable=True)
     status: Mapped[str] = mapped_column(String(20), default=DocumentStatusEnum.UPLOADED.value)
+    # Page counters are only ever changed with UPDATE ... SET x = x + 1 (see ProgressService).
+    pages_total: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    pages_ocr_done: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    pages_spellchecked: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    pages_done: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
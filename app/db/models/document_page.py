@@ -1,15 +1,32 @@
 from __future__ import annotations
 
+import enum
 import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, ForeignKey, Integer, Text, String
+from sqlalchemy import BigInteger, DateTime, Float, ForeignKey, Index, Integer, Text, String, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
 
 
+class PageStageEnum(str, enum.Enum):
+    """Last pipeline stage whose output is committed for the page."""
+
+    RASTERIZED = "rasterized"
+    OCR_DONE = "ocr_done"
+    SPELLCHECKED = "spellchecked"
+    DEIDENTIFIED = "deidentified"
+
+
+class PageSkipEnum(str, enum.Enum):
+    """Why a page was not sent through OCR, spellcheck and de-identification."""
+
+    BLANK = "blank"
+    DUPLICATE = "duplicate"
+
+
 if TYPE_CHECKING:
     from app.db.models.document import Document
     from app.db.models.ocr_raw_text import OcrRawText
@@ -19,6 +36,15 @@ if TYPE_CHECKING:
 
 class DocumentPage(Base):
     __tablename__ = "document_pages"
+    __table_args__ = (
+        Index("ix_document_pages_document_stage", "document_id", "stage"),
+        Index("ix_document_pages_duplicate_of", "duplicate_of", postgresql_where=text("duplicate_of IS NOT NULL")),
+        Index(
+            "ix_document_pages_image_inline",
+            "document_id",
+            postgresql_where=text("image_base64 IS NOT NULL"),
+        ),
+    )
 
     page_id: Mapped[str] = mapped_column(
         String(36),
@@ -28,6 +54,16 @@ class DocumentPage(Base):
     document_id: Mapped[str] = mapped_column(ForeignKey("documents.document_id", ondelete="CASCADE"), nullable=False)
     page_number: Mapped[int] = mapped_column(Integer, nullable=False)
     image_base64: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Object storage copy of the image; set once compaction cleared ``image_base64`` (PageLifecycleService).
+    image_path: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    stage: Mapped[str] = mapped_column(String(20), default=PageStageEnum.RASTERIZED.value, nullable=False)
+    ink_coverage: Mapped[float | None] = mapped_column(Float, nullable=True)
+    phash: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    skip_reason: Mapped[str | None] = mapped_column(String(16), nullable=True)
+    # Earlier page of the same job this one reuses the texts of.
+    duplicate_of: Mapped[str | None] = mapped_column(
+        ForeignKey("document_pages.page_id", ondelete="SET NULL"), nullable=True
+    )
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
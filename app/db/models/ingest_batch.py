@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import enum
+import uuid
+from datetime import datetime
+
+from sqlalchemy import JSON, Boolean, DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+from app.db.models.job import DEFAULT_PRIORITY
+
+
+class IngestBatchStatusEnum(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class IngestBatch(Base):
+    """One bulk archive ingestion: a ZIP of documents plus a CSV manifest."""
+
+    __tablename__ = "ingest_batches"
+
+    batch_id: Mapped[str] = mapped_column(
+        String(36),
+        primary_key=True,
+        default=lambda: str(uuid.uuid4()),
+    )
+    status: Mapped[str] = mapped_column(String(20), default=IngestBatchStatusEnum.PENDING.value, nullable=False)
+    archive_path: Mapped[str] = mapped_column(String(255), nullable=False)
+    # None when the manifest is ``manifest.csv`` inside the archive.
+    manifest_path: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    priority: Mapped[int] = mapped_column(Integer, default=DEFAULT_PRIORITY, nullable=False)
+    auto_start: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    rows_total: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # Manifest rows handled so far, in manifest order; a restarted ingestion continues from here.
+    rows_done: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    documents_ingested: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    documents_failed: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    jobs_created: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # First few row errors ({"row", "file", "error"}) for the progress endpoint.
+    errors: Mapped[list] = mapped_column(JSON, default=list, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
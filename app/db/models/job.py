@@ -6,7 +6,7 @@ from datetime import datetime
 
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, String
+from sqlalchemy import DateTime, ForeignKey, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -17,6 +17,10 @@ class JobStatusEnum(str, enum.Enum):
     PROCESSING = "processing"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+DEFAULT_PRIORITY = 5
 
 
 if TYPE_CHECKING:
@@ -36,6 +40,18 @@ class Job(Base):
         default=JobStatusEnum.PENDING.value,
         nullable=False,
     )
+    priority: Mapped[int] = mapped_column(Integer, default=DEFAULT_PRIORITY, nullable=False)
+    documents_pending: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # Set once the completed job's result snapshot is in object storage (see ResultService).
+    result_etag: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    # Profile mode the current run was started with (see ProfilingService); None when not profiled.
+    profile_mode: Mapped[str | None] = mapped_column(String(16), nullable=True)
+    # Completion webhook: the job's summary is posted here once it is completed or failed (see WebhookService).
+    callback_url: Mapped[str | None] = mapped_column(String(2048), nullable=True)
+    # Bulk ingestion that created the job, if any.
+    batch_id: Mapped[str | None] = mapped_column(
+        ForeignKey("ingest_batches.batch_id", ondelete="SET NULL"), nullable=True, index=True
+    )
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
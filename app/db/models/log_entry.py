@@ -4,8 +4,8 @@ import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, ForeignKey, String, Text
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import DateTime, String, Text
+from sqlalchemy.orm import Mapped, backref, mapped_column, relationship
 
 from app.db.base import Base
 
@@ -16,15 +16,33 @@ if TYPE_CHECKING:
 
 
 class LogEntry(Base):
+    """Pipeline log line.
+
+    Range-partitioned by day on ``created_at`` (see LogRetentionService), so the key includes it
+    and there are no foreign keys: old days are dropped as whole partitions instead of cascades.
+    """
+
     __tablename__ = "logs"
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
 
     log_id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    job_id: Mapped[str | None] = mapped_column(ForeignKey("jobs.job_id", ondelete="CASCADE"), nullable=True)
-    document_id: Mapped[str | None] = mapped_column(ForeignKey("documents.document_id", ondelete="CASCADE"), nullable=True)
+    job_id: Mapped[str | None] = mapped_column(String(36), nullable=True)
+    document_id: Mapped[str | None] = mapped_column(String(36), nullable=True)
     level: Mapped[str] = mapped_column(String(20), nullable=False)
     message: Mapped[str] = mapped_column(Text, nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
-
-    job: Mapped["Job"] = relationship("Job", backref="logs")
-    document: Mapped["Document"] = relationship("Document", backref="logs")
-
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), primary_key=True, default=datetime.utcnow, nullable=False
+    )
+
+    job: Mapped["Job"] = relationship(
+        "Job",
+        primaryjoin="foreign(LogEntry.job_id) == Job.job_id",
+        backref=backref("logs", viewonly=True),
+        viewonly=True,
+    )
+    document: Mapped["Document"] = relationship(
+        "Document",
+        primaryjoin="foreign(LogEntry.document_id) == Document.document_id",
+        backref=backref("logs", viewonly=True),
+        viewonly=True,
+    )
@@ -3,14 +3,18 @@ from __future__ import annotations
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, String, Text
+from sqlalchemy import DateTime, ForeignKey, Index, LargeBinary, String, Text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
 
+SEARCH_CONFIG = "english"
+
 
 class OcrDeidentifiedText(Base):
     __tablename__ = "ocr_deidentified_texts"
+    __table_args__ = (Index("ix_ocr_deidentified_texts_deid_tsv", "deid_tsv", postgresql_using="gin"),)
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     page_id: Mapped[str] = mapped_column(
@@ -18,8 +22,11 @@ class OcrDeidentifiedText(Base):
         unique=True,
         nullable=False,
     )
-    deid_text: Mapped[str] = mapped_column(Text, nullable=False)
+    # Compact mode stores an edit delta against the spellchecked text instead of the full text.
+    deid_text: Mapped[str | None] = mapped_column(Text, nullable=True)
+    deid_delta: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+    # Written by TextStoreService from the decoded text, since deid_text may be empty.
+    deid_tsv: Mapped[str | None] = mapped_column(TSVECTOR, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
 
     page: Mapped["DocumentPage"] = relationship("DocumentPage", back_populates="deidentified_text")
-
@@ -3,7 +3,7 @@ from __future__ import annotations
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, String, Text
+from sqlalchemy import DateTime, ForeignKey, LargeBinary, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -18,7 +18,9 @@ class OcrRawText(Base):
         unique=True,
         nullable=False,
     )
-    raw_text: Mapped[str] = mapped_column(Text, nullable=False)
+    # Exactly one of the two is set, depending on the text storage mode at write time.
+    raw_text: Mapped[str | None] = mapped_column(Text, nullable=True)
+    raw_text_zstd: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
 
     page: Mapped["DocumentPage"] = relationship("DocumentPage", back_populates="raw_text")
@@ -3,7 +3,7 @@ from __future__ import annotations
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, String, Text
+from sqlalchemy import DateTime, ForeignKey, LargeBinary, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -18,7 +18,9 @@ class OcrSpellcheckedText(Base):
         unique=True,
         nullable=False,
     )
-    spellchecked_text: Mapped[str] = mapped_column(Text, nullable=False)
+    # Compact mode stores an edit delta against the page's raw text instead of the full text.
+    spellchecked_text: Mapped[str | None] = mapped_column(Text, nullable=True)
+    spellchecked_delta: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
 
     page: Mapped["DocumentPage"] = relationship("DocumentPage", back_populates="spellchecked_text")
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import enum
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Float, ForeignKey, Index, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class StageOutcomeEnum(str, enum.Enum):
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class StageTiming(Base):
+    """One executed stage call: when it was queued, started and finished, and where the time went.
+
+    Append-only and written in batches (see StageTimingService), so it has a serial key and no
+    foreign key on the page.
+    """
+
+    __tablename__ = "stage_timings"
+    __table_args__ = (Index("ix_stage_timings_job_stage", "job_id", "stage"),)
+
+    timing_id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    job_id: Mapped[str] = mapped_column(ForeignKey("jobs.job_id", ondelete="CASCADE"), nullable=False)
+    # None for job-level stages (process, snapshot).
+    page_id: Mapped[str | None] = mapped_column(String(36), nullable=True)
+    stage: Mapped[str] = mapped_column(String(16), nullable=False)
+    outcome: Mapped[str] = mapped_column(String(16), nullable=False)
+    # hostname:pid of the process that ran the call.
+    worker: Mapped[str] = mapped_column(String(64), nullable=False)
+    enqueued_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    finished_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    # Time inside SQL statements and object storage calls; the rest of the run is compute.
+    db_ms: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    storage_ms: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    bytes_in: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    bytes_out: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
@@ -1,13 +1,30 @@
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine, AsyncSession
+from sqlalchemy.pool import NullPool
 
 from app.config.settings import get_settings
 
 settings = get_settings()
 
+# Threaded workers run each task on its own event loop; asyncpg connections can't move between loops.
+_engine_options = {"poolclass": NullPool} if settings.database_null_pool else {}
+
 engine = create_async_engine(
     settings.database_url,
     echo=settings.app_env == "development",
     future=True,
+    **_engine_options,
+)
+
+# Read-only endpoints use the replica when one is configured (see ReplicaRouter); otherwise the primary.
+read_engine = (
+    create_async_engine(
+        settings.database_replica_url,
+        echo=settings.app_env == "development",
+        future=True,
+        **_engine_options,
+    )
+    if settings.database_replica_url
+    else engine
 )
 
 AsyncSessionLocal = async_sessionmaker(
@@ -17,6 +34,13 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
+ReadSessionLocal = async_sessionmaker(
+    bind=read_engine,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
+
 
 async def get_db_session() -> AsyncSession:
     async with AsyncSessionLocal() as session:
@@ -26,4 +50,3 @@ async def get_db_session() -> AsyncSession:
             # Rollback on exception - commits made before exceptions will persist (commit is atomic)
             await session.rollback()
             raise
-
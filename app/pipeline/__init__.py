@@ -0,0 +1 @@
+"""Pipeline stage definitions and execution backends."""
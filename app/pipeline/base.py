@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from typing import Awaitable, Callable, List
+
+from app.db.models.job import DEFAULT_PRIORITY
+
+PROCESS_STAGE = "process"
+OCR_STAGE = "ocr"
+SPELLCHECK_STAGE = "spellcheck"
+DEID_STAGE = "deid"
+SNAPSHOT_STAGE = "snapshot"
+INGEST_STAGE = "ingest"
+COMPACT_STAGE = "compact"
+
+PAGE_STAGES = (OCR_STAGE, SPELLCHECK_STAGE, DEID_STAGE)
+# Stages keyed by a job (or ingest batch) id rather than a page id.
+JOB_STAGES = (PROCESS_STAGE, SNAPSHOT_STAGE, INGEST_STAGE, COMPACT_STAGE)
+
+
+@dataclass(frozen=True)
+class StageCall:
+    """One unit of pipeline work: run ``stage`` for ``key`` (a job, page or ingest batch id).
+
+    Plain data so it can be sent as Celery kwargs or pickled into a worker process.
+    """
+
+    stage: str
+    key: str
+    job_id: str | None = None
+    hospital_id: str | None = None
+    priority: int = DEFAULT_PRIORITY
+    enqueued_at: float | None = None
+    # Profile mode (see app.utils.profiler) the job was started with; None for no profiling.
+    profile: str | None = None
+
+    @property
+    def task_id(self) -> str:
+        return f"{self.stage}:{self.key}"
+
+    def stamped(self, enqueued_at: float) -> "StageCall":
+        return replace(self, enqueued_at=enqueued_at)
+
+    def next(self, stage: str) -> "StageCall":
+        """Follow-up call for the same key, carrying job, priority and profile mode along."""
+        return replace(self, stage=stage, enqueued_at=None)
+
+
+# Stage handlers hand follow-up work to ``emit`` instead of choosing how it is executed.
+Emit = Callable[[List[StageCall]], Awaitable[None]]
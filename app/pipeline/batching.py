@@ -0,0 +1,92 @@
+"""In-process micro-batching of the batchable stages for the local executor.
+
+Calls wait in a heap per stage, most urgent first. A stage's batch goes out as soon as it holds
+``max_pages`` calls or ``max_wait`` seconds after the oldest waiting call arrived, and at most
+``concurrency`` batches run at once; while all slots are busy, waiting batches keep filling up.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Awaitable, Callable, Dict, List, Set, Tuple
+
+from app.pipeline.base import StageCall
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+RunBatch = Callable[[List[StageCall]], Awaitable[None]]
+
+
+class MicroBatcher:
+    def __init__(self, run: RunBatch, max_pages: int, max_wait: float, concurrency: int) -> None:
+        self.run_batch = run
+        self.max_pages = max(max_pages, 1)
+        self.max_wait = max_wait
+        self._slots = asyncio.Semaphore(max(concurrency, 1))
+        self._waiting: Dict[str, List[Tuple[int, int, float, StageCall]]] = {}
+        self._sequence = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._running: Set[asyncio.Task] = set()
+
+    def add(self, call: StageCall) -> None:
+        heap = self._waiting.setdefault(call.stage, [])
+        heapq.heappush(heap, (-call.priority, next(self._sequence), time.monotonic(), call))
+        if len(heap) == 1 or len(heap) >= self.max_pages:
+            self._wakeup.set()
+
+    def withdraw(self, job_id: str) -> List[StageCall]:
+        withdrawn: List[StageCall] = []
+        for stage, heap in self._waiting.items():
+            withdrawn += [item[3] for item in heap if item[3].job_id == job_id]
+            kept = [item for item in heap if item[3].job_id != job_id]
+            heapq.heapify(kept)
+            self._waiting[stage] = kept
+        return withdrawn
+
+    def waiting(self) -> List[StageCall]:
+        return [item[3] for heap in self._waiting.values() for item in heap]
+
+    async def run(self) -> None:
+        try:
+            while True:
+                self._wakeup.clear()
+                for stage in list(self._waiting):
+                    while self._ready(stage):
+                        heap = self._waiting[stage]
+                        batch = [heapq.heappop(heap)[3] for _ in range(min(len(heap), self.max_pages))]
+                        await self._slots.acquire()
+                        task = asyncio.create_task(self._run(batch))
+                        self._running.add(task)
+                        task.add_done_callback(self._running.discard)
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self._next_deadline())
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for task in self._running:
+                task.cancel()
+
+    def _ready(self, stage: str) -> bool:
+        heap = self._waiting[stage]
+        if not heap:
+            return False
+        oldest = min(item[2] for item in heap)
+        return len(heap) >= self.max_pages or time.monotonic() - oldest >= self.max_wait
+
+    def _next_deadline(self) -> float | None:
+        arrivals = [item[2] for heap in self._waiting.values() for item in heap]
+        if not arrivals:
+            return None
+        return max(min(arrivals) + self.max_wait - time.monotonic(), 0.0)
+
+    async def _run(self, batch: List[StageCall]) -> None:
+        try:
+            await self.run_batch(batch)
+        except Exception:
+            logger.exception("pipeline.batch.failed", stage=batch[0].stage, calls=len(batch))
+        finally:
+            self._slots.release()
@@ -0,0 +1,439 @@
+"""Execution backends for the pipeline.
+
+Both backends run the same stage handlers from ``app.pipeline.stages``; they differ only in
+where a ``StageCall`` executes and how its follow-up calls are queued:
+
+* ``celery`` - every call becomes a Celery task; OCR pages go through the fair scheduler.
+* ``local`` - single-node mode without a broker. CPU-bound stages run in a spawn-based
+  ``ProcessPoolExecutor``, light text stages run on the API event loop, and pending calls wait
+  in in-memory priority queues.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import multiprocessing
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Awaitable, Callable, Dict, List, Sequence, Set, Tuple
+
+from sqlalchemy import select
+
+from app.config.settings import get_settings
+from app.db.models.job import Job, JobStatusEnum
+from app.db.session import AsyncSessionLocal, engine
+from app.pipeline.base import JOB_STAGES, OCR_STAGE, PAGE_STAGES, PROCESS_STAGE, StageCall
+from app.pipeline.batching import MicroBatcher
+from app.pipeline.stages import STAGES, run_stage, run_stage_batch
+from app.schemas.process_schema import QueueStatsResponse
+from app.services.batching_service import get_stage_batching_service
+from app.services.cache_service import get_response_cache
+from app.services.ingest_service import get_ingest_service
+from app.services.log_retention_service import get_log_retention_service
+from app.services.page_lifecycle_service import get_page_lifecycle_service
+from app.services.replica_service import get_replica_router
+from app.services.scheduling_service import PRIORITY_CLASSES, class_stats, get_scheduling_service, priority_class
+from app.services.stage_timing_service import get_stage_timing_service
+from app.services.webhook_service import get_webhook_service
+from app.utils.logger import configure_logging, get_logger
+from app.utils.redis_client import get_broker_client
+from app.workers.routing import QUEUES
+
+logger = get_logger(__name__)
+
+
+class PipelineExecutor(ABC):
+    """Interface shared by the execution backends."""
+
+    name = "base"
+
+    async def start(self) -> None:
+        """Prepare the backend; called once from the API lifespan."""
+
+    async def shutdown(self) -> None:
+        """Release backend resources; called once from the API lifespan."""
+
+    @abstractmethod
+    async def submit(self, calls: List[StageCall]) -> None:
+        """Queue the calls; follow-up calls of running stages come through here too."""
+
+    @abstractmethod
+    async def cancel(self, job_id: str, page_ids: Sequence[str]) -> int:
+        """Stop queued work for the job; returns how many queued calls were withdrawn."""
+
+    @abstractmethod
+    async def backlog(self) -> Tuple[int, int]:
+        """Return ``(queued stage calls, pages waiting for OCR dispatch)``."""
+
+    @abstractmethod
+    async def queue_stats(self) -> QueueStatsResponse:
+        """Pending work and OCR queue waits per priority class."""
+
+
+class CeleryExecutor(PipelineExecutor):
+    name = "celery"
+
+    def __init__(self) -> None:
+        self.settings = get_settings()
+
+    async def submit(self, calls: List[StageCall]) -> None:
+        # Imported on first use so API processes don't pay for Celery at startup.
+        from app.workers.celery_app import celery_app, message_priority
+
+        now = time.time()
+        ocr_pages: Dict[Tuple[str | None, str | None, int, str | None], List[str]] = defaultdict(list)
+        batched: List[StageCall] = []
+        for call in calls:
+            if call.stage == OCR_STAGE:
+                ocr_pages[(call.job_id, call.hospital_id, call.priority, call.profile)].append(call.key)
+                continue
+            if self.settings.stage_batching_enabled and STAGES[call.stage].batch_handler:
+                batched.append(call)
+                continue
+            kwargs = {"priority": call.priority, "enqueued_at": now}
+            if call.stage not in JOB_STAGES:
+                kwargs["job_id"] = call.job_id
+            if call.profile:
+                kwargs["profile"] = call.profile
+            celery_app.send_task(
+                STAGES[call.stage].task_name,
+                args=[call.key],
+                kwargs=kwargs,
+                priority=message_priority(call.priority),
+                task_id=call.task_id,
+            )
+
+        if batched:
+            await get_stage_batching_service().add(batched)
+        if ocr_pages:
+            scheduler = get_scheduling_service()
+            for (job_id, hospital_id, priority, profile), page_ids in ocr_pages.items():
+                await scheduler.enqueue_pages(job_id, hospital_id or "", page_ids, priority=priority, profile=profile)
+            await scheduler.dispatch()
+
+    def run(self, call: StageCall) -> None:
+        """Entry point for the Celery task wrappers."""
+
+        async def _run() -> None:
+            try:
+                await self._run(call)
+            finally:
+                # Each task gets a fresh event loop; pooled connections must not outlive it.
+                await engine.dispose()
+
+        asyncio.run(_run())
+
+    def run_batch(self, calls: List[StageCall]) -> None:
+        """Entry point for the batch task wrappers."""
+
+        async def _run() -> None:
+            try:
+                await run_stage_batch(calls, self.submit)
+            finally:
+                await engine.dispose()
+
+        asyncio.run(_run())
+
+    async def _run(self, call: StageCall) -> None:
+        if call.stage != OCR_STAGE:
+            await run_stage(call, self.submit)
+            return
+
+        scheduler = get_scheduling_service()
+        if call.enqueued_at is not None:
+            await scheduler.record_wait(call.priority, time.time() - call.enqueued_at)
+        try:
+            await run_stage(call, self.submit)
+        finally:
+            await scheduler.release(call.key)
+
+    async def cancel(self, job_id: str, page_ids: Sequence[str]) -> int:
+        from app.workers.celery_app import celery_app
+
+        task_ids = [StageCall(PROCESS_STAGE, job_id).task_id]
+        for page_id in page_ids:
+            task_ids.extend(StageCall(stage, page_id).task_id for stage in PAGE_STAGES)
+        await asyncio.to_thread(celery_app.control.revoke, task_ids)
+        await get_scheduling_service().withdraw(page_ids)
+        return len(task_ids)
+
+    async def waiting(self, calls: List[StageCall]) -> Set[str]:
+        """Keys of ``calls`` the scheduler or the batch queues still hold, which a resume must not send again."""
+        waiting = await get_scheduling_service().tracked([call.key for call in calls if call.stage == OCR_STAGE])
+        batched = {call.stage for call in calls if STAGES[call.stage].batch_handler}
+        if self.settings.stage_batching_enabled and batched:
+            waiting |= await get_stage_batching_service().waiting_keys(sorted(batched))
+        return waiting
+
+    async def backlog(self) -> Tuple[int, int]:
+        queue_depth = await asyncio.to_thread(_broker_queue_depth)
+        pending_pages = await get_scheduling_service().pending_pages()
+        return queue_depth, pending_pages
+
+    async def queue_stats(self) -> QueueStatsResponse:
+        return await get_scheduling_service().stats()
+
+
+def _broker_queue_depth() -> int:
+    client = get_broker_client()
+    if client is None:
+        return 0
+    # The Redis transport keeps one list per queue and priority step: "pipeline.ocr", "pipeline.ocr:1", ...
+    pipe = client.pipeline()
+    for queue in QUEUES:
+        pipe.llen(queue)
+        for step in range(1, 10):
+            pipe.llen(f"{queue}:{step}")
+    return sum(pipe.execute())
+
+
+class LocalExecutor(PipelineExecutor):
+    name = "local"
+
+    def __init__(self) -> None:
+        self.settings = get_settings()
+        self.processes = self.settings.local_executor_processes or os.cpu_count() or 1
+        self.io_concurrency = self.settings.local_executor_io_concurrency
+        self._pool: ProcessPoolExecutor | None = None
+        self._cpu_queue: asyncio.PriorityQueue | None = None
+        self._io_queue: asyncio.PriorityQueue | None = None
+        self._consumers: List[asyncio.Task] = []
+        self._maintenance: List[asyncio.Task] = []
+        self._batcher: MicroBatcher | None = None
+        self._sequence = itertools.count()
+        # Cancelled job -> its calls still in the queues; the entry goes once the last one is popped.
+        self._cancelled: Dict[str, int] = {}
+        self._pending: Counter[str] = Counter()
+        self._running = 0
+        self._waits: Dict[str, deque] = {
+            name: deque(maxlen=self.settings.scheduler_wait_samples) for name in PRIORITY_CLASSES
+        }
+
+    async def start(self) -> None:
+        if self._consumers:
+            return
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=configure_logging,
+        )
+        self._cpu_queue = asyncio.PriorityQueue()
+        self._io_queue = asyncio.PriorityQueue()
+        self._consumers = [
+            *(asyncio.create_task(self._consume(self._cpu_queue, cpu_bound=True)) for _ in range(self.processes)),
+            *(asyncio.create_task(self._consume(self._io_queue, cpu_bound=False)) for _ in range(self.io_concurrency)),
+        ]
+        if self.settings.stage_batching_enabled:
+            self._batcher = MicroBatcher(
+                self._run_batch,
+                self.settings.stage_batch_max_pages,
+                self.settings.stage_batch_max_wait_ms / 1000,
+                self.io_concurrency,
+            )
+            self._consumers.append(asyncio.create_task(self._batcher.run()))
+        # There is no Celery beat in local mode; run the periodic maintenance here.
+        self._maintenance = [
+            asyncio.create_task(
+                self._every(
+                    "log_maintenance",
+                    self.settings.log_maintenance_interval_seconds,
+                    get_log_retention_service().maintain,
+                )
+            ),
+            asyncio.create_task(
+                self._every(
+                    "page_compaction",
+                    self.settings.page_compaction_interval_seconds,
+                    get_page_lifecycle_service().sweep,
+                )
+            ),
+            asyncio.create_task(
+                self._every(
+                    "webhook_delivery",
+                    self.settings.webhook_delivery_interval_seconds,
+                    get_webhook_service().deliver,
+                )
+            ),
+            asyncio.create_task(
+                self._every(
+                    "stage_timing_flush",
+                    self.settings.stage_timing_flush_seconds,
+                    get_stage_timing_service().flush_if_due,
+                )
+            ),
+        ]
+        logger.info("pipeline.local.started", processes=self.processes, io_concurrency=self.io_concurrency)
+
+        # Nothing survives a restart in memory: pick every running job and ingest batch back up. process_job
+        # re-plans documents that already have pages, so only unfinished stages run again.
+        async with AsyncSessionLocal() as session:
+            rows = (
+                await session.execute(
+                    select(Job.job_id, Job.priority, Job.profile_mode).where(
+                        Job.status == JobStatusEnum.PROCESSING.value
+                    )
+                )
+            ).all()
+            ingests = await get_ingest_service().unfinished_calls(session)
+        await self.submit(
+            [
+                StageCall(PROCESS_STAGE, job_id, job_id=job_id, priority=priority, profile=profile)
+                for job_id, priority, profile in rows
+            ]
+        )
+        await self.submit(ingests)
+
+    async def shutdown(self) -> None:
+        tasks = [*self._consumers, *self._maintenance]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._consumers = []
+        self._maintenance = []
+        self._batcher = None
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        await get_stage_timing_service().flush()
+
+    async def _every(self, name: str, interval: float, run: Callable[[], Awaitable[object]]) -> None:
+        while True:
+            try:
+                await run()
+            except Exception:
+                logger.exception("pipeline.local.maintenance_failed", task=name)
+            await asyncio.sleep(interval)
+
+    async def submit(self, calls: List[StageCall]) -> None:
+        if not self._consumers:
+            await self.start()
+        now = time.time()
+        for call in calls:
+            if call.job_id in self._cancelled:
+                continue
+            self._pending[priority_class(call.priority)] += 1
+            if self._batcher and STAGES[call.stage].batch_handler:
+                self._batcher.add(call.stamped(now))
+                continue
+            queue = self._cpu_queue if STAGES[call.stage].cpu_bound else self._io_queue
+            queue.put_nowait((-call.priority, next(self._sequence), call.stamped(now)))
+
+    async def _run_batch(self, calls: List[StageCall]) -> None:
+        for call in calls:
+            self._pending[priority_class(call.priority)] -= 1
+        calls = [call for call in calls if call.job_id not in self._cancelled]
+        self._running += len(calls)
+        try:
+            await run_stage_batch(calls, self.submit)
+        finally:
+            self._running -= len(calls)
+
+    async def _consume(self, queue: asyncio.PriorityQueue, cpu_bound: bool) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            _, _, call = await queue.get()
+            name = priority_class(call.priority)
+            self._pending[name] -= 1
+            try:
+                if call.job_id in self._cancelled:
+                    self._cancelled[call.job_id] -= 1
+                    if not self._cancelled[call.job_id]:
+                        del self._cancelled[call.job_id]
+                    continue
+                if call.stage == OCR_STAGE and call.enqueued_at is not None:
+                    self._waits[name].append(round((time.time() - call.enqueued_at) * 1000, 1))
+                self._running += 1
+                try:
+                    if cpu_bound:
+                        follow_ups, changed, timings = await loop.run_in_executor(self._pool, run_stage_in_process, call)
+                        get_response_cache().invalidate(changed)
+                        get_replica_router().note_writes(changed)
+                        get_stage_timing_service().extend(timings)
+                        await get_stage_timing_service().flush_if_due()
+                        await self.submit(follow_ups)
+                    else:
+                        await run_stage(call, self.submit)
+                finally:
+                    self._running -= 1
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("pipeline.local.stage_failed", stage=call.stage, key=call.key, job_id=call.job_id)
+            finally:
+                queue.task_done()
+
+    async def cancel(self, job_id: str, page_ids: Sequence[str]) -> int:
+        # Queued calls are dropped as they are popped; running stages, and anything they submit
+        # after the last queued call is gone, see the job's cancelled status.
+        withdrawn = 0
+        for queue in (self._cpu_queue, self._io_queue):
+            if queue is not None:
+                withdrawn += sum(1 for _, _, call in queue._queue if call.job_id == job_id)
+        if withdrawn:
+            self._cancelled[job_id] = withdrawn
+        if self._batcher:
+            for call in self._batcher.withdraw(job_id):
+                self._pending[priority_class(call.priority)] -= 1
+                withdrawn += 1
+        return withdrawn
+
+    async def backlog(self) -> Tuple[int, int]:
+        queued = [call for queue in (self._cpu_queue, self._io_queue) if queue is not None for _, _, call in queue._queue]
+        if self._batcher:
+            queued += self._batcher.waiting()
+        return len(queued), sum(1 for call in queued if call.stage == OCR_STAGE)
+
+    async def queue_stats(self) -> QueueStatsResponse:
+        return QueueStatsResponse(
+            inflight=self._running,
+            inflight_limit=self.processes + self.io_concurrency,
+            classes=[class_stats(name, max(self._pending[name], 0), self._waits[name]) for name in PRIORITY_CLASSES],
+        )
+
+
+def run_stage_in_process(call: StageCall) -> Tuple[List[StageCall], List[str], List[dict]]:
+    """Run a stage in a pool worker; hands its follow-up calls, invalidated cache tags and timing
+    rows back to the parent, which batches the timing writes of all workers."""
+    emitted: List[StageCall] = []
+
+    async def emit(calls: List[StageCall]) -> None:
+        emitted.extend(calls)
+
+    async def _run() -> None:
+        try:
+            await run_stage(call, emit)
+        finally:
+            await engine.dispose()
+
+    with get_response_cache().capture() as changed:
+        asyncio.run(_run())
+    return emitted, sorted(changed), get_stage_timing_service().drain()
+
+
+_executor: PipelineExecutor | None = None
+_celery_executor: CeleryExecutor | None = None
+
+
+def get_celery_executor() -> CeleryExecutor:
+    global _celery_executor
+    if _celery_executor is None:
+        _celery_executor = CeleryExecutor()
+    return _celery_executor
+
+
+def get_executor() -> PipelineExecutor:
+    """The backend selected by ``Settings.pipeline_executor``."""
+    global _executor
+    if _executor is None:
+        backend = get_settings().pipeline_executor
+        if backend == "local":
+            _executor = LocalExecutor()
+        elif backend == "celery":
+            _executor = get_celery_executor()
+        else:
+            raise ValueError(f"Unknown pipeline executor {backend!r}")
+    return _executor
@@ -0,0 +1,348 @@
+"""Bounded producer/consumer ingest for ``process_job``.
+
+    download -> rasterize -> encode -> persist & dispatch
+
+Each arrow is an ``asyncio.Queue`` sized from settings, so at most a few originals and a few
+rendered pages are held at once, and the first page of a document reaches OCR while later pages
+are still rendering. Pages are persisted in page order, which lets a resumed job continue
+rasterizing after the last page it stored.
+
+PDF pages with a usable embedded text layer are never rendered: their text is stored as the OCR
+output and they go straight to spellcheck. Rendered pages are screened before OCR; blank pages and
+exact repeats of the same patient's earlier pages are not dispatched (see PageScreeningService).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import os
+import shutil
+import tempfile
+import uuid
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Awaitable, List, Sequence, Set
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import get_settings
+from app.db.models.document import Document
+from app.db.models.document_page import DocumentPage, PageSkipEnum, PageStageEnum
+from app.db.models.job import Job
+from app.pipeline.base import OCR_STAGE, SNAPSHOT_STAGE, SPELLCHECK_STAGE, Emit, StageCall
+from app.services.cancellation_service import get_cancellation_service
+from app.services.page_screening_service import DuplicateIndex, get_page_screening_service
+from app.services.pdf_service import get_pdf_service
+from app.services.progress_feed_service import SCREENED, notify_progress
+from app.services.progress_service import get_progress_service
+from app.services.storage_service import get_storage_service
+from app.services.text_store_service import get_text_store_service
+from app.utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from app.utils.page_fingerprint import PageFingerprint
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class DocumentWork:
+    document: Document
+    # Pages 1..start_page-1 are already stored from an earlier run.
+    start_page: int = 1
+
+
+@dataclass
+class _Downloaded:
+    work: DocumentWork
+    data: bytes
+
+
+@dataclass
+class _DocumentStart:
+    work: DocumentWork
+    pages_total: int
+
+
+@dataclass
+class _Page:
+    work: DocumentWork
+    page_number: int
+    path: str | None = None
+    data: bytes | None = None
+    image_base64: str | None = None
+    # Embedded text layer; such pages carry no image.
+    text: str | None = None
+    fingerprint: PageFingerprint | None = None
+
+
+@dataclass
+class _DocumentEnd:
+    work: DocumentWork
+    workdir: str | None = None
+
+
+_DONE = object()
+
+
+class JobCancelled(Exception):
+    """Stops the ingest pipeline once the job has been cancelled."""
+
+
+class PagePipeline:
+    def __init__(self, session: AsyncSession, job: Job, emit: Emit, profile: str | None = None) -> None:
+        self.settings = get_settings()
+        self.session = session
+        self.job = job
+        self.emit = emit
+        self.profile = profile
+        self.storage = get_storage_service()
+        self.pdf_service = get_pdf_service()
+        self.cancellation = get_cancellation_service()
+        self.progress = get_progress_service()
+        self.text_store = get_text_store_service()
+        self.screening = get_page_screening_service()
+        self._index: DuplicateIndex | None = None
+        self._downloaded: asyncio.Queue = asyncio.Queue(self.settings.ingest_download_queue_size)
+        self._rendered: asyncio.Queue = asyncio.Queue(self.settings.ingest_raster_queue_size)
+        self._encoded: asyncio.Queue = asyncio.Queue(self.settings.ingest_encode_queue_size)
+
+    async def run(self, documents: Sequence[DocumentWork]) -> None:
+        try:
+            await _run_all(
+                [
+                    self._download(documents),
+                    self._rasterize(),
+                    self._encode(),
+                    self._persist(),
+                ]
+            )
+        except JobCancelled:
+            logger.info("processing.job.cancelled", job_id=self.job.job_id)
+
+    async def _download(self, documents: Sequence[DocumentWork]) -> None:
+        for work in documents:
+            if await self.cancellation.is_cancelled(self.job.job_id):
+                raise JobCancelled()
+            data = await self.storage.retrieve_file(work.document.original_file_path)
+            await self._downloaded.put(_Downloaded(work, data))
+        await self._downloaded.put(_DONE)
+
+    async def _rasterize(self) -> None:
+        chunk = self.settings.ingest_raster_chunk_pages
+        while (item := await self._downloaded.get()) is not _DONE:
+            work, data = item.work, item.data
+            if not data.startswith(b"%PDF"):
+                await self._rendered.put(_DocumentStart(work, 1))
+                if work.start_page <= 1:
+                    await self._rendered.put(_Page(work, 1, data=data))
+                await self._rendered.put(_DocumentEnd(work))
+                continue
+
+            pages_total = await self.pdf_service.page_count(data)
+            text_layer = await self.pdf_service.text_layer(data)
+            if text_layer:
+                logger.info(
+                    "processing.document.text_layer",
+                    document_id=work.document.document_id,
+                    pages=len(text_layer),
+                    pages_total=pages_total,
+                )
+            await self._rendered.put(_DocumentStart(work, pages_total))
+            workdir = tempfile.mkdtemp(prefix="ingest-")
+            try:
+                first = work.start_page
+                while first <= pages_total:
+                    if first in text_layer:
+                        await self._rendered.put(_Page(work, first, text=text_layer[first]))
+                        first += 1
+                        continue
+                    # Render the run of pages without text, up to a chunk, in one poppler call.
+                    last = first
+                    while last < pages_total and last - first + 1 < chunk and last + 1 not in text_layer:
+                        last += 1
+                    paths = await self.pdf_service.render_pages(data, first, last, workdir)
+                    for page_number, path in enumerate(paths, start=first):
+                        await self._rendered.put(_Page(work, page_number, path=path))
+                    first = last + 1
+            except BaseException:
+                shutil.rmtree(workdir, ignore_errors=True)
+                raise
+            # The encoder removes the directory once it has read the last page.
+            await self._rendered.put(_DocumentEnd(work, workdir))
+        await self._rendered.put(_DONE)
+
+    async def _encode(self) -> None:
+        while (item := await self._rendered.get()) is not _DONE:
+            if isinstance(item, _Page) and item.text is None:
+                encoded = await asyncio.to_thread(self._encode_page, item.path, item.data)
+                item.image_base64, item.fingerprint = encoded
+                item.path = item.data = None
+            elif isinstance(item, _DocumentEnd) and item.workdir:
+                shutil.rmtree(item.workdir, ignore_errors=True)
+            await self._encoded.put(item)
+        await self._encoded.put(_DONE)
+
+    async def _persist(self) -> None:
+        batch_size = self.settings.ingest_persist_batch_pages
+        stored: dict[str, int] = {}
+        done = False
+        while not done:
+            items = [await self._encoded.get()]
+            # Whatever else is already encoded goes into the same transaction.
+            while len(items) < batch_size and not self._encoded.empty():
+                items.append(self._encoded.get_nowait())
+
+            pages: List[tuple[DocumentWork, DocumentPage]] = []
+            screened: List[tuple[DocumentWork, DocumentPage, PageFingerprint]] = []
+            text_pages: List[tuple[DocumentWork, DocumentPage, str]] = []
+            finished: List[DocumentWork] = []
+            for item in items:
+                if item is _DONE:
+                    done = True
+                elif isinstance(item, _DocumentStart):
+                    # Set before any page is dispatched so OCR can never see a partial total.
+                    item.work.document.pages_total = item.pages_total
+                    stored[item.work.document.document_id] = item.work.start_page - 1
+                elif isinstance(item, _Page):
+                    page = DocumentPage(
+                        page_id=str(uuid.uuid4()),
+                        document_id=item.work.document.document_id,
+                        page_number=item.page_number,
+                        image_base64=item.image_base64,
+                    )
+                    self.session.add(page)
+                    if item.fingerprint is not None:
+                        page.ink_coverage, page.phash = item.fingerprint.ink, item.fingerprint.phash
+                        screened.append((item.work, page, item.fingerprint))
+                    if item.text is None:
+                        pages.append((item.work, page))
+                    else:
+                        text_pages.append((item.work, page, item.text))
+                    stored[item.work.document.document_id] += 1
+                elif isinstance(item, _DocumentEnd):
+                    finished.append(item.work)
+
+            if await self.cancellation.is_cancelled(self.job.job_id):
+                await self.session.rollback()
+                raise JobCancelled()
+
+            with self.session.no_autoflush:
+                ready = await self._screen(screened)
+            await self.session.flush()
+            for _, page, text in text_pages:
+                await self.text_store.save_raw(self.session, page.page_id, text)
+                await self.progress.advance_page(self.session, page.page_id, PageStageEnum.OCR_DONE.value)
+            job_completed = False
+            for _, page, _ in screened:
+                advance = None
+                if page.skip_reason == PageSkipEnum.BLANK.value:
+                    advance = await self.progress.skip_page(self.session, page.page_id)
+                elif page.duplicate_of in ready:
+                    advance = await self.screening.copy_texts(self.session, page.duplicate_of, [page.page_id])
+                job_completed |= bool(advance and advance.job_completed)
+            for work in finished:
+                job_completed |= await self._finish_document(work.document, stored[work.document.document_id])
+            await self.session.commit()
+
+            calls = [self._call(OCR_STAGE, work, page) for work, page in pages if page.skip_reason is None]
+            calls += [self._call(SPELLCHECK_STAGE, work, page) for work, page, _ in text_pages]
+            if calls:
+                await self.emit(calls)
+            if job_completed:
+                await self.emit(
+                    [
+                        StageCall(
+                            SNAPSHOT_STAGE,
+                            self.job.job_id,
+                            job_id=self.job.job_id,
+                            priority=self.job.priority,
+                            profile=self.profile,
+                        )
+                    ]
+                )
+            for work in finished:
+                logger.info(
+                    "processing.document.dispatched",
+                    document_id=work.document.document_id,
+                    pages=stored[work.document.document_id],
+                )
+
+    async def _screen(self, screened: List[tuple[DocumentWork, DocumentPage, PageFingerprint]]) -> Set[str]:
+        """Mark blank and duplicate pages; returns the originals whose texts can be copied now.
+
+        Runs before the batch writes anything, so the share locks on originals are taken first.
+        """
+        ready: Set[str] = set()
+        if not screened:
+            return ready
+        if self._index is None:
+            self._index = await self.screening.load_index(self.session, self.job.job_id)
+        for work, page, fp in screened:
+            if self.screening.is_blank(fp):
+                page.skip_reason = PageSkipEnum.BLANK.value
+                continue
+            patient = (work.document.hospital_id, work.document.patient_id)
+            original_id = await self.screening.find_duplicate(self.session, self._index, patient, fp)
+            if original_id is None:
+                self._index.add(patient, page.page_id, fp.phash, fp.digest)
+                continue
+            page.skip_reason, page.duplicate_of = PageSkipEnum.DUPLICATE.value, original_id
+            if original_id not in ready and await self.screening.original_ready(self.session, original_id):
+                ready.add(original_id)
+        skipped = [page for _, page, _ in screened if page.skip_reason]
+        if skipped:
+            await notify_progress(self.session, job_id=self.job.job_id, stage=SCREENED)
+            logger.info(
+                "processing.pages.screened",
+                job_id=self.job.job_id,
+                blank=sum(page.skip_reason == PageSkipEnum.BLANK.value for page in skipped),
+                duplicate=sum(page.skip_reason == PageSkipEnum.DUPLICATE.value for page in skipped),
+            )
+        return ready
+
+    def _encode_page(self, path: str | None, data: bytes | None) -> tuple[str, PageFingerprint | None]:
+        if path is not None:
+            with open(path, "rb") as handle:
+                data = handle.read()
+            os.remove(path)
+        data = data or b""
+        return base64.b64encode(data).decode("utf-8"), self.screening.fingerprint(data)
+
+    def _call(self, stage: str, work: DocumentWork, page: DocumentPage) -> StageCall:
+        return StageCall(
+            stage=stage,
+            key=page.page_id,
+            job_id=self.job.job_id,
+            hospital_id=work.document.hospital_id,
+            priority=self.job.priority,
+            profile=self.profile,
+        )
+
+    async def _finish_document(self, document: Document, stored: int) -> bool:
+        """Reconcile the page total with what was stored; returns whether that completed the job."""
+        if stored == document.pages_total and stored > 0:
+            return False
+        # The renderer produced fewer pages than pdfinfo announced, or the document is empty.
+        document.pages_total = stored
+        await self.session.flush()
+        pages_done = await self.session.scalar(
+            select(Document.pages_done).where(Document.document_id == document.document_id)
+        )
+        if (pages_done or 0) < stored:
+            return False
+        _, job_completed = await self.progress.complete_document(self.session, document.document_id)
+        return job_completed
+
+
+async def _run_all(coroutines: List[Awaitable[None]]) -> None:
+    """Run the stages concurrently; the first failure cancels the rest and is re-raised."""
+    tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
@@ -0,0 +1,402 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List
+
+from sqlalchemy import select
+
+from app.config.settings import get_settings
+from app.db.models.document import Document, DocumentStatusEnum
+from app.db.models.document_page import DocumentPage, PageStageEnum
+from app.db.models.ingest_batch import IngestBatch
+from app.db.models.job import DEFAULT_PRIORITY, Job
+from app.db.models.stage_timing import StageOutcomeEnum
+from app.db.session import AsyncSessionLocal
+from app.pipeline.base import (
+    COMPACT_STAGE,
+    DEID_STAGE,
+    INGEST_STAGE,
+    OCR_STAGE,
+    PROCESS_STAGE,
+    SNAPSHOT_STAGE,
+    SPELLCHECK_STAGE,
+    Emit,
+    StageCall,
+)
+from app.pipeline.page_pipeline import DocumentWork, PagePipeline
+from app.services.cancellation_service import get_cancellation_service
+from app.services.deid_service import get_deid_service
+from app.services.ingest_service import get_ingest_service
+from app.services.log_service import get_log_service
+from app.services.ocr_service import get_ocr_service
+from app.services.page_lifecycle_service import get_page_lifecycle_service
+from app.services.page_screening_service import get_page_screening_service
+from app.services.preprocess_service import get_preprocess_service
+from app.services.profiling_service import get_profiling_service
+from app.services.progress_service import get_progress_service
+from app.services.result_service import get_result_service
+from app.services.resume_service import get_resume_planner
+from app.services.spellcheck_service import get_spellcheck_service
+from app.services.stage_timing_service import get_stage_timing_service
+from app.services.text_store_service import get_text_store_service
+from app.utils.logger import get_logger
+from app.utils.stage_timer import StageTimer, add_bytes, timing
+
+logger = get_logger(__name__)
+
+log_service = get_log_service()
+
+
+async def process_job(call: StageCall, emit: Emit) -> None:
+    """Rasterize every document of the job into pages and hand the pages to OCR as they are stored."""
+    job_id = call.key
+    planner = get_resume_planner()
+
+    async with AsyncSessionLocal() as session:
+        job = await session.get(Job, job_id)
+        if not job:
+            logger.error("processing.job.missing", job_id=job_id)
+            return
+
+        documents = (await session.scalars(select(Document).where(Document.job_id == job_id))).all()
+        logger.info("processing.job.start", job_id=job_id, documents=len(documents), priority=job.priority)
+        await log_service.record(session, level="INFO", message="Job processing started", job_id=job_id)
+        await session.commit()
+
+        pending: List[DocumentWork] = []
+        for document in documents:
+            if document.status in (DocumentStatusEnum.COMPLETED.value, DocumentStatusEnum.CANCELLED.value):
+                continue
+            # Pages already persisted by an earlier run only need their missing stages. Pages are
+            # stored in page order, so a partially rasterized document resumes after the last one.
+            plan = await planner.plan_document(session, document.document_id)
+            if plan.total:
+                await emit(planner.calls(plan, document, priority=job.priority, profile=call.profile))
+                if plan.total >= document.pages_total:
+                    continue
+            pending.append(DocumentWork(document, start_page=plan.total + 1))
+
+        if pending:
+            await PagePipeline(session, job, emit, profile=call.profile).run(pending)
+
+
+async def ocr_page(call: StageCall, emit: Emit) -> None:
+    page_id = call.key
+    ocr_service = get_ocr_service()
+
+    async with AsyncSessionLocal() as session:
+        row = (
+            await session.execute(
+                select(DocumentPage, Document.doc_type)
+                .join(Document, DocumentPage.document_id == Document.document_id)
+                .where(DocumentPage.page_id == page_id)
+            )
+        ).first()
+        if not row:
+            logger.error("ocr.page.missing", page_id=page_id)
+            return
+        page, doc_type = row
+
+        image_bytes = await get_page_lifecycle_service().load_image(page.image_base64, page.image_path)
+        image_bytes = await get_preprocess_service().preprocess(image_bytes, doc_type)
+        text = await ocr_service.run_ocr(image_bytes)
+        add_bytes(bytes_in=len(image_bytes), bytes_out=len(text))
+        if await get_cancellation_service().is_cancelled(call.job_id):
+            logger.info("ocr.cancelled", page_id=page_id, job_id=call.job_id)
+            return
+
+        await get_text_store_service().save_raw(session, page_id, text)
+        await get_progress_service().advance_page(session, page_id, PageStageEnum.OCR_DONE.value)
+        await log_service.record(session, level="INFO", message="OCR stage complete", document_id=page.document_id)
+        await session.commit()
+
+    await emit([call.next(SPELLCHECK_STAGE)])
+
+
+async def spellcheck_page(call: StageCall, emit: Emit) -> None:
+    page_id = call.key
+    spell_service = get_spellcheck_service()
+    text_store = get_text_store_service()
+
+    async with AsyncSessionLocal() as session:
+        raw_text = await text_store.raw_text(session, page_id)
+        if raw_text is None:
+            logger.warning("spellcheck.raw_text_missing", page_id=page_id)
+            return
+        page = await session.get(DocumentPage, page_id)
+
+        corrected = await spell_service.correct_text(raw_text)
+        add_bytes(bytes_in=len(raw_text), bytes_out=len(corrected))
+        await text_store.save_spellchecked(session, page_id, corrected, raw_text)
+        await get_progress_service().advance_page(session, page_id, PageStageEnum.SPELLCHECKED.value)
+        await log_service.record(
+            session,
+            level="INFO",
+            message="Spellcheck stage complete",
+            document_id=page.document_id if page else None,
+        )
+        await session.commit()
+
+    await emit([call.next(DEID_STAGE)])
+
+
+async def deid_page(call: StageCall, emit: Emit) -> None:
+    page_id = call.key
+    deid_service = get_deid_service()
+    text_store = get_text_store_service()
+
+    async with AsyncSessionLocal() as session:
+        spellchecked = await text_store.spellchecked_text(session, page_id)
+        if spellchecked is None:
+            logger.warning("deid.spellchecked_missing", page_id=page_id)
+            return
+        page = await session.get(DocumentPage, page_id)
+
+        cleaned = await deid_service.redact_phi(spellchecked)
+        add_bytes(bytes_in=len(spellchecked), bytes_out=len(cleaned))
+        await text_store.save_deidentified(session, page_id, cleaned, spellchecked)
+
+        advance = await get_progress_service().advance_page(session, page_id, PageStageEnum.DEIDENTIFIED.value)
+        # Later pages of the job that duplicate this one were held back for its texts.
+        duplicates = await get_page_screening_service().resolve_duplicates(session, page_id)
+        if duplicates and duplicates.job_completed:
+            advance = duplicates
+        await log_service.record(
+            session,
+            level="INFO",
+            message="De-identification stage complete",
+            document_id=page.document_id if page else None,
+        )
+        await session.commit()
+
+    if advance and advance.job_completed:
+        logger.info("deid.job.completed", job_id=advance.job_id)
+        await emit(
+            [
+                StageCall(
+                    SNAPSHOT_STAGE, advance.job_id, job_id=advance.job_id, priority=call.priority, profile=call.profile
+                )
+            ]
+        )
+
+
+async def spellcheck_pages(calls: List[StageCall], emit: Emit) -> None:
+    """Batch form of :func:`spellcheck_page`: one query for the inputs, one upsert for the outputs."""
+    text_store = get_text_store_service()
+
+    async with AsyncSessionLocal() as session:
+        inputs = await text_store.load_stage_inputs(session, [call.key for call in calls])
+        ready = [call for call in calls if call.key in inputs]
+        if len(ready) < len(calls):
+            missing = [call.key for call in calls if call.key not in inputs]
+            logger.warning("spellcheck.raw_text_missing", page_ids=missing)
+        if not ready:
+            return
+        raw = [inputs[call.key][1].raw or "" for call in ready]
+
+        corrected = await get_spellcheck_service().correct_many(raw)
+        add_bytes(bytes_in=sum(map(len, raw)), bytes_out=sum(map(len, corrected)))
+        await text_store.save_spellchecked_many(
+            session, [(call.key, text, source) for call, text, source in zip(ready, corrected, raw)]
+        )
+        await get_progress_service().advance_pages(
+            session, [call.key for call in ready], PageStageEnum.SPELLCHECKED.value
+        )
+        await log_service.record_many(
+            session, "INFO", "Spellcheck stage complete", (inputs[call.key][0] for call in ready)
+        )
+        await session.commit()
+
+    await emit([call.next(DEID_STAGE) for call in ready])
+
+
+async def deid_pages(calls: List[StageCall], emit: Emit) -> None:
+    """Batch form of :func:`deid_page`; the batch is redacted in one pass of the PHI pattern."""
+    text_store = get_text_store_service()
+
+    async with AsyncSessionLocal() as session:
+        inputs = await text_store.load_stage_inputs(session, [call.key for call in calls], spellchecked=True)
+        ready = [call for call in calls if call.key in inputs and inputs[call.key][1].spellchecked is not None]
+        if len(ready) < len(calls):
+            ready_ids = {call.key for call in ready}
+            logger.warning(
+                "deid.spellchecked_missing", page_ids=[call.key for call in calls if call.key not in ready_ids]
+            )
+        if not ready:
+            return
+        page_ids = [call.key for call in ready]
+        spellchecked = [inputs[call.key][1].spellchecked or "" for call in ready]
+
+        cleaned = await get_deid_service().redact_many(spellchecked)
+        add_bytes(bytes_in=sum(map(len, spellchecked)), bytes_out=sum(map(len, cleaned)))
+        await text_store.save_deidentified_many(session, list(zip(page_ids, cleaned, spellchecked)))
+
+        advances = await get_progress_service().advance_pages(session, page_ids, PageStageEnum.DEIDENTIFIED.value)
+        # Later pages that duplicate these were held back for their texts.
+        advances += await get_page_screening_service().resolve_duplicates_many(session, page_ids)
+        await log_service.record_many(
+            session, "INFO", "De-identification stage complete", (inputs[page_id][0] for page_id in page_ids)
+        )
+        await session.commit()
+
+    by_job = {call.job_id: call for call in ready}
+    snapshots: List[StageCall] = []
+    for job_id in dict.fromkeys(advance.job_id for advance in advances if advance.job_completed):
+        logger.info("deid.job.completed", job_id=job_id)
+        call = by_job.get(job_id)
+        snapshots.append(
+            StageCall(
+                SNAPSHOT_STAGE,
+                job_id,
+                job_id=job_id,
+                priority=call.priority if call else DEFAULT_PRIORITY,
+                profile=call.profile if call else None,
+            )
+        )
+    if snapshots:
+        await emit(snapshots)
+
+
+async def snapshot_result(call: StageCall, emit: Emit) -> None:
+    """Materialize the completed job's result so GET /result serves it with one object fetch."""
+    async with AsyncSessionLocal() as session:
+        job = await session.get(Job, call.key)
+        if not job:
+            logger.error("snapshot.job.missing", job_id=call.key)
+            return
+        await get_result_service().write_snapshot(session, job)
+        await session.commit()
+
+    if get_settings().page_compaction_on_complete:
+        await emit([call.next(COMPACT_STAGE)])
+
+
+async def compact_pages(call: StageCall, emit: Emit) -> None:
+    """Move the completed job's page images from Postgres to object storage."""
+    async with AsyncSessionLocal() as session:
+        await get_page_lifecycle_service().compact_job(session, call.key)
+
+
+async def ingest_archive(call: StageCall, emit: Emit) -> None:
+    """Turn an uploaded archive into jobs, one manifest chunk per transaction."""
+    async with AsyncSessionLocal() as session:
+        batch = await session.get(IngestBatch, call.key)
+        if not batch:
+            logger.error("ingest.batch.missing", batch_id=call.key)
+            return
+        await get_ingest_service().run(session, batch, emit)
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    task_name: str
+    handler: Callable[[StageCall, Emit], Awaitable[None]]
+    # CPU-bound stages run in worker processes in local mode; the rest stay on the event loop.
+    cpu_bound: bool
+    # Stages with a batch handler are grouped across jobs by the executors (see app.pipeline.batching).
+    batch_handler: Callable[[List[StageCall], Emit], Awaitable[None]] | None = None
+    batch_task_name: str | None = None
+
+
+STAGES: Dict[str, Stage] = {
+    stage.name: stage
+    for stage in (
+        Stage(PROCESS_STAGE, "process_job_task", process_job, cpu_bound=True),
+        Stage(OCR_STAGE, "ocr_task", ocr_page, cpu_bound=True),
+        Stage(
+            SPELLCHECK_STAGE,
+            "spellcheck_task",
+            spellcheck_page,
+            cpu_bound=False,
+            batch_handler=spellcheck_pages,
+            batch_task_name="spellcheck_batch_task",
+        ),
+        Stage(
+            DEID_STAGE,
+            "deid_task",
+            deid_page,
+            cpu_bound=False,
+            batch_handler=deid_pages,
+            batch_task_name="deid_batch_task",
+        ),
+        Stage(SNAPSHOT_STAGE, "snapshot_result_task", snapshot_result, cpu_bound=False),
+        Stage(INGEST_STAGE, "ingest_archive_task", ingest_archive, cpu_bound=False),
+        Stage(COMPACT_STAGE, "compact_pages_task", compact_pages, cpu_bound=False),
+    )
+}
+
+
+async def run_stage(call: StageCall, emit: Emit) -> None:
+    """Run one stage call with the checks every backend needs."""
+    if await get_cancellation_service().is_cancelled(call.job_id):
+        logger.info("pipeline.stage.cancelled", stage=call.stage, key=call.key, job_id=call.job_id)
+        return
+    timer = StageTimer()
+    started = time.time()
+    outcome = StageOutcomeEnum.FAILED.value
+    try:
+        if call.profile:
+            async with get_profiling_service().profile(call.profile, f"{call.stage}-{call.key}", call.job_id):
+                await _run_handler(call, emit, timer)
+        else:
+            await _run_handler(call, emit, timer)
+        outcome = StageOutcomeEnum.COMPLETED.value
+    except Exception:
+        logger.exception("pipeline.stage.failed", stage=call.stage, key=call.key, job_id=call.job_id)
+        if call.job_id:
+            async with AsyncSessionLocal() as session:
+                await get_progress_service().fail_job(session, call.job_id)
+                await session.commit()
+        raise
+    finally:
+        timings = get_stage_timing_service()
+        timings.record(call, timer, started, time.time(), outcome)
+        await timings.flush_if_due()
+
+
+async def run_stage_batch(calls: List[StageCall], emit: Emit) -> None:
+    """Run a batch of calls of one batchable stage.
+
+    If the batch fails, its calls are run again one at a time, so a bad page fails only its own job.
+    """
+    cancelled = await get_cancellation_service().cancelled_among(call.job_id for call in calls if call.job_id)
+    # A page may be queued twice (a resume racing the original call); one upsert row per page.
+    calls = list({call.key: call for call in calls if call.job_id not in cancelled}.values())
+    if not calls:
+        return
+    stage = STAGES[calls[0].stage]
+    profiled = next((call for call in calls if call.profile), None)
+    timer = StageTimer()
+    started = time.time()
+    try:
+        with timing(timer):
+            if profiled:
+                name = f"{stage.name}-batch-{profiled.key}"
+                async with get_profiling_service().profile(profiled.profile, name, profiled.job_id):
+                    await stage.batch_handler(calls, emit)
+            else:
+                await stage.batch_handler(calls, emit)
+    except Exception:
+        logger.exception("pipeline.batch.failed", stage=stage.name, calls=len(calls))
+        for call in calls:
+            try:
+                await run_stage(call, emit)
+            except Exception:
+                # run_stage logged it and failed the call's job.
+                pass
+        return
+
+    finished = time.time()
+    timings = get_stage_timing_service()
+    share = timer.share(len(calls))
+    for call in calls:
+        timings.record(call, share, started, finished, StageOutcomeEnum.COMPLETED.value)
+    await timings.flush_if_due()
+    logger.debug("pipeline.batch.completed", stage=stage.name, calls=len(calls))
+
+
+async def _run_handler(call: StageCall, emit: Emit, timer: StageTimer) -> None:
+    with timing(timer):
+        await STAGES[call.stage].handler(call, emit)
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from pydantic import BaseModel
+
+
+class CacheStatsResponse(BaseModel):
+    enabled: bool
+    shared: bool
+    entries: int
+    bytes: int
+    max_entries: int
+    max_bytes: int
+    hits: int
+    shared_hits: int
+    misses: int
+    hit_ratio: float | None = None
+    evictions: int
+    invalidations: int
+    stale_puts: int
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import List
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class IngestRowError(BaseModel):
+    row: int
+    file: str | None = None
+    error: str
+
+
+class IngestBatchResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    batch_id: str
+    status: str
+    priority: int
+    auto_start: bool
+    rows_total: int
+    rows_done: int
+    documents_ingested: int
+    documents_failed: int
+    jobs_created: int
+    progress: str | None = None
+    errors: List[IngestRowError] = Field(default_factory=list)
+    created_at: datetime
+    updated_at: datetime
+    completed_at: datetime | None = None
+
+
+class IngestJobOut(BaseModel):
+    job_id: str
+    status: str
+    documents: int
+
+
+class IngestJobsResponse(BaseModel):
+    batch_id: str
+    total: int
+    jobs: List[IngestJobOut] = Field(default_factory=list)
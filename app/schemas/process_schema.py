@@ -1,12 +1,18 @@
 from __future__ import annotations
 
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, HttpUrl
 
 
 class ProcessRequest(BaseModel):
-    priority: Optional[int] = 5
+    # 0-9, 9 most urgent. >= 7 is scheduled as interactive, <= 3 as bulk.
+    priority: Optional[int] = Field(5, ge=0, le=9)
+    # Profile every stage call of this run and store the profiles under the job.
+    profile: Optional[Literal["cprofile", "sample"]] = None
+    # Completion webhook: a summary is POSTed here once the job is completed or failed.
+    callback_url: Optional[HttpUrl] = None
 
 
 class FileStageStatus(BaseModel):
@@ -14,6 +20,10 @@ class FileStageStatus(BaseModel):
     ocr: str
     spellcheck: str
     deid: str
+    pages_total: int = 0
+    # Pages carried through without OCR: blank, or a repeat of an earlier page of the job.
+    pages_blank: int = 0
+    pages_duplicate: int = 0
 
 
 class StatusResponse(BaseModel):
@@ -23,3 +33,75 @@ class StatusResponse(BaseModel):
     files: List[FileStageStatus] = Field(default_factory=list)
     message: str | None = None
 
+
+class PriorityClassStats(BaseModel):
+    priority_class: str
+    pending: int
+    wait_samples: int
+    wait_avg_ms: float | None = None
+    wait_p50_ms: float | None = None
+    wait_p95_ms: float | None = None
+    wait_max_ms: float | None = None
+
+
+class ProfileOut(BaseModel):
+    name: str
+    size: int
+    last_modified: datetime | None = None
+
+
+class ProfileListResponse(BaseModel):
+    job_id: str
+    profiles: List[ProfileOut] = Field(default_factory=list)
+
+
+class DurationStats(BaseModel):
+    avg: float | None = None
+    p50: float | None = None
+    p95: float | None = None
+    max: float | None = None
+
+
+class StageTimeline(BaseModel):
+    stage: str
+    calls: int
+    failed: int
+    workers: int
+    # Queue wait (enqueued -> started) and run time (started -> finished), in milliseconds.
+    wait_ms: DurationStats
+    run_ms: DurationStats
+    run_ms_total: float
+    db_ms_total: float
+    storage_ms_total: float
+    compute_ms_total: float
+    bytes_in: int
+    bytes_out: int
+    first_started_at: datetime
+    last_finished_at: datetime
+
+
+class CriticalPathStep(BaseModel):
+    stage: str
+    page_id: str | None = None
+    worker: str
+    wait_ms: float
+    run_ms: float
+    db_ms: float
+    storage_ms: float
+    compute_ms: float
+
+
+class TimelineResponse(BaseModel):
+    job_id: str
+    wall_ms: float | None = None
+    stages: List[StageTimeline] = Field(default_factory=list)
+    critical_path: List[CriticalPathStep] = Field(default_factory=list)
+    # Largest share of the critical path, e.g. "wait:ocr", "compute:ocr", "db" or "storage".
+    bottleneck: str | None = None
+    recommendation: str | None = None
+
+
+class QueueStatsResponse(BaseModel):
+    inflight: int
+    inflight_limit: int
+    classes: List[PriorityClassStats] = Field(default_factory=list)
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from typing import List
+
+from pydantic import BaseModel
+
+
+class SearchHit(BaseModel):
+    document_id: str
+    job_id: str
+    page_id: str
+    page_number: int
+    patient_id: str
+    hospital_id: str
+    doc_type: str
+    rank: float
+    snippet: str
+
+
+class SearchResponse(BaseModel):
+    query: str
+    total: int
+    limit: int
+    offset: int
+    results: List[SearchHit]
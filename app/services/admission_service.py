@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import List
+
+from fastapi import UploadFile, status
+
+from app.config.settings import get_settings
+from app.pipeline.executors import get_executor
+from app.utils.logger import get_logger
+from app.utils.redis_client import get_redis_client
+
+logger = get_logger(__name__)
+
+KEY_PREFIX = "admission"
+
+# Fixed-window quota check-and-increment; returns 1 when the request fits.
+# KEYS: files counter, bytes counter
+# ARGV: files, bytes, max_files, max_bytes, window_seconds
+_QUOTA_SCRIPT = """
+local files = tonumber(redis.call('GET', KEYS[1]) or '0')
+local bytes = tonumber(redis.call('GET', KEYS[2]) or '0')
+if files + tonumber(ARGV[1]) > tonumber(ARGV[3]) or bytes + tonumber(ARGV[2]) > tonumber(ARGV[4]) then
+    return 0
+end
+redis.call('INCRBY', KEYS[1], ARGV[1])
+redis.call('INCRBY', KEYS[2], ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+redis.call('EXPIRE', KEYS[2], ARGV[5])
+return 1
+"""
+
+# Give back a charge; a window that already expired is left alone.
+# KEYS: files counter, bytes counter
+# ARGV: files, bytes
+_REFUND_SCRIPT = """
+for i, key in ipairs(KEYS) do
+    if redis.call('EXISTS', key) == 1 then
+        redis.call('DECRBY', key, ARGV[i])
+    end
+end
+return 1
+"""
+
+
+@dataclass(frozen=True)
+class Admission:
+    """What an admitted upload was charged against its hospital's quota."""
+
+    hospital_id: str
+    bucket: int
+    files: int
+    bytes: int
+
+
+class AdmissionRejectedError(Exception):
+    """Raised when an upload must be refused before any bytes are stored."""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int | None = None) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+    @property
+    def headers(self) -> dict[str, str] | None:
+        if self.retry_after is None:
+            return None
+        return {"Retry-After": str(self.retry_after)}
+
+
+class AdmissionService:
+    """Per-request limits, per-hospital quotas and pipeline backlog checks for uploads."""
+
+    def __init__(self) -> None:
+        self.settings = get_settings()
+        # A single-node deployment has one API process, so quotas can live in memory there.
+        self.redis = get_redis_client() if self.settings.pipeline_executor != "local" else None
+        self._quota_script = self.redis.register_script(_QUOTA_SCRIPT) if self.redis else None
+        self._refund_script = self.redis.register_script(_REFUND_SCRIPT) if self.redis else None
+        self._local_usage: dict[tuple[str, int], list[int]] = defaultdict(lambda: [0, 0])
+        self._backlog: tuple[int, int] | None = None
+        self._backlog_expires_at = 0.0
+
+    async def admit_upload(self, hospital_id: str, files: List[UploadFile]) -> Admission:
+        total_bytes = sum(_file_size(file) for file in files)
+        self._check_request(len(files), total_bytes)
+        await self._check_backlog()
+        return await self._check_hospital_quota(hospital_id, len(files), total_bytes)
+
+    async def refund(self, admission: Admission) -> None:
+        """Return the charge of an upload that was admitted but not stored."""
+        if self._refund_script is None:
+            usage = self._local_usage.get((admission.hospital_id, admission.bucket))
+            if usage is not None:
+                usage[0] -= admission.files
+                usage[1] -= admission.bytes
+            return
+        try:
+            await asyncio.to_thread(
+                self._refund_script,
+                keys=self._quota_keys(admission.hospital_id, admission.bucket),
+                args=[admission.files, admission.bytes],
+            )
+        except Exception:
+            # The charge then simply lapses with its window.
+            logger.warning("admission.refund.failed", hospital_id=admission.hospital_id, exc_info=True)
+
+    def _check_request(self, file_count: int, total_bytes: int) -> None:
+        if file_count > self.settings.upload_max_files_per_request:
+            raise AdmissionRejectedError(
+                status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                f"At most {self.settings.upload_max_files_per_request} files are accepted per upload",
+            )
+        if total_bytes > self.settings.upload_max_bytes_per_request:
+            raise AdmissionRejectedError(
+                status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                f"Upload exceeds {self.settings.upload_max_bytes_per_request} bytes",
+            )
+
+    async def _check_backlog(self) -> None:
+        queue_depth, pending_pages = await self.backlog()
+        if (
+            queue_depth > self.settings.admission_max_queue_depth
+            or pending_pages > self.settings.admission_max_pending_pages
+        ):
+            logger.warning("admission.backlog.rejected", queue_depth=queue_depth, pending_pages=pending_pages)
+            raise AdmissionRejectedError(
+                status.HTTP_503_SERVICE_UNAVAILABLE,
+                "Processing backlog is full, retry later",
+                retry_after=self.settings.admission_retry_after_seconds,
+            )
+
+    async def _check_hospital_quota(self, hospital_id: str, file_count: int, total_bytes: int) -> Admission:
+        window = self.settings.upload_hospital_window_seconds
+        now = int(time.time())
+        bucket = now // window
+        if self._quota_script is None:
+            admitted = self._admit_local(hospital_id, bucket, file_count, total_bytes)
+        else:
+            admitted = await asyncio.to_thread(
+                self._quota_script,
+                keys=self._quota_keys(hospital_id, bucket),
+                args=[
+                    file_count,
+                    total_bytes,
+                    self.settings.upload_hospital_max_files_per_window,
+                    self.settings.upload_hospital_max_bytes_per_window,
+                    window,
+                ],
+            )
+        if not admitted:
+            logger.warning("admission.quota.rejected", hospital_id=hospital_id, files=file_count, bytes=total_bytes)
+            raise AdmissionRejectedError(
+                status.HTTP_429_TOO_MANY_REQUESTS,
+                f"Upload quota for hospital {hospital_id} exhausted for the current window",
+                retry_after=window - now % window,
+            )
+        return Admission(hospital_id, bucket, file_count, total_bytes)
+
+    @staticmethod
+    def _quota_keys(hospital_id: str, bucket: int) -> List[str]:
+        return [f"{KEY_PREFIX}:{hospital_id}:{bucket}:files", f"{KEY_PREFIX}:{hospital_id}:{bucket}:bytes"]
+
+    def _admit_local(self, hospital_id: str, bucket: int, file_count: int, total_bytes: int) -> bool:
+        for key in [key for key in self._local_usage if key[1] < bucket]:
+            del self._local_usage[key]
+        usage = self._local_usage[(hospital_id, bucket)]
+        if (
+            usage[0] + file_count > self.settings.upload_hospital_max_files_per_window
+            or usage[1] + total_bytes > self.settings.upload_hospital_max_bytes_per_window
+        ):
+            return False
+        usage[0] += file_count
+        usage[1] += total_bytes
+        return True
+
+    async def backlog(self) -> tuple[int, int]:
+        """Return ``(queued stage calls, pages waiting for OCR)``, cached briefly."""
+        if self._backlog is not None and time.monotonic() < self._backlog_expires_at:
+            return self._backlog
+
+        self._backlog = await get_executor().backlog()
+        self._backlog_expires_at = time.monotonic() + self.settings.admission_backlog_cache_seconds
+        return self._backlog
+
+
+def _file_size(file: UploadFile) -> int:
+    if file.size is not None:
+        return file.size
+    position = file.file.tell()
+    file.file.seek(0, 2)
+    size = file.file.tell()
+    file.file.seek(position)
+    return size
+
+
+_admission_service: AdmissionService | None = None
+
+
+def get_admission_service() -> AdmissionService:
+    global _admission_service
+    if _admission_service is None:
+        _admission_service = AdmissionService()
+    return _admission_service
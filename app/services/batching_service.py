@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections import defaultdict
+from dataclasses import asdict
+from typing import Dict, Iterable, List, Set, Tuple
+
+from app.config.settings import get_settings
+from app.pipeline.base import StageCall
+from app.pipeline.stages import STAGES
+from app.services.scheduling_service import PRIORITY_CLASSES, priority_class
+from app.utils.logger import get_logger
+from app.utils.redis_client import get_redis_client
+
+logger = get_logger(__name__)
+
+KEY_PREFIX = "pipeline:batch"
+FLUSH_TASK = "flush_stage_batches_task"
+
+# Most urgent flush messages: a batch should never wait behind the work it holds up.
+_FLUSH_PRIORITY = 9
+
+
+class StageBatchingService:
+    """Groups calls of the batchable stages across jobs into batch tasks for the Celery workers.
+
+    Calls wait in a Redis list per stage and priority class. A batch task goes out as soon as a list
+    holds ``stage_batch_max_pages`` calls; otherwise a flush task, scheduled
+    ``stage_batch_max_wait_ms`` after the first call arrived, sends whatever has gathered.
+    Interactive calls are always flushed before standard ones, standard before bulk.
+    """
+
+    def __init__(self) -> None:
+        self.settings = get_settings()
+        self.redis = get_redis_client()
+        self.max_pages = max(self.settings.stage_batch_max_pages, 1)
+
+    @staticmethod
+    def _queue_key(stage: str, name: str) -> str:
+        return f"{KEY_PREFIX}:{stage}:{name}"
+
+    @staticmethod
+    def _timer_key(stage: str) -> str:
+        return f"{KEY_PREFIX}:{stage}:flush"
+
+    async def add(self, calls: Iterable[StageCall]) -> None:
+        now = time.time()
+        groups: Dict[Tuple[str, str], List[str]] = defaultdict(list)
+        for call in calls:
+            groups[(call.stage, priority_class(call.priority))].append(json.dumps(asdict(call.stamped(now))))
+        if not groups:
+            return
+
+        pipe = self.redis.pipeline()
+        for (stage, name), payloads in groups.items():
+            pipe.rpush(self._queue_key(stage, name), *payloads)
+        lengths = await asyncio.to_thread(pipe.execute)
+
+        stages = {stage for stage, _ in groups}
+        full = {stage for (stage, _), length in zip(groups, lengths) if length >= self.max_pages}
+        for stage in sorted(full):
+            await self.flush(stage, full_only=True)
+        for stage in sorted(stages):
+            await self._schedule_flush(stage)
+
+    async def flush(self, stage: str, full_only: bool = False) -> int:
+        """Send the stage's waiting calls as batch tasks; returns how many batches were sent.
+
+        With ``full_only``, only complete batches are sent and the rest keep waiting for the timer.
+        """
+        from app.workers.celery_app import celery_app, message_priority
+
+        if not full_only:
+            # Calls arriving from now on need a new timer.
+            await asyncio.to_thread(self.redis.delete, self._timer_key(stage))
+        sent = 0
+        for name in PRIORITY_CLASSES:
+            key = self._queue_key(stage, name)
+            while True:
+                if full_only and await asyncio.to_thread(self.redis.llen, key) < self.max_pages:
+                    break
+                raw = await asyncio.to_thread(self.redis.lpop, key, self.max_pages)
+                if not raw:
+                    break
+                calls = [json.loads(item) for item in raw]
+                celery_app.send_task(
+                    STAGES[stage].batch_task_name,
+                    args=[calls],
+                    priority=message_priority(max(call["priority"] for call in calls)),
+                )
+                sent += 1
+                if len(raw) < self.max_pages:
+                    break
+        if sent:
+            logger.debug("batching.flushed", stage=stage, batches=sent)
+        return sent
+
+    async def waiting_keys(self, stages: Iterable[str]) -> Set[str]:
+        """Keys of the calls of ``stages`` that are waiting for a batch."""
+        pipe = self.redis.pipeline()
+        for stage in stages:
+            for name in PRIORITY_CLASSES:
+                pipe.lrange(self._queue_key(stage, name), 0, -1)
+        waiting = await asyncio.to_thread(pipe.execute)
+        return {json.loads(raw)["key"] for payloads in waiting for raw in payloads}
+
+    async def _schedule_flush(self, stage: str) -> None:
+        from app.workers.celery_app import celery_app, message_priority
+
+        wait_ms = max(int(self.settings.stage_batch_max_wait_ms), 1)
+        # The timer key outlives the flush by a margin only; if the flush task is lost, the next call re-arms it.
+        if not await asyncio.to_thread(self.redis.set, self._timer_key(stage), 1, nx=True, px=wait_ms * 4):
+            return
+        celery_app.send_task(
+            FLUSH_TASK,
+            args=[stage],
+            countdown=wait_ms / 1000,
+            priority=message_priority(_FLUSH_PRIORITY),
+        )
+
+
+def calls_from_payloads(payloads: Iterable[dict]) -> List[StageCall]:
+    return [StageCall(**payload) for payload in payloads]
+
+
+_stage_batching_service: StageBatchingService | None = None
+
+
+def get_stage_batching_service() -> StageBatchingService:
+    global _stage_batching_service
+    if _stage_batching_service is None:
+        _stage_batching_service = StageBatchingService()
+    return _stage_batching_service
@@ -0,0 +1,355 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import json
+import threading
+import time
+import zlib
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, Set, Tuple
+
+from fastapi import Response
+from pydantic import BaseModel
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config.settings import get_settings
+from app.schemas.cache_schema import CacheStatsResponse
+from app.utils.logger import get_logger
+from app.utils.redis_client import get_redis_client
+
+if TYPE_CHECKING:
+    from redis import Redis
+
+logger = get_logger(__name__)
+
+KEY_PREFIX = "cache"
+INVALIDATION_CHANNEL = f"{KEY_PREFIX}:invalidate"
+_SESSION_TAGS = "cache_tags"
+# Tag versions live in a fixed number of hashed slots so memory stays bounded; a collision only
+# makes an unrelated put look stale.
+_VERSION_SLOTS = 4096
+
+
+def job_tag(job_id: str) -> str:
+    return f"job:{job_id}"
+
+
+def patient_tag(hospital_id: str, patient_id: str) -> str:
+    return f"patient:{hospital_id}:{patient_id}"
+
+
+def cache_key(endpoint: str, *params: object) -> str:
+    digest = hashlib.sha1(json.dumps(params, default=str).encode("utf-8")).hexdigest()
+    return f"{endpoint}:{digest}"
+
+
+@dataclass
+class CacheEntry:
+    body: bytes
+    tags: Tuple[str, ...]
+    expires_at: float
+    gzipped: bool = False
+    etag: str | None = None
+
+    def response(self) -> Response:
+        return Response(content=self.body, media_type="application/json")
+
+    def dump(self) -> str:
+        return json.dumps(
+            {
+                "body": base64.b64encode(self.body).decode("ascii"),
+                "tags": self.tags,
+                "expires_at": self.expires_at,
+                "gzipped": self.gzipped,
+                "etag": self.etag,
+            }
+        )
+
+    @classmethod
+    def load(cls, raw: str) -> "CacheEntry":
+        data = json.loads(raw)
+        return cls(
+            body=base64.b64decode(data["body"]),
+            tags=tuple(data["tags"]),
+            expires_at=data["expires_at"],
+            gzipped=data["gzipped"],
+            etag=data["etag"],
+        )
+
+
+class ResponseCache:
+    """Serialized read-endpoint responses in a bounded in-process LRU with an optional Redis tier.
+
+    Entries carry tags (``job:<id>``, ``patient:<hospital>:<patient>``). Code that changes job or
+    document state calls :func:`mark_changed` on its session; the tags are invalidated once that
+    transaction commits, locally and - through Redis pub/sub - in every other API process. The TTL
+    only bounds staleness if an invalidation is ever lost.
+    """
+
+    def __init__(self) -> None:
+        self.settings = get_settings()
+        self.enabled = self.settings.response_cache_enabled
+        self.ttl = self.settings.response_cache_ttl_seconds
+        self.max_entries = self.settings.response_cache_max_entries
+        self.max_bytes = self.settings.response_cache_max_bytes
+        # Workers only publish invalidations; without Redis (local executor) everything is in-process.
+        self.uses_redis = self.settings.pipeline_executor != "local"
+        self.shared = self.uses_redis and self.settings.response_cache_shared
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._tag_keys: Dict[str, Set[str]] = {}
+        self._tag_versions = [0] * _VERSION_SLOTS
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = Counter()
+        self._captured: Set[str] | None = None
+        self._listener = None
+
+    @property
+    def redis(self) -> Redis | None:
+        # Built on first use: routes create the cache at import time, before anything needs Redis.
+        return get_redis_client() if self.uses_redis else None
+
+    # -- reads -----------------------------------------------------------------------------
+
+    async def get(self, key: str) -> CacheEntry | None:
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at > now:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry
+            if entry is not None:
+                self._drop(key)
+
+        if self.shared:
+            raw = await asyncio.to_thread(self.redis.get, self._redis_key(key))
+            if raw:
+                entry = CacheEntry.load(raw)
+                if entry.expires_at > now:
+                    with self._lock:
+                        self._store(key, entry)
+                        self._stats["shared_hits"] += 1
+                    return entry
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def marker(self, tags: Iterable[str]) -> Tuple[int, ...]:
+        """Tag versions before a read; ``put`` drops the entry if any of them moved meanwhile."""
+        with self._lock:
+            return tuple(self._tag_versions[_slot(tag)] for tag in tags)
+
+    async def put(
+        self,
+        key: str,
+        payload: BaseModel | bytes,
+        tags: Iterable[str],
+        marker: Tuple[int, ...],
+        gzipped: bool = False,
+        etag: str | None = None,
+        ttl: int | None = None,
+    ) -> CacheEntry:
+        tags = tuple(tags)
+        body = payload if isinstance(payload, bytes) else payload.model_dump_json().encode("utf-8")
+        entry = CacheEntry(body, tags, time.time() + (ttl or self.ttl), gzipped=gzipped, etag=etag)
+        if not self.enabled or len(body) > self.max_bytes:
+            return entry
+        with self._lock:
+            if tuple(self._tag_versions[_slot(tag)] for tag in tags) != marker:
+                # State changed while the response was being built; serve it but don't keep it.
+                self._stats["stale_puts"] += 1
+                return entry
+            self._store(key, entry)
+
+        if self.shared:
+            pipe = self.redis.pipeline()
+            pipe.set(self._redis_key(key), entry.dump(), ex=ttl or self.ttl)
+            for tag in tags:
+                pipe.sadd(self._tag_key(tag), key)
+                pipe.expire(self._tag_key(tag), ttl or self.ttl)
+            await asyncio.to_thread(pipe.execute)
+        return entry
+
+    # -- invalidation ----------------------------------------------------------------------
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        tags = set(tags)
+        if tags:
+            self.invalidate_here(tags)
+            self.publish(tags)
+
+    def invalidate_here(self, tags: Set[str]) -> None:
+        """Drop the tags' entries in this process only; no I/O."""
+        self._invalidate_local(tags)
+        if self._captured is not None:
+            self._captured.update(tags)
+
+    def publish(self, tags: Set[str]) -> None:
+        """Drop the tags' shared entries and tell the other processes; blocks on Redis."""
+        if self.redis is None:
+            return
+        try:
+            pipe = self.redis.pipeline()
+            if self.shared:
+                for tag in tags:
+                    keys = self.redis.smembers(self._tag_key(tag))
+                    if keys:
+                        pipe.delete(*(self._redis_key(key) for key in keys))
+                    pipe.delete(self._tag_key(tag))
+            pipe.publish(INVALIDATION_CHANNEL, json.dumps(sorted(tags)))
+            pipe.execute()
+        except Exception:
+            # Losing an invalidation only means serving until the TTL; never fail the write path.
+            logger.warning("cache.invalidate.publish_failed", tags=sorted(tags), exc_info=True)
+
+    def _invalidate_local(self, tags: Iterable[str]) -> None:
+        with self._lock:
+            for tag in tags:
+                self._tag_versions[_slot(tag)] += 1
+                for key in self._tag_keys.pop(tag, set()):
+                    if key in self._entries:
+                        self._drop(key)
+                        self._stats["invalidations"] += 1
+
+    @contextmanager
+    def capture(self) -> Iterator[Set[str]]:
+        """Collect the tags invalidated in this process, to be replayed by another one."""
+        self._captured = set()
+        try:
+            yield self._captured
+        finally:
+            self._captured = None
+
+    # -- lifecycle & metrics ---------------------------------------------------------------
+
+    def start(self) -> None:
+        """Subscribe to invalidations published by workers and other API processes."""
+        if self.redis is None or self._listener is not None or not self.enabled:
+            return
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{INVALIDATION_CHANNEL: self._on_message})
+        self._listener = pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+
+    def shutdown(self) -> None:
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+    def _on_message(self, message: dict) -> None:
+        self._invalidate_local(json.loads(message["data"]))
+
+    def stats(self) -> CacheStatsResponse:
+        with self._lock:
+            hits = self._stats["hits"] + self._stats["shared_hits"]
+            lookups = hits + self._stats["misses"]
+            return CacheStatsResponse(
+                enabled=self.enabled,
+                shared=self.shared,
+                entries=len(self._entries),
+                bytes=self._bytes,
+                max_entries=self.max_entries,
+                max_bytes=self.max_bytes,
+                hits=self._stats["hits"],
+                shared_hits=self._stats["shared_hits"],
+                misses=self._stats["misses"],
+                hit_ratio=hits / lookups if lookups else None,
+                evictions=self._stats["evictions"],
+                invalidations=self._stats["invalidations"],
+                stale_puts=self._stats["stale_puts"],
+            )
+
+    # -- internals (caller holds the lock) -------------------------------------------------
+
+    def _store(self, key: str, entry: CacheEntry) -> None:
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = entry
+        self._bytes += len(entry.body)
+        for tag in entry.tags:
+            self._tag_keys.setdefault(tag, set()).add(key)
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self._stats["evictions"] += 1
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry.body)
+        for tag in entry.tags:
+            keys = self._tag_keys.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_keys[tag]
+
+    @staticmethod
+    def _redis_key(key: str) -> str:
+        return f"{KEY_PREFIX}:entry:{key}"
+
+    @staticmethod
+    def _tag_key(tag: str) -> str:
+        return f"{KEY_PREFIX}:tag:{tag}"
+
+
+def _slot(tag: str) -> int:
+    return zlib.crc32(tag.encode("utf-8")) % _VERSION_SLOTS
+
+
+def mark_changed(session: AsyncSession | Session, *tags: str) -> None:
+    """Invalidate ``tags`` once the session's current transaction commits (and route their reads to the primary)."""
+    session.info.setdefault(_SESSION_TAGS, set()).update(tags)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session) -> None:
+    tags = session.info.pop(_SESSION_TAGS, None)
+    if tags:
+        from app.services.replica_service import get_replica_router
+
+        cache = get_response_cache()
+        router = get_replica_router()
+        cache.invalidate_here(tags)
+        router.note_writes(tags)
+        if cache.redis is not None:
+            _in_background(cache.publish, tags)
+        if router.redis is not None:
+            _in_background(router.publish_writes, tags)
+
+
+def _in_background(publish: Callable[[Set[str]], None], tags: Set[str]) -> None:
+    """Run a Redis publish off the event loop the commit ran on (inline when there is none).
+
+    The default executor rather than a task: ``asyncio.run`` waits for it on shutdown, so a Celery
+    task's invalidations still go out after its last commit.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        publish(tags)
+        return
+    loop.run_in_executor(None, publish, tags)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session: Session) -> None:
+    session.info.pop(_SESSION_TAGS, None)
+
+
+_response_cache: ResponseCache | None = None
+
+
+def get_response_cache() -> ResponseCache:
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache()
+    return _response_cache
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Iterable, Set
+
+from sqlalchemy import select
+
+from app.config.settings import get_settings
+from app.db.models.job import Job, JobStatusEnum
+from app.db.session import AsyncSessionLocal
+from app.utils.redis_client import get_redis_client
+
+KEY_PREFIX = "pipeline:cancelled"
+
+
+class CancellationService:
+    """Redis flags that running stage tasks poll before doing expensive work."""
+
+    def __init__(self) -> None:
+        self.settings = get_settings()
+        self.redis = get_redis_client()
+
+    @staticmethod
+    def _key(job_id: str) -> str:
+        return f"{KEY_PREFIX}:{job_id}"
+
+    async def cancel(self, job_id: str) -> None:
+        await asyncio.to_thread(
+            self.redis.set, self._key(job_id), 1, ex=self.settings.cancellation_flag_ttl_seconds
+        )
+
+    async def is_cancelled(self, job_id: str | None) -> bool:
+        if not job_id:
+            return False
+        return bool(await asyncio.to_thread(self.redis.exists, self._key(job_id)))
+
+    async def cancelled_among(self, job_ids: Iterable[str]) -> Set[str]:
+        unique = list(dict.fromkeys(job_ids))
+        if not unique:
+            return set()
+        flags = await asyncio.to_thread(self.redis.mget, [self._key(job_id) for job_id in unique])
+        return {job_id for job_id, flag in zip(unique, flags) if flag}
+
+
+class DatabaseCancellationService(CancellationService):
+    """Reads ``Job.status`` directly; used by the local executor, which runs without Redis."""
+
+    def __init__(self) -> None:
+        self.settings = get_settings()
+
+    async def cancel(self, job_id: str) -> None:
+        # The job row itself is the flag; ProcessingService.cancel_job commits the status.
+        return None
+
+    async def is_cancelled(self, job_id: str | None) -> bool:
+        if not job_id:
+            return False
+        return bool(await self.cancelled_among([job_id]))
+
+    async def cancelled_among(self, job_ids: Iterable[str]) -> Set[str]:
+        unique = list(dict.fromkeys(job_ids))
+        if not unique:
+            return set()
+        async with AsyncSessionLocal() as session:
+            rows = await session.scalars(
+                select(Job.job_id).where(Job.job_id.in_(unique), Job.status == JobStatusEnum.CANCELLED.value)
+            )
+            return set(rows)
+
+
+_cancellation_service: CancellationService | None = None
+
+
+def get_cancellation_service() -> CancellationService:
+    global _cancellation_service
+    if _cancellation_service is None:
+        if get_settings().pipeline_executor == "local":
+            _cancellation_service = DatabaseCancellationService()
+        else:
+            _cancellation_service = CancellationService()
+    return _cancellation_service
@@ -2,6 +2,11 @@ from __future__ import annotations
 
 import asyncio
 import re
+from typing import List, Sequence
+
+# Joins a batch of texts for one regex pass. Postgres text cannot contain NUL, and a NUL is a
+# non-word character, so no match can span two texts and word boundaries stay where they were.
+_BATCH_SEPARATOR = "\x00"
 
 
 class DeidService:
@@ -11,6 +16,17 @@ class DeidService:
         await asyncio.sleep(0)
         return self.PHI_PATTERN.sub("[REDACTED]", text)
 
+    async def redact_many(self, texts: Sequence[str]) -> List[str]:
+        """Redact a batch of texts with a single pass of the pattern."""
+        if not texts:
+            return []
+        await asyncio.sleep(0)
+        redacted = self.PHI_PATTERN.sub("[REDACTED]", _BATCH_SEPARATOR.join(texts)).split(_BATCH_SEPARATOR)
+        if len(redacted) != len(texts):
+            # A text carried a NUL of its own, so the split no longer lines up with the batch.
+            return [self.PHI_PATTERN.sub("[REDACTED]", text) for text in texts]
+        return redacted
+
 
 def get_deid_service() -> DeidService:
     return DeidService()
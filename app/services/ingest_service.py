@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+import asyncio
+import csv
+import io
+import mimetypes
+import os
+import tempfile
+import uuid
+import zipfile
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import PurePosixPath
+from typing import BinaryIO, Dict, List, Tuple
+
+from fastapi import UploadFile
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import get_settings
+from app.db.models.document import Document, DocumentStatusEnum
+from app.db.models.ingest_batch import IngestBatch, IngestBatchStatusEnum
+from app.db.models.job import Job, JobStatusEnum
+from app.pipeline.base import INGEST_STAGE, PROCESS_STAGE, Emit, StageCall
+from app.schemas.upload_schema import DocTypeEnum
+from app.services.cache_service import job_tag, mark_changed, patient_tag
+from app.services.storage_service import get_storage_service
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+INGEST_PREFIX = "ingest"
+MANIFEST_NAME = "manifest.csv"
+MANIFEST_COLUMNS = ("file", "patient_id", "hospital_id", "doc_type")
+_DOC_TYPES = {doc_type.value for doc_type in DocTypeEnum}
+
+
+class IngestError(Exception):
+    """Raised when an archive or manifest cannot be ingested at all."""
+
+
+@dataclass
+class ManifestRow:
+    # 1-based data row number in the manifest (the header is row 0).
+    number: int
+    file: str
+    patient_id: str
+    hospital_id: str
+    doc_type: str
+
+
+class IngestService:
+    """Bulk ingestion of a ZIP archive of documents described by a CSV manifest.
+
+    The request only stages the archive in object storage; the ingest stage then reads it entry by
+    entry, streams each document to storage, and creates jobs and documents one manifest chunk per
+    transaction. Progress is committed with each chunk, so a restarted ingestion resumes there.
+    """
+
+    def __init__(self) -> None:
+        self.settings = get_settings()
+        self.storage = get_storage_service()
+
+    async def create_batch(
+        self,
+        session: AsyncSession,
+        archive: UploadFile,
+        manifest: UploadFile | None,
+        priority: int,
+        auto_start: bool,
+    ) -> IngestBatch:
+        await asyncio.to_thread(_validate_upload, archive.file, manifest.file if manifest else None)
+
+        batch_id = str(uuid.uuid4())
+        batch = IngestBatch(
+            batch_id=batch_id,
+            status=IngestBatchStatusEnum.PENDING.value,
+            archive_path=f"{INGEST_PREFIX}/{batch_id}/archive.zip",
+            priority=priority,
+            auto_start=auto_start,
+            errors=[],
+        )
+        await self.storage.store_stream(batch.archive_path, archive.file, "application/zip", archive.size or -1)
+        if manifest is not None:
+            batch.manifest_path = f"{INGEST_PREFIX}/{batch_id}/{MANIFEST_NAME}"
+            await self.storage.store_stream(batch.manifest_path, manifest.file, "text/csv", manifest.size or -1)
+        session.add(batch)
+        await session.commit()
+        logger.info("ingest.batch.created", batch_id=batch_id, archive_bytes=archive.size)
+        return batch
+
+    async def run(self, session: AsyncSession, batch: IngestBatch, emit: Emit) -> None:
+        if batch.status in (IngestBatchStatusEnum.COMPLETED.value, IngestBatchStatusEnum.FAILED.value):
+            return
+        batch.status = IngestBatchStatusEnum.RUNNING.value
+        await session.commit()
+
+        try:
+            with tempfile.TemporaryDirectory(prefix="ingest-") as workdir:
+                archive_file = os.path.join(workdir, "archive.zip")
+                await self.storage.retrieve_to_file(batch.archive_path, archive_file)
+                manifest_file = None
+                if batch.manifest_path:
+                    manifest_file = os.path.join(workdir, MANIFEST_NAME)
+                    await self.storage.retrieve_to_file(batch.manifest_path, manifest_file)
+
+                with zipfile.ZipFile(archive_file) as archive:
+                    rows = await asyncio.to_thread(_read_manifest, archive, manifest_file)
+                    batch.rows_total = len(rows)
+                    chunk = self.settings.bulk_ingest_chunk_rows
+                    for start in range(batch.rows_done, len(rows), chunk):
+                        await self._ingest_chunk(session, batch, archive, rows[start : start + chunk], emit)
+        except Exception as exc:
+            await session.rollback()
+            # The rollback expired the batch; reload what the last committed chunk recorded.
+            await session.refresh(batch)
+            batch.status = IngestBatchStatusEnum.FAILED.value
+            batch.errors = [*batch.errors, {"row": batch.rows_done + 1, "file": None, "error": str(exc)}]
+            await session.commit()
+            logger.exception("ingest.batch.failed", batch_id=batch.batch_id, rows_done=batch.rows_done)
+            raise
+
+        batch.status = IngestBatchStatusEnum.COMPLETED.value
+        batch.completed_at = datetime.utcnow()
+        await session.commit()
+        logger.info(
+            "ingest.batch.completed",
+            batch_id=batch.batch_id,
+            documents=batch.documents_ingested,
+            failed=batch.documents_failed,
+            jobs=batch.jobs_created,
+        )
+
+    async def _ingest_chunk(
+        self,
+        session: AsyncSession,
+        batch: IngestBatch,
+        archive: zipfile.ZipFile,
+        rows: List[ManifestRow],
+        emit: Emit,
+    ) -> None:
+        valid: List[Tuple[ManifestRow, zipfile.ZipInfo]] = []
+        errors: List[dict] = []
+        for row in rows:
+            info, error = _check_row(row, archive)
+            if error:
+                errors.append({"row": row.number, "file": row.file, "error": error})
+            else:
+                valid.append((row, info))
+
+        # Entries stream from the archive into storage; only the in-flight reads are buffered.
+        semaphore = asyncio.Semaphore(self.settings.bulk_ingest_storage_concurrency)
+        paths: Dict[int, str] = {}
+
+        async def store(row: ManifestRow, info: zipfile.ZipInfo) -> None:
+            async with semaphore:
+                path = f"{_base_path(row)}/{PurePosixPath(info.filename).name}"
+                with archive.open(info) as entry:
+                    await self.storage.store_stream(path, entry, _content_type(info.filename), info.file_size)
+                paths[row.number] = path
+
+        await asyncio.gather(*(store(row, info) for row, info in valid))
+
+        by_patient: Dict[Tuple[str, str], List[ManifestRow]] = defaultdict(list)
+        for row, _ in valid:
+            by_patient[(row.hospital_id, row.patient_id)].append(row)
+
+        started = batch.auto_start
+        jobs: List[Job] = []
+        for (hospital_id, patient_id), patient_rows in by_patient.items():
+            job = Job(
+                job_id=str(uuid.uuid4()),
+                status=JobStatusEnum.PROCESSING.value if started else JobStatusEnum.PENDING.value,
+                priority=batch.priority,
+                documents_pending=len(patient_rows),
+                batch_id=batch.batch_id,
+            )
+            session.add(job)
+            jobs.append(job)
+            for row in patient_rows:
+                session.add(
+                    Document(
+                        job_id=job.job_id,
+                        patient_id=row.patient_id,
+                        hospital_id=row.hospital_id,
+                        doc_type=row.doc_type,
+                        file_path=_base_path(row),
+                        original_file_path=paths[row.number],
+                        status=DocumentStatusEnum.PROCESSING.value if started else DocumentStatusEnum.UPLOADED.value,
+                    )
+                )
+            mark_changed(session, job_tag(job.job_id), patient_tag(hospital_id, patient_id))
+
+        batch.rows_done += len(rows)
+        batch.documents_ingested += len(valid)
+        batch.documents_failed += len(errors)
+        batch.jobs_created += len(jobs)
+        if errors and len(batch.errors) < self.settings.bulk_ingest_max_errors:
+            batch.errors = [*batch.errors, *errors][: self.settings.bulk_ingest_max_errors]
+        await session.commit()
+        logger.info(
+            "ingest.chunk.committed",
+            batch_id=batch.batch_id,
+            rows_done=batch.rows_done,
+            rows_total=batch.rows_total,
+            jobs=len(jobs),
+            failed=len(errors),
+        )
+
+        # If the worker dies before this, the resume sweep restarts the committed jobs.
+        if started and jobs:
+            await emit([StageCall(PROCESS_STAGE, job.job_id, job_id=job.job_id, priority=job.priority) for job in jobs])
+
+    async def jobs(
+        self, session: AsyncSession, batch_id: str, limit: int, offset: int
+    ) -> Tuple[int, List[Tuple[Job, int]]]:
+        """The batch's jobs in creation order with their document counts, and the total job count."""
+        total = await session.scalar(select(func.count()).select_from(Job).where(Job.batch_id == batch_id))
+        documents = (
+            select(func.count()).select_from(Document).where(Document.job_id == Job.job_id).scalar_subquery()
+        )
+        rows = await session.execute(
+            select(Job, documents)
+            .where(Job.batch_id == batch_id)
+            .order_by(Job.created_at, Job.job_id)
+            .limit(limit)
+            .offset(offset)
+        )
+        return total or 0, [(job, count) for job, count in rows.tuples()]
+
+    async def unfinished_calls(self, session: AsyncSession, stale_after_seconds: int | None = None) -> List[StageCall]:
+        """Ingest calls for batches that are not finished (and have not progressed recently)."""
+        statement = select(IngestBatch.batch_id, IngestBatch.priority).where(
+            IngestBatch.status.in_([IngestBatchStatusEnum.PENDING.value, IngestBatchStatusEnum.RUNNING.value])
+        )
+        if stale_after_seconds is not None:
+            statement = statement.where(
+                IngestBatch.updated_at < datetime.utcnow() - timedelta(seconds=stale_after_seconds)
+            )
+        rows = (await session.execute(statement)).all()
+        return [StageCall(INGEST_STAGE, batch_id, priority=priority) for batch_id, priority in rows]
+
+
+def _validate_upload(archive: BinaryIO, manifest: BinaryIO | None) -> None:
+    """Reject what cannot be ingested before anything is stored; reads only the ZIP directory."""
+    if not zipfile.is_zipfile(archive):
+        raise IngestError("archive must be a ZIP file")
+    archive.seek(0)
+    if manifest is not None:
+        _check_header(io.TextIOWrapper(manifest, encoding="utf-8-sig", newline=""))
+        manifest.seek(0)
+        return
+    with zipfile.ZipFile(archive) as zf:
+        try:
+            entry = zf.open(MANIFEST_NAME)
+        except KeyError:
+            raise IngestError(f"no manifest uploaded and no {MANIFEST_NAME} in the archive") from None
+        with entry:
+            _check_header(io.TextIOWrapper(entry, encoding="utf-8-sig", newline=""))
+    archive.seek(0)
+
+
+def _check_header(text: io.TextIOWrapper) -> None:
+    try:
+        header = next(csv.reader(text), [])
+    finally:
+        text.detach()
+    missing = [column for column in MANIFEST_COLUMNS if column not in {name.strip() for name in header}]
+    if missing:
+        raise IngestError(f"manifest is missing columns: {', '.join(missing)}")
+
+
+def _read_manifest(archive: zipfile.ZipFile, manifest_file: str | None) -> List[ManifestRow]:
+    if manifest_file is not None:
+        with open(manifest_file, encoding="utf-8-sig", newline="") as handle:
+            return _parse_manifest(handle)
+    with archive.open(MANIFEST_NAME) as entry:
+        return _parse_manifest(io.TextIOWrapper(entry, encoding="utf-8-sig", newline=""))
+
+
+def _parse_manifest(text: io.TextIOBase) -> List[ManifestRow]:
+    reader = csv.DictReader(text)
+    reader.fieldnames = [name.strip() for name in reader.fieldnames or []]
+    return [
+        ManifestRow(
+            number=number,
+            file=(record.get("file") or "").strip(),
+            patient_id=(record.get("patient_id") or "").strip(),
+            hospital_id=(record.get("hospital_id") or "").strip(),
+            doc_type=(record.get("doc_type") or "").strip(),
+        )
+        for number, record in enumerate(reader, start=1)
+    ]
+
+
+def _check_row(row: ManifestRow, archive: zipfile.ZipFile) -> Tuple[zipfile.ZipInfo | None, str | None]:
+    if not row.patient_id or not row.hospital_id:
+        return None, "patient_id and hospital_id are required"
+    if len(row.patient_id) > 64 or len(row.hospital_id) > 64:
+        return None, "patient_id and hospital_id are limited to 64 characters"
+    if row.doc_type not in _DOC_TYPES:
+        return None, f"unknown doc_type {row.doc_type!r}"
+    try:
+        info = archive.getinfo(row.file)
+    except KeyError:
+        return None, "file not found in archive"
+    if info.is_dir() or info.file_size == 0:
+        return None, "file is empty"
+    return info, None
+
+
+def _base_path(row: ManifestRow) -> str:
+    return f"{row.hospital_id}/{row.patient_id}/{row.doc_type}"
+
+
+def _content_type(filename: str) -> str:
+    return mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+
+def get_ingest_service() -> IngestService:
+    return IngestService()
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+import tempfile
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.config.settings import get_settings
+from app.db.session import engine
+from app.services.storage_service import get_storage_service
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PARENT_TABLE = "logs"
+DEFAULT_PARTITION = "logs_default"
+_PARTITION_NAME = re.compile(r"^logs_p(\d{8})$")
+_ZSTD_LEVEL = 10
+
+
+@dataclass
+class MaintenanceReport:
+    created: List[str] = field(default_factory=list)
+    archived: List[str] = field(default_factory=list)
+    dropped: List[str] = field(default_factory=list)
+    default_rows_pruned: int = 0
+
+
+class LogRetentionService:
+    """Keeps the ``logs`` table a rolling window of daily partitions.
+
+    Each run creates the partitions for the coming days, then archives every partition older
+    than ``log_retention_days`` to object storage as zstd-compressed CSV (a ``COPY`` of the whole
+    partition) and drops it. Inserts always hit a small, recent partition, and dropping a day is
+    a catalog operation instead of a large ``DELETE``.
+    """
+
+    def __init__(self) -> None:
+        self.settings = get_settings()
+        self.storage = get_storage_service()
+
+    async def maintain(self, today: date | None = None) -> MaintenanceReport:
+        today = today or datetime.utcnow().date()
+        cutoff = today - timedelta(days=self.settings.log_retention_days)
+        report = MaintenanceReport()
+
+        async with engine.connect() as conn:
+            existing = await self._partitions(conn)
+            for offset in range(-1, self.settings.log_partition_days_ahead + 1):
+                day = today + timedelta(days=offset)
+                if day not in existing and day >= cutoff:
+                    report.created.append(await self._create_partition(conn, day))
+
+            for day, name in sorted(existing.items()):
+                if day >= cutoff:
+                    continue
+                if self.settings.log_archive_enabled:
+                    try:
+                        await self._archive(conn, day, name)
+                    except Exception:
+                        # Never drop what could not be archived; the next run tries again.
+                        logger.exception("logs.archive.failed", partition=name)
+                        continue
+                    report.archived.append(name)
+                await self._drop_partition(conn, name)
+                report.dropped.append(name)
+
+            async with conn.begin():
+                pruned = await conn.execute(
+                    text(f"DELETE FROM {DEFAULT_PARTITION} WHERE created_at < :cutoff"),
+                    {"cutoff": _utc_midnight(cutoff)},
+                )
+            report.default_rows_pruned = pruned.rowcount or 0
+
+        logger.info(
+            "logs.maintenance.completed",
+            created=len(report.created),
+            archived=len(report.archived),
+            dropped=len(report.dropped),
+            default_rows_pruned=report.default_rows_pruned,
+        )
+        return report
+
+    async def _partitions(self, conn: AsyncConnection) -> Dict[date, str]:
+        rows = await conn.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = CAST(:parent AS regclass)"
+            ),
+            {"parent": PARENT_TABLE},
+        )
+        names = rows.scalars().all()
+        await conn.rollback()
+        partitions: Dict[date, str] = {}
+        for name in names:
+            match = _PARTITION_NAME.match(name)
+            if match:
+                partitions[datetime.strptime(match.group(1), "%Y%m%d").date()] = name
+        return partitions
+
+    async def _create_partition(self, conn: AsyncConnection, day: date) -> str:
+        """Create the day's partition, moving any of its rows that already fell into the default."""
+        name = partition_name(day)
+        start, end = _utc_midnight(day), _utc_midnight(day + timedelta(days=1))
+        async with conn.begin():
+            await conn.execute(
+                text(f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+            )
+            await conn.execute(
+                text(
+                    f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+                    f"WHERE created_at >= :start AND created_at < :end RETURNING *) "
+                    f"INSERT INTO {name} SELECT * FROM moved"
+                ),
+                {"start": start, "end": end},
+            )
+            # Partition bounds are DDL and cannot be bound parameters; both are generated dates.
+            await conn.execute(
+                text(
+                    f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} "
+                    f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+                )
+            )
+        logger.info("logs.partition.created", partition=name)
+        return name
+
+    async def _archive(self, conn: AsyncConnection, day: date, name: str) -> str:
+        path = f"{self.settings.log_archive_prefix}/{day:%Y/%m}/{name}.csv.zst"
+        with tempfile.TemporaryDirectory(prefix="logs-archive-") as workdir:
+            csv_path = os.path.join(workdir, f"{name}.csv")
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.copy_from_table(name, output=csv_path, format="csv", header=True)
+            await conn.rollback()
+            archive_path = await asyncio.to_thread(_compress, csv_path)
+            with open(archive_path, "rb") as handle:
+                await self.storage.store_stream(path, handle, "application/zstd", os.path.getsize(archive_path))
+        logger.info("logs.partition.archived", partition=name, path=path)
+        return path
+
+    async def _drop_partition(self, conn: AsyncConnection, name: str) -> None:
+        async with conn.begin():
+            await conn.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+            await conn.execute(text(f"DROP TABLE {name}"))
+        logger.info("logs.partition.dropped", partition=name)
+
+
+def partition_name(day: date) -> str:
+    return f"logs_p{day:%Y%m%d}"
+
+
+def _utc_midnight(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+def _compress(csv_path: str) -> str:
+    import zstandard
+
+    archive_path = f"{csv_path}.zst"
+    with open(csv_path, "rb") as source, open(archive_path, "wb") as target:
+        zstandard.ZstdCompressor(level=_ZSTD_LEVEL).copy_stream(source, target)
+    return archive_path
+
+
+def get_log_retention_service() -> LogRetentionService:
+    return LogRetentionService()
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import Iterable
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models.log_entry import LogEntry
@@ -18,6 +20,17 @@ class LogService:
         session.add(entry)
         await session.flush()
 
+    async def record_many(
+        self,
+        session: AsyncSession,
+        level: str,
+        message: str,
+        document_ids: Iterable[str | None],
+    ) -> None:
+        """One entry per document id, written in a single flush."""
+        session.add_all(LogEntry(level=level, message=message, document_id=document_id) for document_id in document_ids)
+        await session.flush()
+
 
 def get_log_service() -> LogService:
     return LogService()
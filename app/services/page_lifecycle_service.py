@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Sequence
+
+from sqlalchemy import Row, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import get_settings
+from app.db.models.document import Document, DocumentStatusEnum
+from app.db.models.document_page import DocumentPage
+from app.db.session import AsyncSessionLocal
+from app.services.storage_service import get_storage_service
+from app.utils.image_utils import downsample_image, image_format
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+TIERING_RULE_ID = "page-archive-tiering"
+
+
+@dataclass
+class CompactionReport:
+    documents: int = 0
+    pages: int = 0
+    # Base64 text cleared from Postgres, and what was written to object storage for it.
+    bytes_freed: int = 0
+    bytes_archived: int = 0
+
+    def add(self, other: "CompactionReport") -> None:
+        self.documents += other.documents
+        self.pages += other.pages
+        self.bytes_freed += other.bytes_freed
+        self.bytes_archived += other.bytes_archived
+
+
+class PageLifecycleService:
+    """Moves page images out of Postgres once their document is completed, and back on demand.
+
+    ``image_base64`` is only read by OCR and duplicate screening. Compaction writes the image of
+    every page of a completed document to object storage under ``page_archive_prefix``
+    (downsampled if ``page_archive_max_dimension`` is set), records the object in ``image_path``
+    and clears the column. :meth:`rehydrate` puts the images back before a document is
+    reprocessed; stages that meet a compacted page read the archived copy (:meth:`load_image`).
+    """
+
+    _tiering_ready = False
+
+    def __init__(self) -> None:
+        self.settings = get_settings()
+        self.storage = get_storage_service()
+
+    async def compact_job(self, session: AsyncSession, job_id: str) -> CompactionReport:
+        documents = (
+            await session.scalars(
+                select(Document).where(
+                    Document.job_id == job_id,
+                    Document.status == DocumentStatusEnum.COMPLETED.value,
+                )
+            )
+        ).all()
+        report = CompactionReport()
+        for document in documents:
+            report.add(await self.compact_document(session, document))
+        logger.info(
+            "lifecycle.job.compacted",
+            job_id=job_id,
+            pages=report.pages,
+            bytes_freed=report.bytes_freed,
+            bytes_archived=report.bytes_archived,
+        )
+        return report
+
+    async def compact_document(self, session: AsyncSession, document: Document) -> CompactionReport:
+        """Archive and clear the document's inline page images, one committed chunk at a time."""
+        await self._ensure_tiering()
+        report = CompactionReport(documents=1)
+        while True:
+            rows = (
+                await session.execute(
+                    select(
+                        DocumentPage.page_id,
+                        DocumentPage.page_number,
+                        DocumentPage.image_base64,
+                        DocumentPage.image_path,
+                    )
+                    .where(DocumentPage.document_id == document.document_id, DocumentPage.image_base64.is_not(None))
+                    .order_by(DocumentPage.page_number)
+                    .limit(self.settings.page_compaction_batch_pages)
+                )
+            ).all()
+            if not rows:
+                break
+            archived = await self._archive(document, rows)
+            await session.execute(
+                update(DocumentPage),
+                [{"page_id": page_id, "image_base64": None, "image_path": path} for page_id, path, _ in archived],
+            )
+            await session.commit()
+            report.pages += len(rows)
+            report.bytes_freed += sum(len(row.image_base64) for row in rows)
+            report.bytes_archived += sum(size for _, _, size in archived)
+        return report
+
+    async def sweep(self) -> CompactionReport:
+        """Compact completed documents the on-completion pass missed, oldest first."""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.settings.page_compaction_delay_seconds)
+        report = CompactionReport()
+        async with AsyncSessionLocal() as session:
+            inline = select(DocumentPage.page_id).where(
+                DocumentPage.document_id == Document.document_id, DocumentPage.image_base64.is_not(None)
+            )
+            documents = (
+                await session.scalars(
+                    select(Document)
+                    .where(
+                        Document.status == DocumentStatusEnum.COMPLETED.value,
+                        Document.updated_at < cutoff,
+                        inline.exists(),
+                    )
+                    .order_by(Document.updated_at)
+                    .limit(self.settings.page_compaction_sweep_documents)
+                )
+            ).all()
+            for document in documents:
+                try:
+                    report.add(await self.compact_document(session, document))
+                except Exception:
+                    await session.rollback()
+                    logger.exception("lifecycle.document.compaction_failed", document_id=document.document_id)
+        logger.info(
+            "lifecycle.sweep.completed",
+            documents=report.documents,
+            pages=report.pages,
+            bytes_freed=report.bytes_freed,
+            bytes_archived=report.bytes_archived,
+        )
+        return report
+
+    async def rehydrate(self, session: AsyncSession, document: Document) -> int:
+        """Restore the inline images of the document's compacted pages; returns how many."""
+        restored = 0
+        semaphore = asyncio.Semaphore(self.settings.page_archive_storage_concurrency)
+
+        async def fetch(page_id: str, path: str) -> dict:
+            async with semaphore:
+                data = await self.storage.retrieve_file(path)
+            return {"page_id": page_id, "image_base64": base64.b64encode(data).decode("utf-8")}
+
+        while True:
+            # The archived copy is kept, so a later compaction only has to clear the column again.
+            rows = (
+                await session.execute(
+                    select(DocumentPage.page_id, DocumentPage.image_path)
+                    .where(
+                        DocumentPage.document_id == document.document_id,
+                        DocumentPage.image_base64.is_(None),
+                        DocumentPage.image_path.is_not(None),
+                    )
+                    .order_by(DocumentPage.page_number)
+                    .limit(self.settings.page_compaction_batch_pages)
+                )
+            ).all()
+            if not rows:
+                break
+            values = await asyncio.gather(*(fetch(page_id, path) for page_id, path in rows))
+            await session.execute(update(DocumentPage), values)
+            await session.commit()
+            restored += len(rows)
+        logger.info("lifecycle.document.rehydrated", document_id=document.document_id, pages=restored)
+        return restored
+
+    async def load_image(self, image_base64: str | None, image_path: str | None) -> bytes:
+        """A page's image, from the row or, once compacted, from its archived copy."""
+        if image_base64 is not None:
+            return base64.b64decode(image_base64)
+        if image_path is not None:
+            return await self.storage.retrieve_file(image_path)
+        return b""
+
+    def archive_path(self, document: Document, page_number: int, extension: str) -> str:
+        return (
+            f"{self.settings.page_archive_prefix}/{document.hospital_id}/{document.patient_id}/"
+            f"{document.document_id}/page_{page_number:04d}{extension}"
+        )
+
+    async def _archive(self, document: Document, rows: Sequence[Row]) -> List[tuple[str, str, int]]:
+        """Upload the pages' images; returns ``(page_id, image_path, bytes stored)`` per page."""
+        semaphore = asyncio.Semaphore(self.settings.page_archive_storage_concurrency)
+
+        async def store(row: Row) -> tuple[str, str, int]:
+            if row.image_path:
+                # Rehydrated for a reprocess; the archived copy is still in place.
+                return row.page_id, row.image_path, 0
+            data, extension, content_type = await asyncio.to_thread(self._archival_copy, row.image_base64)
+            path = self.archive_path(document, row.page_number, extension)
+            async with semaphore:
+                await self.storage.store_file(path, data, content_type)
+            return row.page_id, path, len(data)
+
+        return list(await asyncio.gather(*(store(row) for row in rows)))
+
+    def _archival_copy(self, image_base64: str) -> tuple[bytes, str, str]:
+        data = base64.b64decode(image_base64)
+        if self.settings.page_archive_max_dimension:
+            data = downsample_image(data, self.settings.page_archive_max_dimension)
+        extension, content_type = image_format(data)
+        return data, extension, content_type
+
+    async def _ensure_tiering(self) -> None:
+        if not self.settings.page_archive_tier or PageLifecycleService._tiering_ready:
+            return
+        try:
+            await self.storage.ensure_tiering(
+                TIERING_RULE_ID,
+                f"{self.settings.page_archive_prefix}/",
+                self.settings.page_archive_transition_days,
+                self.settings.page_archive_tier,
+            )
+        except Exception:
+            # Tiering is an optimisation; images are archived either way and the next run retries.
+            logger.exception("lifecycle.tiering.failed", tier=self.settings.page_archive_tier)
+            return
+        PageLifecycleService._tiering_ready = True
+
+
+def get_page_lifecycle_service() -> PageLifecycleService:
+    return PageLifecycleService()
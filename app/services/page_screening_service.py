@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import get_settings
+from app.db.models.document import Document
+from app.db.models.document_page import DocumentPage, PageStageEnum
+from app.services.page_lifecycle_service import get_page_lifecycle_service
+from app.services.progress_service import StageAdvance, get_progress_service
+from app.services.text_store_service import get_text_store_service
+from app.utils.logger import get_logger
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from app.utils.page_fingerprint import PageFingerprint
+
+logger = get_logger(__name__)
+
+
+# (hospital_id, patient_id): pages are only ever matched against the same patient's pages.
+Patient = Tuple[str, str]
+
+
+@dataclass
+class _PatientPages:
+    page_ids: List[str] = field(default_factory=list)
+    hashes: np.ndarray | None = None
+
+
+@dataclass
+class DuplicateIndex:
+    """Perceptual hashes of the job's pages that went through OCR, per patient in insertion order."""
+
+    # NumPy is imported with the first page, so API processes that never screen don't load it.
+    patients: Dict[Patient, _PatientPages] = field(default_factory=dict)
+    digests: Dict[str, str] = field(default_factory=dict)
+
+    def add(self, patient: Patient, page_id: str, phash: int, digest: str | None = None) -> None:
+        import numpy as np
+
+        pages = self.patients.setdefault(patient, _PatientPages())
+        if pages.hashes is None:
+            pages.hashes = np.empty(0, dtype=np.uint64)
+        pages.page_ids.append(page_id)
+        pages.hashes = np.append(pages.hashes, _unsigned(phash))
+        if digest is not None:
+            self.digests[page_id] = digest
+
+    def candidates(self, patient: Patient, phash: int, max_distance: int) -> List[str]:
+        pages = self.patients.get(patient)
+        if pages is None or not pages.page_ids:
+            return []
+        import numpy as np
+
+        distances = np.bitwise_count(pages.hashes ^ _unsigned(phash))
+        order = np.argsort(distances, kind="stable")
+        return [pages.page_ids[i] for i in order if distances[i] <= max_distance]
+
+
+def _unsigned(phash: int) -> np.uint64:
+    import numpy as np
+
+    return np.uint64(phash & 0xFFFFFFFFFFFFFFFF)
+
+
+class PageScreeningService:
+    """Keeps blank pages and repeats of earlier pages of the same job out of OCR.
+
+    Each rasterized page gets an ink-coverage score, a perceptual hash and a digest of its pixels.
+    Blank pages are carried straight to de-identified with empty texts. The hash only narrows the
+    search to the same patient's earlier pages of the job: pages differing in a few characters
+    share it. A candidate with the same pixel digest is the same page; the new page is linked to
+    it and receives copies of its texts once the original is de-identified.
+    """
+
+    def __init__(self) -> None:
+        self.settings = get_settings()
+        self.enabled = self.settings.page_screening_enabled
+        self.progress = get_progress_service()
+        self.text_store = get_text_store_service()
+
+    def fingerprint(self, image_bytes: bytes) -> PageFingerprint | None:
+        """Called off the event loop; images PIL cannot read are simply not screened."""
+        if not self.enabled:
+            return None
+        from app.utils.page_fingerprint import fingerprint
+
+        try:
+            return fingerprint(image_bytes)
+        except Exception:
+            logger.warning("screening.fingerprint.failed", exc_info=True)
+            return None
+
+    def is_blank(self, fp: PageFingerprint) -> bool:
+        return fp.ink <= self.settings.page_blank_max_ink
+
+    async def load_index(self, session: AsyncSession, job_id: str) -> DuplicateIndex:
+        """Index of the job's already stored originals, for a resumed run."""
+        index = DuplicateIndex()
+        rows = await session.execute(
+            select(Document.hospital_id, Document.patient_id, DocumentPage.page_id, DocumentPage.phash)
+            .join(Document, DocumentPage.document_id == Document.document_id)
+            .where(
+                Document.job_id == job_id,
+                DocumentPage.phash.is_not(None),
+                DocumentPage.skip_reason.is_(None),
+            )
+            .order_by(DocumentPage.created_at)
+        )
+        for hospital_id, patient_id, page_id, phash in rows.tuples():
+            index.add((hospital_id, patient_id), page_id, phash)
+        return index
+
+    async def find_duplicate(
+        self,
+        session: AsyncSession,
+        index: DuplicateIndex,
+        patient: Patient,
+        fp: PageFingerprint,
+    ) -> str | None:
+        for page_id in index.candidates(patient, fp.phash, self.settings.page_duplicate_max_distance):
+            digest = index.digests.get(page_id)
+            if digest is None:
+                # Original stored by an earlier run: fingerprint its image once.
+                image = (
+                    await session.execute(
+                        select(DocumentPage.image_base64, DocumentPage.image_path).where(
+                            DocumentPage.page_id == page_id
+                        )
+                    )
+                ).one()
+                data = await get_page_lifecycle_service().load_image(*image)
+                original = await asyncio.to_thread(self.fingerprint, data)
+                if original is None:
+                    continue
+                digest = index.digests[page_id] = original.digest
+            if digest == fp.digest:
+                return page_id
+        return None
+
+    async def original_ready(self, session: AsyncSession, original_id: str) -> bool:
+        """Whether the original is de-identified, so a new duplicate can take its texts right away.
+
+        The share lock orders this against the original's de-identification: either that commits
+        first and is seen here, or it waits for this transaction and then finds the duplicate in
+        :meth:`resolve_duplicates`. Take it before writing any document rows to avoid lock cycles.
+        """
+        stage = await session.scalar(
+            select(DocumentPage.stage).where(DocumentPage.page_id == original_id).with_for_update(read=True)
+        )
+        return stage == PageStageEnum.DEIDENTIFIED.value
+
+    async def resolve_duplicates(self, session: AsyncSession, page_id: str) -> StageAdvance | None:
+        """Give the de-identified page's waiting duplicates its texts; returns the last advance."""
+        waiting = (
+            await session.scalars(
+                select(DocumentPage.page_id).where(
+                    DocumentPage.duplicate_of == page_id,
+                    DocumentPage.stage == PageStageEnum.RASTERIZED.value,
+                )
+            )
+        ).all()
+        if not waiting:
+            return None
+        return await self.copy_texts(session, page_id, waiting)
+
+    async def resolve_duplicates_many(self, session: AsyncSession, page_ids: List[str]) -> List[StageAdvance]:
+        """:meth:`resolve_duplicates` for a batch of de-identified pages, found in one query."""
+        waiting = await session.execute(
+            select(DocumentPage.duplicate_of, DocumentPage.page_id)
+            .where(
+                DocumentPage.duplicate_of.in_(page_ids),
+                DocumentPage.stage == PageStageEnum.RASTERIZED.value,
+            )
+            .order_by(DocumentPage.duplicate_of)
+        )
+        by_original: Dict[str, List[str]] = {}
+        for original_id, page_id in waiting.tuples():
+            by_original.setdefault(original_id, []).append(page_id)
+        advances: List[StageAdvance] = []
+        for original_id, duplicates in by_original.items():
+            advance = await self.copy_texts(session, original_id, duplicates)
+            if advance:
+                advances.append(advance)
+        return advances
+
+    async def copy_texts(self, session: AsyncSession, original_id: str, page_ids: List[str]) -> StageAdvance | None:
+        """Store the original's texts on each duplicate and carry it to de-identified."""
+        texts = (await self.text_store.load_many(session, [original_id])).get(original_id)
+        advance = None
+        for page_id in page_ids:
+            if texts is not None:
+                await self.text_store.save_raw(session, page_id, texts.raw or "")
+                await self.text_store.save_spellchecked(session, page_id, texts.spellchecked or "", texts.raw or "")
+                await self.text_store.save_deidentified(session, page_id, texts.deid or "", texts.spellchecked or "")
+            advance = await self.progress.skip_page(session, page_id) or advance
+        logger.info("screening.duplicates.resolved", original_id=original_id, pages=len(page_ids))
+        return advance
+
+
+def get_page_screening_service() -> PageScreeningService:
+    return PageScreeningService()
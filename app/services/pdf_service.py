@@ -1,14 +1,31 @@
 from __future__ import annotations
 
-from typing import List
+from typing import Dict, List
 
-from app.utils.pdf_to_image import pdf_bytes_to_images
+from app.config.settings import get_settings
+from app.utils.pdf_text import extract_text_layer
+from app.utils.pdf_to_image import pdf_bytes_to_images, pdf_page_count, render_pdf_pages
 
 
 class PdfService:
+    def __init__(self) -> None:
+        self.settings = get_settings()
+
     async def convert_pdf_to_images(self, pdf_bytes: bytes) -> List[bytes]:
         return await pdf_bytes_to_images(pdf_bytes)
 
+    async def page_count(self, pdf_bytes: bytes) -> int:
+        return await pdf_page_count(pdf_bytes)
+
+    async def render_pages(self, pdf_bytes: bytes, first_page: int, last_page: int, output_folder: str) -> List[str]:
+        return await render_pdf_pages(pdf_bytes, first_page, last_page, output_folder)
+
+    async def text_layer(self, pdf_bytes: bytes) -> Dict[int, str]:
+        """Usable embedded text by page number; those pages need neither rasterizing nor OCR."""
+        if not self.settings.pdf_text_layer_enabled:
+            return {}
+        return await extract_text_layer(pdf_bytes, self.settings.pdf_text_layer_min_chars)
+
 
 def get_pdf_service() -> PdfService:
     return PdfService()
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Dict
+
+from app.config.settings import get_settings
+from app.utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from app.utils.image_preprocess import PreprocessProfile
+
+logger = get_logger(__name__)
+
+
+class PreprocessService:
+    """Prepares page images for OCR according to the document type's profile.
+
+    The NumPy work runs in a small spawn-based process pool so it neither holds the GIL against
+    the event loop nor competes with it. Daemonic processes (Celery prefork children) cannot
+    start a pool; there, and with ``ocr_preprocess_workers = 0``, it runs in a thread instead.
+    """
+
+    def __init__(self) -> None:
+        # NumPy and PIL come in with the first OCR call rather than with the API.
+        from app.utils.image_preprocess import PROFILES, PreprocessProfile
+
+        self.settings = get_settings()
+        self.enabled = self.settings.ocr_preprocess_enabled
+        self.profiles: Dict[str, PreprocessProfile] = dict(PROFILES)
+        for doc_type, overrides in self.settings.ocr_preprocess_profiles.items():
+            self.profiles[doc_type] = PreprocessProfile.from_dict(overrides, self.profiles.get(doc_type))
+        self._pool: ProcessPoolExecutor | None = None
+
+    def profile(self, doc_type: str | None) -> PreprocessProfile:
+        from app.utils.image_preprocess import DEFAULT_PROFILE
+
+        return self.profiles.get(doc_type or "", DEFAULT_PROFILE)
+
+    async def preprocess(self, image_bytes: bytes, doc_type: str | None) -> bytes:
+        if not self.enabled or not image_bytes:
+            return image_bytes
+        from app.utils.image_preprocess import preprocess_image
+
+        profile = self.profile(doc_type)
+        started = time.perf_counter()
+        pool = self._get_pool()
+        if pool is None:
+            processed = await asyncio.to_thread(preprocess_image, image_bytes, profile)
+        else:
+            processed = await asyncio.get_running_loop().run_in_executor(pool, preprocess_image, image_bytes, profile)
+        logger.debug(
+            "ocr.preprocess.done",
+            doc_type=doc_type,
+            ms=round((time.perf_counter() - started) * 1000, 1),
+            bytes_in=len(image_bytes),
+            bytes_out=len(processed),
+        )
+        return processed
+
+    def _get_pool(self) -> ProcessPoolExecutor | None:
+        workers = self.settings.ocr_preprocess_workers
+        if workers == 0 or multiprocessing.current_process().daemon:
+            return None
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+
+_preprocess_service: PreprocessService | None = None
+
+
+def get_preprocess_service() -> PreprocessService:
+    global _preprocess_service
+    if _preprocess_service is None:
+        _preprocess_service = PreprocessService()
+    return _preprocess_service
@@ -1,33 +1,110 @@
 from __future__ import annotations
 
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models.document import Document, DocumentStatusEnum
-from app.db.models.job import Job, JobStatusEnum
+from app.db.models.document_page import DocumentPage
+from app.db.models.job import DEFAULT_PRIORITY, Job, JobStatusEnum
+from app.pipeline.base import PROCESS_STAGE, StageCall
+from app.pipeline.executors import get_executor
+from app.services.cache_service import job_tag, mark_changed, patient_tag
+from app.services.cancellation_service import get_cancellation_service
+from app.services.progress_feed_service import notify_progress
 from app.utils.logger import get_logger
-from app.workers.tasks.process_document_task import process_job_task
 
 logger = get_logger(__name__)
 
+TERMINAL_JOB_STATUSES = (
+    JobStatusEnum.COMPLETED.value,
+    JobStatusEnum.FAILED.value,
+    JobStatusEnum.CANCELLED.value,
+)
+
+
+class JobStateError(Exception):
+    """Raised when a job is not in a state that allows the requested transition."""
+
 
 class ProcessingService:
-    async def start_job(self, session: AsyncSession, job_id: str) -> None:
+    async def start_job(
+        self,
+        session: AsyncSession,
+        job_id: str,
+        priority: int = DEFAULT_PRIORITY,
+        only_if_pending: bool = False,
+        profile: str | None = None,
+        callback_url: str | None = None,
+    ) -> bool:
+        """Move the job to PROCESSING and submit it; returns False if ``only_if_pending`` found it started."""
         job = await session.scalar(select(Job).where(Job.job_id == job_id))
         if not job:
             raise ValueError(f"Job {job_id} not found")
+        if job.status == JobStatusEnum.CANCELLED.value:
+            # Cancellation is final: the job's task ids stay revoked on the workers.
+            raise JobStateError(f"Job {job_id} was cancelled")
 
-        job.status = JobStatusEnum.PROCESSING.value
+        values = {"status": JobStatusEnum.PROCESSING.value, "priority": priority, "profile_mode": profile}
+        if callback_url is not None:
+            # Otherwise a webhook registered at upload stays in place.
+            values["callback_url"] = callback_url
+        statement = (
+            update(Job)
+            .where(Job.job_id == job_id, Job.status != JobStatusEnum.CANCELLED.value)
+            .values(values)
+            .returning(Job.job_id)
+        )
+        if only_if_pending:
+            # Concurrent status polls race to start the job; only one of them may submit it.
+            statement = statement.where(Job.status == JobStatusEnum.PENDING.value)
+        if await session.scalar(statement) is None:
+            await session.rollback()
+            return False
 
         documents = (await session.scalars(select(Document).where(Document.job_id == job_id))).all()
         for doc in documents:
             doc.status = DocumentStatusEnum.PROCESSING.value
+        mark_changed(session, job_tag(job_id), *{patient_tag(doc.hospital_id, doc.patient_id) for doc in documents})
+        await notify_progress(session, job_id=job_id, job_status=JobStatusEnum.PROCESSING.value)
+
+        await session.commit()
+        logger.info("processing.job.queued", job_id=job_id, priority=priority, profile=profile)
+        await get_executor().submit(
+            [StageCall(PROCESS_STAGE, job_id, job_id=job_id, priority=priority, profile=profile)]
+        )
+        return True
+
+    async def cancel_job(self, session: AsyncSession, job_id: str) -> int:
+        """Mark the job cancelled and withdraw its queued work; returns what the executor reports withdrawn."""
+        job = await session.scalar(select(Job).where(Job.job_id == job_id))
+        if not job:
+            raise ValueError(f"Job {job_id} not found")
+        if job.status in TERMINAL_JOB_STATUSES:
+            raise JobStateError(f"Job {job_id} is already {job.status}")
 
+        # Flag first so running stage tasks stop at their next checkpoint.
+        await get_cancellation_service().cancel(job_id)
+
+        job.status = JobStatusEnum.CANCELLED.value
+        documents = (await session.scalars(select(Document).where(Document.job_id == job_id))).all()
+        for doc in documents:
+            if doc.status != DocumentStatusEnum.COMPLETED.value:
+                doc.status = DocumentStatusEnum.CANCELLED.value
+        mark_changed(session, job_tag(job_id), *{patient_tag(doc.hospital_id, doc.patient_id) for doc in documents})
+        await notify_progress(session, job_id=job_id, job_status=JobStatusEnum.CANCELLED.value)
+        page_ids = (
+            await session.scalars(
+                select(DocumentPage.page_id)
+                .join(Document, DocumentPage.document_id == Document.document_id)
+                .where(Document.job_id == job_id)
+            )
+        ).all()
         await session.commit()
-        logger.info("processing.job.queued", job_id=job_id)
-        process_job_task.delay(job_id)
+
+        withdrawn = await get_executor().cancel(job_id, page_ids)
+        logger.info("processing.job.cancelled", job_id=job_id, pages=len(page_ids), withdrawn=withdrawn)
+        return withdrawn
 
 
 def get_processing_service() -> ProcessingService:
     return ProcessingService()
-
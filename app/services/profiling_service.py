@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import AsyncIterator, List
+
+from app.config.settings import get_settings
+from app.services.storage_service import get_storage_service
+from app.utils.logger import get_logger
+from app.utils.profiler import PROFILE_MODES, Profiler, create_profiler
+
+logger = get_logger(__name__)
+
+# Profiles of requests that are not about a particular job.
+NO_JOB = "_requests"
+
+
+@dataclass
+class ProfileRun:
+    mode: str
+    label: str
+    profiler: Profiler
+    job_id: str | None = None
+    started_at: float = field(default_factory=time.time)
+    run_id: str = field(default_factory=lambda: uuid.uuid4().hex[:8])
+
+    @property
+    def name(self) -> str:
+        stamp = datetime.utcfromtimestamp(self.started_at).strftime("%Y%m%dT%H%M%S")
+        return f"{stamp}-{self.label}-{self.run_id}.{self.profiler.extension}"
+
+
+@dataclass
+class ProfileInfo:
+    name: str
+    size: int
+    last_modified: datetime | None
+
+
+class ProfilingService:
+    """Opt-in profiles of single API requests and stage calls, stored per job in object storage.
+
+    Nothing here runs unless a request carries the profile header or a job was started with a
+    profile mode; the callers check for that before touching this service.
+    """
+
+    def __init__(self) -> None:
+        self.settings = get_settings()
+        self.storage = get_storage_service()
+
+    def accepts(self, mode: str | None) -> bool:
+        return self.settings.profiling_enabled and mode in PROFILE_MODES
+
+    def start(self, mode: str, label: str, job_id: str | None = None) -> ProfileRun | None:
+        if not self.accepts(mode):
+            return None
+        profiler = create_profiler(mode, self.settings.profiling_sample_interval_ms / 1000)
+        if not profiler.start():
+            logger.warning("profiling.busy", mode=mode, label=label, job_id=job_id)
+            return None
+        return ProfileRun(mode=mode, label=label, profiler=profiler, job_id=job_id)
+
+    async def finish(self, run: ProfileRun) -> str | None:
+        """Stop the profiler and store its output; storage failures never fail the profiled work."""
+        data = run.profiler.stop()
+        path = self.path(run.job_id, run.name)
+        try:
+            await self.storage.store_file(path, data, "application/octet-stream")
+        except Exception:
+            logger.exception("profiling.store_failed", path=path)
+            return None
+        logger.info(
+            "profiling.stored",
+            path=path,
+            mode=run.mode,
+            label=run.label,
+            ms=round((time.time() - run.started_at) * 1000, 1),
+        )
+        return path
+
+    @asynccontextmanager
+    async def profile(self, mode: str, label: str, job_id: str | None = None) -> AsyncIterator[ProfileRun | None]:
+        run = self.start(mode, label, job_id)
+        try:
+            yield run
+        finally:
+            if run is not None:
+                await self.finish(run)
+
+    def path(self, job_id: str | None, name: str = "") -> str:
+        return f"{self.settings.profiling_storage_prefix}/{job_id or NO_JOB}/{name}"
+
+    async def list_profiles(self, job_id: str) -> List[ProfileInfo]:
+        prefix = self.path(job_id)
+        objects = await self.storage.list_files(prefix)
+        profiles = [ProfileInfo(name=name[len(prefix) :], size=size, last_modified=modified) for name, size, modified in objects]
+        return sorted(profiles, key=lambda profile: profile.name)
+
+    async def fetch(self, job_id: str, name: str) -> bytes:
+        if "/" in name or name.startswith("."):
+            raise ValueError(f"Invalid profile name {name!r}")
+        return await self.storage.retrieve_file(self.path(job_id, name))
+
+
+_profiling_service: ProfilingService | None = None
+
+
+def get_profiling_service() -> ProfilingService:
+    global _profiling_service
+    if _profiling_service is None:
+        _profiling_service = ProfilingService()
+    return _profiling_service
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Iterator, List, Set
+
+from sqlalchemy import func, make_url, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import get_settings
+from app.db.models.document_page import PageStageEnum
+from app.db.models.job import JobStatusEnum
+from app.utils.logger import get_logger
+
+if TYPE_CHECKING:
+    import asyncpg
+
+logger = get_logger(__name__)
+
+# Pages of a job were marked blank or duplicate; the event carries no counts.
+SCREENED = "screened"
+
+# Page stage reached -> the DocumentProgress counter that carries it.
+_COUNTERS = {
+    PageStageEnum.OCR_DONE.value: "pages_ocr_done",
+    PageStageEnum.SPELLCHECKED.value: "pages_spellchecked",
+    PageStageEnum.DEIDENTIFIED.value: "pages_done",
+}
+# NOTIFY payloads must stay under 8000 bytes; past this the page ids are left out.
+_MAX_PAYLOAD = 7000
+
+
+async def notify_progress(session: AsyncSession, **event: object) -> None:
+    """Publish ``event`` (always with a ``job_id``) to the API processes once the transaction commits."""
+    settings = get_settings()
+    if not settings.progress_notify_enabled:
+        return
+    payload = json.dumps(event, separators=(",", ":"))
+    if len(payload) > _MAX_PAYLOAD:
+        payload = json.dumps({**event, "page_ids": None}, separators=(",", ":"))
+    await session.execute(select(func.pg_notify(settings.progress_notify_channel, payload)))
+
+
+@dataclass
+class DocumentProgress:
+    document_id: str
+    file: str
+    pages_total: int = 0
+    pages_ocr_done: int = 0
+    pages_spellchecked: int = 0
+    pages_done: int = 0
+    pages_blank: int = 0
+    pages_duplicate: int = 0
+
+
+@dataclass
+class JobProgress:
+    job_id: str
+    status: str
+    documents: Dict[str, DocumentProgress] = field(default_factory=dict)
+
+
+class ProgressFeed:
+    """Per-job progress kept current from the workers' NOTIFY events.
+
+    A job enters the map when a status read loads it from the database (:meth:`begin` then
+    :meth:`seed`); from then on every committed stage advance updates it in place, so further
+    reads need no queries. Counters in the events are absolute, and an event the map can't apply
+    (pages screened, the job restarted or cancelled, an unknown document) drops the job so the next
+    read loads it again. While the LISTEN connection is down the map is empty and reads go to the
+    database.
+    """
+
+    def __init__(self) -> None:
+        self.settings = get_settings()
+        self.enabled = self.settings.progress_notify_enabled
+        self.channel = self.settings.progress_notify_channel
+        self.live = False
+        self._jobs: OrderedDict[str, JobProgress] = OrderedDict()
+        # Events that arrived while a job was being loaded; replayed onto the loaded progress.
+        self._seeding: Dict[str, List[dict]] = {}
+        self._subscribers: Dict[str, Set[asyncio.Event]] = {}
+        self._task: asyncio.Task | None = None
+
+    # -- reads -----------------------------------------------------------------------------
+
+    def get(self, job_id: str) -> JobProgress | None:
+        progress = self._jobs.get(job_id) if self.live else None
+        if progress is not None:
+            self._jobs.move_to_end(job_id)
+        return progress
+
+    def begin(self, job_id: str) -> None:
+        """Start collecting the job's events before its progress is read from the database."""
+        if self.live:
+            self._seeding.setdefault(job_id, [])
+
+    def seed(self, progress: JobProgress) -> None:
+        events = self._seeding.pop(progress.job_id, None)
+        if events is None or not self.live:
+            return
+        if not all(self._merge(progress, event) for event in events):
+            return
+        self._jobs[progress.job_id] = progress
+        while len(self._jobs) > self.settings.progress_feed_max_jobs:
+            self._jobs.popitem(last=False)
+
+    @contextmanager
+    def subscribe(self, job_id: str) -> Iterator[asyncio.Event]:
+        """An event set whenever the job's progress changes (and when the feed goes down)."""
+        changed = asyncio.Event()
+        self._subscribers.setdefault(job_id, set()).add(changed)
+        try:
+            yield changed
+        finally:
+            subscribers = self._subscribers.get(job_id)
+            if subscribers is not None:
+                subscribers.discard(changed)
+                if not subscribers:
+                    del self._subscribers[job_id]
+
+    # -- events ----------------------------------------------------------------------------
+
+    def apply(self, event: dict) -> None:
+        job_id = event["job_id"]
+        if job_id in self._seeding:
+            self._seeding[job_id].append(event)
+        progress = self._jobs.get(job_id)
+        if progress is not None and not self._merge(progress, event):
+            del self._jobs[job_id]
+        for changed in self._subscribers.get(job_id, ()):
+            changed.set()
+
+    @staticmethod
+    def _merge(progress: JobProgress, event: dict) -> bool:
+        """Apply the event in place; False if the job has to be read from the database again."""
+        stage = event.get("stage")
+        if stage in _COUNTERS:
+            document = progress.documents.get(event["document_id"])
+            if document is None:
+                return False
+            counter = _COUNTERS[stage]
+            setattr(document, counter, max(getattr(document, counter), event["pages_done"]))
+            document.pages_total = event["pages_total"]
+        elif stage == SCREENED:
+            return False
+        job_status = event.get("job_status")
+        if job_status in (JobStatusEnum.COMPLETED.value, JobStatusEnum.FAILED.value):
+            progress.status = job_status
+        elif job_status is not None:
+            return False
+        return True
+
+    def _on_notify(self, connection: asyncpg.Connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            self.apply(json.loads(payload))
+        except Exception:
+            logger.warning("progress_feed.event.invalid", payload=payload[:200], exc_info=True)
+
+    # -- lifecycle -------------------------------------------------------------------------
+
+    def start(self) -> None:
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def shutdown(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _listen(self) -> None:
+        # Only the listener needs a raw asyncpg connection; keep the driver off the import path.
+        import asyncpg
+
+        # LISTEN needs the primary: notifications are not replicated.
+        dsn = make_url(self.settings.database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+        interval = self.settings.progress_feed_reconnect_seconds
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(dsn)
+                await connection.add_listener(self.channel, self._on_notify)
+                self.live = True
+                logger.info("progress_feed.listening", channel=self.channel)
+                while True:
+                    await asyncio.sleep(interval)
+                    # Surfaces a connection that died without closing.
+                    await connection.execute("SELECT 1")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("progress_feed.connection_lost", channel=self.channel, exc_info=True)
+            finally:
+                self._go_offline()
+                if connection is not None:
+                    connection.terminate()
+            await asyncio.sleep(interval)
+
+    def _go_offline(self) -> None:
+        # Events are lost while disconnected, so nothing in the map can be trusted any more.
+        self.live = False
+        self._jobs.clear()
+        self._seeding.clear()
+        for subscribers in self._subscribers.values():
+            for changed in subscribers:
+                changed.set()
+
+
+_progress_feed: ProgressFeed | None = None
+
+
+def get_progress_feed() -> ProgressFeed:
+    global _progress_feed
+    if _progress_feed is None:
+        _progress_feed = ProgressFeed()
+    return _progress_feed
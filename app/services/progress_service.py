@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Sequence
+
+from sqlalchemy import func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.document import Document, DocumentStatusEnum
+from app.db.models.document_page import DocumentPage, PageStageEnum
+from app.db.models.job import Job, JobStatusEnum
+from app.services.cache_service import job_tag, mark_changed, patient_tag
+from app.services.progress_feed_service import notify_progress
+from app.services.webhook_service import get_webhook_service
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Stage a page must be in to advance to the key stage, and the document counter that advance bumps.
+_TRANSITIONS = {
+    PageStageEnum.OCR_DONE.value: (PageStageEnum.RASTERIZED.value, Document.pages_ocr_done),
+    PageStageEnum.SPELLCHECKED.value: (PageStageEnum.OCR_DONE.value, Document.pages_spellchecked),
+    PageStageEnum.DEIDENTIFIED.value: (PageStageEnum.SPELLCHECKED.value, Document.pages_done),
+}
+
+
+@dataclass
+class StageAdvance:
+    document_id: str
+    job_id: str
+    pages_done: int
+    pages_total: int
+    document_completed: bool = False
+    job_completed: bool = False
+
+
+class ProgressService:
+    """Atomic page/document/job progress counters.
+
+    Every transition is a conditional ``UPDATE ... RETURNING`` executed in the caller's
+    transaction, so concurrent workers see each page counted exactly once and exactly one
+    of them observes the document (and job) reaching its total. Each also queues a progress
+    NOTIFY, delivered with the commit (see ProgressFeed).
+    """
+
+    async def advance_page(self, session: AsyncSession, page_id: str, stage: str) -> StageAdvance | None:
+        """Move the page into ``stage``; returns ``None`` if it was not in the preceding stage."""
+        previous, _ = _TRANSITIONS[stage]
+        page_row = (
+            await session.execute(
+                update(DocumentPage)
+                .where(DocumentPage.page_id == page_id, DocumentPage.stage == previous)
+                .values(stage=stage, updated_at=func.now())
+                .returning(DocumentPage.document_id)
+                .execution_options(synchronize_session=False)
+            )
+        ).first()
+        if page_row is None:
+            return None
+        return await self._count_pages(session, page_row.document_id, stage, [page_id])
+
+    async def advance_pages(self, session: AsyncSession, page_ids: Sequence[str], stage: str) -> List[StageAdvance]:
+        """Batch form of :meth:`advance_page`: one advance per document whose pages moved.
+
+        Documents are updated in key order, so concurrent batches lock their rows in the same order.
+        """
+        previous, _ = _TRANSITIONS[stage]
+        if not page_ids:
+            return []
+        moved = await session.execute(
+            update(DocumentPage)
+            .where(DocumentPage.page_id.in_(sorted(page_ids)), DocumentPage.stage == previous)
+            .values(stage=stage, updated_at=func.now())
+            .returning(DocumentPage.page_id, DocumentPage.document_id)
+            .execution_options(synchronize_session=False)
+        )
+        by_document: Dict[str, List[str]] = {}
+        for page_id, document_id in moved.tuples():
+            by_document.setdefault(document_id, []).append(page_id)
+        advances: List[StageAdvance] = []
+        for document_id in sorted(by_document):
+            advances.append(await self._count_pages(session, document_id, stage, by_document[document_id]))
+        return advances
+
+    async def _count_pages(
+        self, session: AsyncSession, document_id: str, stage: str, page_ids: List[str]
+    ) -> StageAdvance:
+        _, counter = _TRANSITIONS[stage]
+        doc_row = (
+            await session.execute(
+                update(Document)
+                .where(Document.document_id == document_id)
+                .values({counter.key: counter + len(page_ids)})
+                .returning(Document.job_id, Document.pages_total, counter, Document.hospital_id, Document.patient_id)
+                .execution_options(synchronize_session=False)
+            )
+        ).first()
+        mark_changed(session, job_tag(doc_row.job_id), patient_tag(doc_row.hospital_id, doc_row.patient_id))
+        advance = StageAdvance(
+            document_id=document_id,
+            job_id=doc_row.job_id,
+            pages_done=doc_row[2],
+            pages_total=doc_row.pages_total,
+        )
+        await notify_progress(
+            session,
+            job_id=advance.job_id,
+            document_id=document_id,
+            stage=stage,
+            page_ids=page_ids,
+            pages_done=advance.pages_done,
+            pages_total=advance.pages_total,
+        )
+        if stage == PageStageEnum.DEIDENTIFIED.value and advance.pages_done >= advance.pages_total:
+            advance.document_completed, advance.job_completed = await self.complete_document(
+                session, advance.document_id
+            )
+        return advance
+
+    async def skip_page(self, session: AsyncSession, page_id: str) -> StageAdvance | None:
+        """Carry a page that needs no processing through every remaining stage; returns the last advance."""
+        advance = None
+        for stage in _TRANSITIONS:
+            advance = await self.advance_page(session, page_id, stage) or advance
+        return advance
+
+    async def complete_document(self, session: AsyncSession, document_id: str) -> tuple[bool, bool]:
+        """Mark the document completed and count it off its job; returns (document, job) completed."""
+        doc_row = (
+            await session.execute(
+                update(Document)
+                .where(
+                    Document.document_id == document_id,
+                    Document.status.not_in([DocumentStatusEnum.COMPLETED.value, DocumentStatusEnum.CANCELLED.value]),
+                )
+                .values(status=DocumentStatusEnum.COMPLETED.value, updated_at=func.now())
+                .returning(Document.job_id, Document.hospital_id, Document.patient_id)
+                .execution_options(synchronize_session=False)
+            )
+        ).first()
+        if doc_row is None:
+            return False, False
+        job_id = doc_row.job_id
+        mark_changed(session, job_tag(job_id), patient_tag(doc_row.hospital_id, doc_row.patient_id))
+
+        pending = await session.scalar(
+            update(Job)
+            .where(Job.job_id == job_id)
+            .values(documents_pending=Job.documents_pending - 1)
+            .returning(Job.documents_pending)
+            .execution_options(synchronize_session=False)
+        )
+        if pending is None or pending > 0:
+            return True, False
+
+        completed_job = await session.scalar(
+            update(Job)
+            .where(
+                Job.job_id == job_id,
+                Job.status.not_in(
+                    [JobStatusEnum.COMPLETED.value, JobStatusEnum.CANCELLED.value, JobStatusEnum.FAILED.value]
+                ),
+            )
+            .values(status=JobStatusEnum.COMPLETED.value, updated_at=func.now())
+            .returning(Job.job_id)
+            .execution_options(synchronize_session=False)
+        )
+        if completed_job:
+            await notify_progress(session, job_id=job_id, job_status=JobStatusEnum.COMPLETED.value)
+            await get_webhook_service().enqueue(session, job_id, JobStatusEnum.COMPLETED.value)
+            logger.info("progress.job.completed", job_id=job_id)
+        return True, completed_job is not None
+
+    async def fail_job(self, session: AsyncSession, job_id: str) -> bool:
+        mark_changed(session, job_tag(job_id))
+        failed = await session.scalar(
+            update(Job)
+            .where(
+                Job.job_id == job_id,
+                # Only the transition into FAILED notifies and queues the webhook, once per job.
+                Job.status.not_in(
+                    [JobStatusEnum.COMPLETED.value, JobStatusEnum.CANCELLED.value, JobStatusEnum.FAILED.value]
+                ),
+            )
+            .values(status=JobStatusEnum.FAILED.value, updated_at=func.now())
+            .returning(Job.job_id)
+            .execution_options(synchronize_session=False)
+        )
+        if failed is not None:
+            await notify_progress(session, job_id=job_id, job_status=JobStatusEnum.FAILED.value)
+            await get_webhook_service().enqueue(session, job_id, JobStatusEnum.FAILED.value)
+        return failed is not None
+
+
+def get_progress_service() -> ProgressService:
+    return ProgressService()
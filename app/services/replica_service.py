@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import AsyncIterator, Callable, Dict, Iterable, List
+
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config.settings import get_settings
+from app.db.session import AsyncSessionLocal, ReadSessionLocal, read_engine
+from app.services.cache_service import job_tag, patient_tag
+from app.utils.logger import get_logger
+from app.utils.redis_client import get_redis_client
+
+logger = get_logger(__name__)
+
+KEY_PREFIX = "replica:recent"
+
+# Seconds the replica is behind the primary; 0 when it has replayed everything it received.
+_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+    """
+)
+
+TagsFor = Callable[[Request], Iterable[str]]
+
+
+class ReplicaRouter:
+    """Chooses the primary or the read replica for read-only requests.
+
+    Writes are recorded by their cache tags (the ones passed to ``mark_changed``) for
+    ``replica_lag_window_seconds`` after they commit - in process, and in Redis so the API sees
+    what the workers wrote (unless the local executor runs everything in one process). A read whose tags were written within the window
+    goes to the primary, so a client never sees its job go backwards. The window only holds while
+    the replica keeps up: its lag is measured every ``replica_lag_check_interval_seconds``, and
+    while it exceeds the window (or can't be measured) every read goes to the primary.
+    """
+
+    def __init__(self) -> None:
+        self.settings = get_settings()
+        self.enabled = bool(self.settings.database_replica_url)
+        self.window = self.settings.replica_lag_window_seconds
+        self.redis = get_redis_client() if self.enabled and self.settings.pipeline_executor != "local" else None
+        self._recent: Dict[str, float] = {}
+        self._recent_lock = threading.Lock()
+        self._replica_ok = False
+        self._lag_checked_at = 0.0
+        self._lag_lock = asyncio.Lock()
+
+    # -- writes ----------------------------------------------------------------------------
+
+    def note_writes(self, tags: Iterable[str]) -> None:
+        """Record committed writes in this process; called from the session's after-commit hook."""
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        with self._recent_lock:
+            self._recent = {tag: until for tag, until in self._recent.items() if until > now}
+            self._recent.update((tag, now + self.window) for tag in tags)
+
+    def publish_writes(self, tags: Iterable[str]) -> None:
+        """Record committed writes for the other processes; blocks on Redis."""
+        if self.redis is None:
+            return
+        try:
+            pipe = self.redis.pipeline()
+            for tag in tags:
+                pipe.set(self._key(tag), 1, px=int(self.window * 1000))
+            pipe.execute()
+        except Exception:
+            # A lost record can only serve a read from a replica that hasn't caught up yet.
+            logger.warning("replica.publish_writes.failed", tags=sorted(tags), exc_info=True)
+
+    # -- reads -----------------------------------------------------------------------------
+
+    async def sessionmaker_for(self, tags: Iterable[str]) -> async_sessionmaker[AsyncSession]:
+        tags = list(tags)
+        if not self.enabled or not await self._replica_usable() or await self._recently_written(tags):
+            return AsyncSessionLocal
+        return ReadSessionLocal
+
+    async def _recently_written(self, tags: List[str]) -> bool:
+        if not tags:
+            return False
+        now = time.monotonic()
+        with self._recent_lock:
+            if any(self._recent.get(tag, 0.0) > now for tag in tags):
+                return True
+        if self.redis is None:
+            return False
+        try:
+            return bool(await asyncio.to_thread(self.redis.exists, *(self._key(tag) for tag in tags)))
+        except Exception:
+            logger.warning("replica.recent_writes.unavailable", exc_info=True)
+            return True
+
+    async def _replica_usable(self) -> bool:
+        if time.monotonic() - self._lag_checked_at < self.settings.replica_lag_check_interval_seconds:
+            return self._replica_ok
+        async with self._lag_lock:
+            if time.monotonic() - self._lag_checked_at >= self.settings.replica_lag_check_interval_seconds:
+                self._set_replica_ok(await self._measure_lag())
+                self._lag_checked_at = time.monotonic()
+        return self._replica_ok
+
+    async def _measure_lag(self) -> float | None:
+        try:
+            async with read_engine.connect() as conn:
+                lag = await conn.scalar(_LAG_QUERY)
+        except Exception:
+            logger.warning("replica.lag.unavailable", exc_info=True)
+            return None
+        return float(lag) if lag is not None else None
+
+    def _set_replica_ok(self, lag: float | None) -> None:
+        replica_ok = lag is not None and lag < self.window
+        if replica_ok != self._replica_ok:
+            logger.info("replica.routing.changed", use_replica=replica_ok, lag_seconds=lag, window=self.window)
+        self._replica_ok = replica_ok
+
+    @staticmethod
+    def _key(tag: str) -> str:
+        return f"{KEY_PREFIX}:{tag}"
+
+
+def job_tags(request: Request) -> List[str]:
+    return [job_tag(request.path_params["job_id"])]
+
+
+def patient_tags(request: Request) -> List[str]:
+    hospital_id = request.query_params.get("hospital_id")
+    patient_id = request.query_params.get("patient_id")
+    return [patient_tag(hospital_id, patient_id)] if hospital_id and patient_id else []
+
+
+def read_session(tags: TagsFor) -> Callable[[Request], AsyncIterator[AsyncSession]]:
+    """Dependency for read-only routes: a replica session unless what ``tags`` names was just written."""
+
+    async def dependency(request: Request) -> AsyncIterator[AsyncSession]:
+        sessionmaker = await get_replica_router().sessionmaker_for(tags(request))
+        async with sessionmaker() as session:
+            yield session
+
+    return dependency
+
+
+_replica_router: ReplicaRouter | None = None
+
+
+def get_replica_router() -> ReplicaRouter:
+    global _replica_router
+    if _replica_router is None:
+        _replica_router = ReplicaRouter()
+    return _replica_router
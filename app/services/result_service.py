@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.document import Document
+from app.db.models.document_page import DocumentPage
+from app.db.models.job import Job, JobStatusEnum
+from app.schemas.result_schema import ResultResponse
+from app.services.cache_service import job_tag, mark_changed
+from app.services.storage_service import get_storage_service
+from app.services.text_store_service import PageTexts, get_text_store_service
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SNAPSHOT_PREFIX = "results"
+
+
+class ResultService:
+    """Builds job results and keeps a gzip snapshot of each completed job in object storage."""
+
+    def __init__(self) -> None:
+        self.storage = get_storage_service()
+        self.text_store = get_text_store_service()
+
+    @staticmethod
+    def snapshot_path(job_id: str) -> str:
+        return f"{SNAPSHOT_PREFIX}/{job_id}.json.gz"
+
+    async def build(self, session: AsyncSession, job: Job) -> ResultResponse:
+        documents = (await session.scalars(select(Document).where(Document.job_id == job.job_id))).all()
+        document_payload: list[dict] = []
+        for doc in documents:
+            pages = (
+                await session.scalars(
+                    select(DocumentPage)
+                    .where(DocumentPage.document_id == doc.document_id)
+                    .order_by(DocumentPage.page_number)
+                )
+            ).all()
+            texts = await self.text_store.load_many(session, [page.page_id for page in pages])
+            extraction_entries = []
+            for page in pages:
+                page_texts = texts.get(page.page_id, PageTexts())
+                image_path = f"{doc.file_path}/page_{page.page_number}.png"
+                extraction_entries.append(
+                    {
+                        "image_path": image_path,
+                        "extracted_text": page_texts.raw or "",
+                        "spellchecked_text": page_texts.spellchecked or "",
+                        "deid_text": page_texts.deid or "",
+                    }
+                )
+            document_payload.append(
+                {
+                    "doc_id": doc.document_id,
+                    "original_file_path": doc.original_file_path,
+                    "extraction": extraction_entries,
+                }
+            )
+
+        return ResultResponse(job_id=job.job_id, status=job.status, document=document_payload)
+
+    async def write_snapshot(self, session: AsyncSession, job: Job, result: ResultResponse | None = None) -> str | None:
+        """Store the completed job's serialized result and record its ETag; returns the ETag."""
+        if job.status != JobStatusEnum.COMPLETED.value:
+            return None
+        result = result or await self.build(session, job)
+        body = result.model_dump_json().encode("utf-8")
+        etag = hashlib.sha256(body).hexdigest()[:32]
+        await self.storage.store_file(self.snapshot_path(job.job_id), gzip.compress(body), "application/gzip")
+        await session.execute(
+            update(Job)
+            .where(Job.job_id == job.job_id)
+            .values(result_etag=etag)
+            .execution_options(synchronize_session=False)
+        )
+        job.result_etag = etag
+        mark_changed(session, job_tag(job.job_id))
+        logger.info("result.snapshot.written", job_id=job.job_id, bytes=len(body))
+        return etag
+
+    async def read_snapshot(self, job: Job) -> bytes | None:
+        """Gzip-compressed snapshot body, or None if the job has none (or it went missing)."""
+        if not job.result_etag:
+            return None
+        try:
+            return await self.storage.retrieve_file(self.snapshot_path(job.job_id))
+        except Exception:
+            logger.warning("result.snapshot.unavailable", job_id=job.job_id, exc_info=True)
+            return None
+
+
+def get_result_service() -> ResultService:
+    return ResultService()
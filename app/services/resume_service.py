@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Iterable, List, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.document import Document, DocumentStatusEnum
+from app.db.models.document_page import DocumentPage, PageStageEnum
+from app.db.models.job import Job, JobStatusEnum
+from app.pipeline.base import DEID_STAGE, OCR_STAGE, PROCESS_STAGE, SPELLCHECK_STAGE, StageCall
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class ResumePlan:
+    """Pages grouped by the next stage they still need."""
+
+    ocr: List[str] = field(default_factory=list)
+    spellcheck: List[str] = field(default_factory=list)
+    deid: List[str] = field(default_factory=list)
+    completed: int = 0
+    # Duplicates waiting for their original's texts (see PageScreeningService).
+    waiting: int = 0
+
+    @property
+    def total(self) -> int:
+        return len(self.ocr) + len(self.spellcheck) + len(self.deid) + self.completed + self.waiting
+
+    @property
+    def pending(self) -> int:
+        return len(self.ocr) + len(self.spellcheck) + len(self.deid)
+
+
+class ResumePlanner:
+    """Re-enqueues only the missing stage of each page, based on ``DocumentPage.stage``."""
+
+    def plan(self, pages: Iterable[Tuple[str, str, str | None]]) -> ResumePlan:
+        plan = ResumePlan()
+        for page_id, stage, duplicate_of in pages:
+            if stage == PageStageEnum.RASTERIZED.value and duplicate_of:
+                plan.waiting += 1
+            elif stage == PageStageEnum.RASTERIZED.value:
+                plan.ocr.append(page_id)
+            elif stage == PageStageEnum.OCR_DONE.value:
+                plan.spellcheck.append(page_id)
+            elif stage == PageStageEnum.SPELLCHECKED.value:
+                plan.deid.append(page_id)
+            else:
+                plan.completed += 1
+        return plan
+
+    async def plan_document(self, session: AsyncSession, document_id: str) -> ResumePlan:
+        rows = await session.execute(
+            select(DocumentPage.page_id, DocumentPage.stage, DocumentPage.duplicate_of).where(
+                DocumentPage.document_id == document_id
+            )
+        )
+        return self.plan(rows.tuples())
+
+    def calls(
+        self, plan: ResumePlan, document: Document, priority: int, profile: str | None = None
+    ) -> List[StageCall]:
+        calls: List[StageCall] = []
+        for stage, page_ids in ((OCR_STAGE, plan.ocr), (SPELLCHECK_STAGE, plan.spellcheck), (DEID_STAGE, plan.deid)):
+            calls.extend(
+                StageCall(
+                    stage=stage,
+                    key=page_id,
+                    job_id=document.job_id,
+                    hospital_id=document.hospital_id,
+                    priority=priority,
+                    profile=profile,
+                )
+                for page_id in page_ids
+            )
+        logger.info(
+            "resume.document.planned",
+            document_id=document.document_id,
+            ocr=len(plan.ocr),
+            spellcheck=len(plan.spellcheck),
+            deid=len(plan.deid),
+            completed=plan.completed,
+            waiting=plan.waiting,
+        )
+        return calls
+
+    async def stalled_calls(self, session: AsyncSession, stale_after_seconds: int) -> List[StageCall]:
+        """Calls for running jobs that have not advanced for ``stale_after_seconds``.
+
+        A job with a document that is not fully rasterized gets its PROCESS call again, which also
+        re-plans its stored pages; other jobs get the missing stage of each stalled page.
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=stale_after_seconds)
+        calls = await self._stalled_jobs(session, cutoff)
+        restarted = {call.key for call in calls}
+        rows = (
+            await session.execute(
+                select(
+                    DocumentPage.page_id,
+                    DocumentPage.stage,
+                    DocumentPage.duplicate_of,
+                    Document,
+                    Job.priority,
+                    Job.profile_mode,
+                )
+                .join(Document, DocumentPage.document_id == Document.document_id)
+                .join(Job, Document.job_id == Job.job_id)
+                .where(
+                    Job.status == JobStatusEnum.PROCESSING.value,
+                    Job.job_id.not_in(restarted),
+                    DocumentPage.stage != PageStageEnum.DEIDENTIFIED.value,
+                    DocumentPage.updated_at < cutoff,
+                )
+            )
+        ).all()
+
+        pages_by_document: dict[str, list[tuple[str, str, str | None]]] = defaultdict(list)
+        documents: dict[str, tuple[Document, int, str | None]] = {}
+        for page_id, stage, duplicate_of, document, priority, profile in rows:
+            pages_by_document[document.document_id].append((page_id, stage, duplicate_of))
+            documents[document.document_id] = (document, priority, profile)
+
+        for document_id, pages in pages_by_document.items():
+            document, priority, profile = documents[document_id]
+            calls.extend(self.calls(self.plan(pages), document, priority, profile))
+        return calls
+
+    async def _stalled_jobs(self, session: AsyncSession, cutoff: datetime) -> List[StageCall]:
+        """PROCESS calls for running jobs whose rasterization stopped: the call was lost before the
+        first page was stored (a worker died, or an ingest chunk committed its jobs but not the calls),
+        or part-way through a document."""
+        stored = (
+            select(func.count())
+            .select_from(DocumentPage)
+            .where(DocumentPage.document_id == Document.document_id)
+            .scalar_subquery()
+        )
+        unrasterized = select(Document.document_id).where(
+            Document.job_id == Job.job_id,
+            Document.status.not_in([DocumentStatusEnum.COMPLETED.value, DocumentStatusEnum.CANCELLED.value]),
+            Document.updated_at < cutoff,
+            # pages_total is 0 until the page count is known.
+            stored < func.greatest(Document.pages_total, 1),
+        )
+        # Documents are rasterized one after another: while any page of the job is still moving,
+        # its later documents are only waiting their turn.
+        touched = (
+            select(DocumentPage.page_id)
+            .join(Document, DocumentPage.document_id == Document.document_id)
+            .where(Document.job_id == Job.job_id, DocumentPage.updated_at >= cutoff)
+        )
+        rows = await session.execute(
+            select(Job.job_id, Job.priority, Job.profile_mode).where(
+                Job.status == JobStatusEnum.PROCESSING.value,
+                Job.updated_at < cutoff,
+                unrasterized.exists(),
+                ~touched.exists(),
+            )
+        )
+        calls = [
+            StageCall(PROCESS_STAGE, job_id, job_id=job_id, priority=priority, profile=profile)
+            for job_id, priority, profile in rows.tuples()
+        ]
+        if calls:
+            logger.info("resume.jobs.restarted", jobs=len(calls))
+        return calls
+
+
+def get_resume_planner() -> ResumePlanner:
+    return ResumePlanner()
@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import statistics
+import time
+from typing import Iterable, List, Set
+
+from app.config.settings import get_settings
+from app.db.models.job import DEFAULT_PRIORITY
+from app.schemas.process_schema import PriorityClassStats, QueueStatsResponse
+from app.services.cancellation_service import get_cancellation_service
+from app.utils.logger import get_logger
+from app.utils.redis_client import get_redis_client
+
+logger = get_logger(__name__)
+
+KEY_PREFIX = "pipeline:sched"
+
+# Served in strict order: interactive pages always go out before standard, standard before bulk.
+PRIORITY_CLASSES = ("interactive", "standard", "bulk")
+
+# Assign weighted-fair finish tags to a batch of pages for one hospital. Pages already queued
+# or in flight are skipped, so re-enqueueing after a crash never duplicates OCR work.
+# KEYS: class queue zset, class finish-tag hash, virtual-time hash, payload hash, in-flight zset
+# ARGV: class, hospital_id, weight, (page_id, payload) pairs...
+_ENQUEUE_SCRIPT = """
+local vtime = tonumber(redis.call('HGET', KEYS[3], ARGV[1]) or '0')
+local last = tonumber(redis.call('HGET', KEYS[2], ARGV[2]) or '0')
+local tag = math.max(vtime, last)
+local step = 1 / tonumber(ARGV[3])
+local added = 0
+for i = 4, #ARGV, 2 do
+    if redis.call('HEXISTS', KEYS[4], ARGV[i]) == 0 and redis.call('ZSCORE', KEYS[5], ARGV[i]) == false then
+        tag = tag + step
+        redis.call('ZADD', KEYS[1], tag, ARGV[i])
+        redis.call('HSET', KEYS[4], ARGV[i], ARGV[i + 1])
+        added = added + 1
+    end
+end
+redis.call('HSET', KEYS[2], ARGV[2], tag)
+return added
+"""
+
+# Pop the smallest finish tags until the in-flight window is full.
+# KEYS: in-flight zset, virtual-time hash, payload hash, class queues in priority order...
+# ARGV: now, window, stale_after, class names matching the queues...
+_DISPATCH_SCRIPT = """
+local now = tonumber(ARGV[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - tonumber(ARGV[3]))
+local room = tonumber(ARGV[2]) - redis.call('ZCARD', KEYS[1])
+local out = {}
+for i = 4, #KEYS do
+    while room > 0 do
+        local item = redis.call('ZPOPMIN', KEYS[i])
+        if #item == 0 then break end
+        redis.call('HSET', KEYS[2], ARGV[i], item[2])
+        local payload = redis.call('HGET', KEYS[3], item[1])
+        redis.call('HDEL', KEYS[3], item[1])
+        if payload then
+            redis.call('ZADD', KEYS[1], now, item[1])
+            table.insert(out, payload)
+            room = room - 1
+        end
+    end
+end
+return out
+"""
+
+
+def priority_class(priority: int) -> str:
+    if priority >= 7:
+        return "interactive"
+    if priority <= 3:
+        return "bulk"
+    return "standard"
+
+
+class SchedulingService:
+    """Weighted fair queuing of OCR page dispatch per hospital, with strict priority classes.
+
+    Pages wait in Redis sorted sets scored by virtual finish tag and are released to Celery
+    only while fewer than ``scheduler_max_inflight_pages`` are being OCR'd, so a large backfill
+    never occupies the broker queue ahead of newly arriving interactive work.
+    """
+
+    def __init__(self) -> None:
+        self.settings = get_settings()
+        self.redis = get_redis_client()
+        self._enqueue_script = self.redis.register_script(_ENQUEUE_SCRIPT)
+        self._dispatch_script = self.redis.register_script(_DISPATCH_SCRIPT)
+
+    @staticmethod
+    def _queue_key(name: str) -> str:
+        return f"{KEY_PREFIX}:{name}:queue"
+
+    @staticmethod
+    def _finish_key(name: str) -> str:
+        return f"{KEY_PREFIX}:{name}:finish"
+
+    @staticmethod
+    def _waits_key(name: str) -> str:
+        return f"{KEY_PREFIX}:{name}:waits"
+
+    @property
+    def _inflight_key(self) -> str:
+        return f"{KEY_PREFIX}:inflight"
+
+    @property
+    def _vtime_key(self) -> str:
+        return f"{KEY_PREFIX}:vtime"
+
+    @property
+    def _payload_key(self) -> str:
+        return f"{KEY_PREFIX}:payloads"
+
+    async def enqueue_pages(
+        self,
+        job_id: str,
+        hospital_id: str,
+        page_ids: Iterable[str],
+        priority: int = DEFAULT_PRIORITY,
+        profile: str | None = None,
+    ) -> int:
+        now = time.time()
+        members: List[str] = []
+        for page_id in page_ids:
+            payload = {
+                "page_id": page_id,
+                "job_id": job_id,
+                "hospital_id": hospital_id,
+                "priority": priority,
+                "enqueued_at": now,
+            }
+            if profile:
+                payload["profile"] = profile
+            members.extend((page_id, json.dumps(payload)))
+        if not members:
+            return 0
+
+        name = priority_class(priority)
+        weight = self.settings.scheduler_hospital_weights.get(hospital_id, 1.0)
+        added = await asyncio.to_thread(
+            self._enqueue_script,
+            keys=[
+                self._queue_key(name),
+                self._finish_key(name),
+                self._vtime_key,
+                self._payload_key,
+                self._inflight_key,
+            ],
+            args=[name, hospital_id, weight, *members],
+        )
+        logger.info("scheduler.enqueued", job_id=job_id, hospital_id=hospital_id, priority_class=name, pages=added)
+        return added
+
+    async def dispatch(self) -> int:
+        """Release queued pages to the OCR workers until the in-flight window is full.
+
+        Pages of cancelled jobs are dropped as they are popped and their slots reused immediately.
+        """
+        from app.workers.celery_app import celery_app, message_priority, stage_task_id
+
+        dispatched = 0
+        while True:
+            released: List[str] = await asyncio.to_thread(
+                self._dispatch_script,
+                keys=[
+                    self._inflight_key,
+                    self._vtime_key,
+                    self._payload_key,
+                    *(self._queue_key(name) for name in PRIORITY_CLASSES),
+                ],
+                args=[
+                    time.time(),
+                    self.settings.scheduler_max_inflight_pages,
+                    self.settings.scheduler_inflight_timeout_seconds,
+                    *PRIORITY_CLASSES,
+                ],
+            )
+            if not released:
+                return dispatched
+
+            items = [json.loads(raw) for raw in released]
+            cancelled = await get_cancellation_service().cancelled_among(item["job_id"] for item in items)
+            for item in items:
+                if item["job_id"] in cancelled:
+                    continue
+                kwargs = {"priority": item["priority"], "enqueued_at": item["enqueued_at"], "job_id": item["job_id"]}
+                if item.get("profile"):
+                    kwargs["profile"] = item["profile"]
+                celery_app.send_task(
+                    "ocr_task",
+                    args=[item["page_id"]],
+                    kwargs=kwargs,
+                    priority=message_priority(item["priority"]),
+                    task_id=stage_task_id("ocr", item["page_id"]),
+                )
+                dispatched += 1
+
+            dropped = [item["page_id"] for item in items if item["job_id"] in cancelled]
+            if not dropped:
+                return dispatched
+            await asyncio.to_thread(self.redis.zrem, self._inflight_key, *dropped)
+
+    async def release(self, page_id: str) -> None:
+        """Free the page's in-flight slot and top the window back up."""
+        await asyncio.to_thread(self.redis.zrem, self._inflight_key, page_id)
+        await self.dispatch()
+
+    async def withdraw(self, page_ids: Iterable[str]) -> None:
+        """Drop a cancelled job's pages from the queues and their in-flight slots, then refill the window.
+
+        Revoked OCR tasks never run, so nothing else would release their slots before they time out.
+        """
+        page_ids = list(page_ids)
+        if not page_ids:
+            return
+        pipe = self.redis.pipeline()
+        pipe.zrem(self._inflight_key, *page_ids)
+        for name in PRIORITY_CLASSES:
+            pipe.zrem(self._queue_key(name), *page_ids)
+        pipe.hdel(self._payload_key, *page_ids)
+        await asyncio.to_thread(pipe.execute)
+        await self.dispatch()
+
+    async def tracked(self, page_ids: List[str]) -> Set[str]:
+        """The pages still waiting in a class queue or holding an in-flight slot that hasn't timed out."""
+        if not page_ids:
+            return set()
+        pipe = self.redis.pipeline()
+        pipe.hmget(self._payload_key, page_ids)
+        pipe.zmscore(self._inflight_key, page_ids)
+        payloads, dispatched = await asyncio.to_thread(pipe.execute)
+        live_after = time.time() - self.settings.scheduler_inflight_timeout_seconds
+        return {
+            page_id
+            for page_id, payload, dispatched_at in zip(page_ids, payloads, dispatched)
+            if payload is not None or (dispatched_at is not None and dispatched_at > live_after)
+        }
+
+    async def pending_pages(self) -> int:
+        pipe = self.redis.pipeline()
+        for name in PRIORITY_CLASSES:
+            pipe.zcard(self._queue_key(name))
+        return sum(await asyncio.to_thread(pipe.execute))
+
+    async def record_wait(self, priority: int, wait_seconds: float) -> None:
+        key = self._waits_key(priority_class(priority))
+        pipe = self.redis.pipeline()
+        pipe.lpush(key, round(wait_seconds * 1000, 1))
+        pipe.ltrim(key, 0, self.settings.scheduler_wait_samples - 1)
+        await asyncio.to_thread(pipe.execute)
+
+    async def stats(self) -> QueueStatsResponse:
+        pipe = self.redis.pipeline()
+        pipe.zcard(self._inflight_key)
+        for name in PRIORITY_CLASSES:
+            pipe.zcard(self._queue_key(name))
+            pipe.lrange(self._waits_key(name), 0, -1)
+        results = await asyncio.to_thread(pipe.execute)
+
+        classes = [
+            class_stats(name, results[1 + index * 2], [float(value) for value in results[2 + index * 2]])
+            for index, name in enumerate(PRIORITY_CLASSES)
+        ]
+        return QueueStatsResponse(
+            inflight=results[0],
+            inflight_limit=self.settings.scheduler_max_inflight_pages,
+            classes=classes,
+        )
+
+
+def class_stats(name: str, pending: int, waits_ms: Iterable[float]) -> PriorityClassStats:
+    waits = sorted(waits_ms)
+    return PriorityClassStats(
+        priority_class=name,
+        pending=pending,
+        wait_samples=len(waits),
+        wait_avg_ms=statistics.fmean(waits) if waits else None,
+        wait_p50_ms=_percentile(waits, 0.50),
+        wait_p95_ms=_percentile(waits, 0.95),
+        wait_max_ms=waits[-1] if waits else None,
+    )
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float | None:
+    if not sorted_values:
+        return None
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+_scheduling_service: SchedulingService | None = None
+
+
+def get_scheduling_service() -> SchedulingService:
+    global _scheduling_service
+    if _scheduling_service is None:
+        _scheduling_service = SchedulingService()
+    return _scheduling_service
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.document import Document
+from app.db.models.document_page import DocumentPage
+from app.db.models.ocr_deidentified_text import SEARCH_CONFIG, OcrDeidentifiedText
+from app.schemas.search_schema import SearchHit
+from app.services.text_store_service import PageTexts, get_text_store_service
+
+HEADLINE_OPTIONS = "StartSel=<b>, StopSel=</b>, MaxWords=35, MinWords=15, MaxFragments=2"
+SNIPPET_WORDS = 35
+_WORD = re.compile(r"\w+")
+
+
+@dataclass
+class SearchFilters:
+    hospital_id: str
+    patient_id: str | None = None
+    doc_type: str | None = None
+
+
+class SearchService:
+    """Full-text search over de-identified page text backed by the GIN-indexed tsvector."""
+
+    async def search(
+        self,
+        session: AsyncSession,
+        query: str,
+        filters: SearchFilters,
+        limit: int,
+        offset: int,
+    ) -> tuple[int, list[SearchHit]]:
+        ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+
+        conditions = [
+            OcrDeidentifiedText.deid_tsv.op("@@")(ts_query),
+            Document.hospital_id == filters.hospital_id,
+        ]
+        if filters.patient_id:
+            conditions.append(Document.patient_id == filters.patient_id)
+        if filters.doc_type:
+            conditions.append(Document.doc_type == filters.doc_type)
+
+        base = (
+            select(OcrDeidentifiedText.id)
+            .join(DocumentPage, OcrDeidentifiedText.page_id == DocumentPage.page_id)
+            .join(Document, DocumentPage.document_id == Document.document_id)
+            .where(*conditions)
+        )
+        total = await session.scalar(select(func.count()).select_from(base.subquery())) or 0
+        if total == 0:
+            return 0, []
+
+        rank = func.ts_rank_cd(OcrDeidentifiedText.deid_tsv, ts_query).label("rank")
+        # Rank and paginate first; ts_headline re-parses the text so it only runs on the returned page.
+        ranked = (
+            base.add_columns(rank)
+            .order_by(rank.desc(), OcrDeidentifiedText.id)
+            .limit(limit)
+            .offset(offset)
+            .subquery()
+        )
+        stmt = (
+            select(
+                Document.document_id,
+                Document.job_id,
+                Document.patient_id,
+                Document.hospital_id,
+                Document.doc_type,
+                DocumentPage.page_id,
+                DocumentPage.page_number,
+                ranked.c.rank,
+                func.ts_headline(SEARCH_CONFIG, OcrDeidentifiedText.deid_text, ts_query, HEADLINE_OPTIONS).label(
+                    "snippet"
+                ),
+            )
+            .select_from(ranked)
+            .join(OcrDeidentifiedText, OcrDeidentifiedText.id == ranked.c.id)
+            .join(DocumentPage, OcrDeidentifiedText.page_id == DocumentPage.page_id)
+            .join(Document, DocumentPage.document_id == Document.document_id)
+            .order_by(ranked.c.rank.desc(), OcrDeidentifiedText.id)
+        )
+        rows = (await session.execute(stmt)).all()
+
+        # Compact-mode rows have no deid_text for ts_headline to read; build their snippet here.
+        missing = [row.page_id for row in rows if row.snippet is None]
+        texts = await get_text_store_service().load_many(session, missing) if missing else {}
+        hits = [
+            SearchHit(
+                document_id=row.document_id,
+                job_id=row.job_id,
+                page_id=row.page_id,
+                page_number=row.page_number,
+                patient_id=row.patient_id,
+                hospital_id=row.hospital_id,
+                doc_type=row.doc_type,
+                rank=float(row.rank),
+                snippet=row.snippet
+                if row.snippet is not None
+                else _snippet(texts.get(row.page_id, PageTexts()).deid or "", query),
+            )
+            for row in rows
+        ]
+        return total, hits
+
+
+def _snippet(text: str, query: str) -> str:
+    """Approximation of ts_headline: a window around the first match with query terms in <b>."""
+    terms = [
+        term
+        for token in query.lower().split()
+        if not token.startswith("-")
+        for term in _WORD.findall(token)
+        if term != "or"
+    ]
+    words = text.split()
+    matches = [
+        index
+        for index, word in enumerate(words)
+        if any(normalized.startswith(term) for term in terms for normalized in _WORD.findall(word.lower()))
+    ]
+    start = max(matches[0] - SNIPPET_WORDS // 3, 0) if matches else 0
+    window = range(start, min(start + SNIPPET_WORDS, len(words)))
+    hit = set(matches)
+    return " ".join(f"<b>{words[index]}</b>" if index in hit else words[index] for index in window)
+
+
+def get_search_service() -> SearchService:
+    return SearchService()
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+from typing import List, Sequence
 
 
 class SpellcheckService:
@@ -9,6 +10,9 @@ class SpellcheckService:
         await asyncio.sleep(0)
         return text
 
+    async def correct_many(self, texts: Sequence[str]) -> List[str]:
+        return [await self.correct_text(text) for text in texts]
+
 
 def get_spellcheck_service() -> SpellcheckService:
     return SpellcheckService()
@@ -0,0 +1,297 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.config.settings import get_settings
+from app.db.models.stage_timing import StageOutcomeEnum, StageTiming
+from app.db.session import AsyncSessionLocal, engine
+from app.pipeline.base import DEID_STAGE, JOB_STAGES, PROCESS_STAGE, SNAPSHOT_STAGE, StageCall
+from app.schemas.process_schema import CriticalPathStep, DurationStats, StageTimeline, TimelineResponse
+from app.utils.logger import get_logger
+from app.utils.stage_timer import StageTimer, instrument_engine
+
+logger = get_logger(__name__)
+
+_PERCENTILES = (0.5, 0.95)
+
+
+class StageTimingService:
+    """Buffers one timing row per executed stage call and writes them in multi-row inserts.
+
+    Rows are flushed once ``stage_timing_batch_size`` are buffered or the oldest is
+    ``stage_timing_flush_seconds`` old, checked after each stage call and on a timer (so an idle
+    worker doesn't sit on them), and on worker shutdown. A failed flush keeps the rows for the next attempt up to ``stage_timing_buffer_max``.
+    """
+
+    def __init__(self) -> None:
+        self.settings = get_settings()
+        self.enabled = self.settings.stage_timing_enabled
+        self.worker = f"{socket.gethostname()}:{os.getpid()}"[:64]
+        self._buffer: List[dict] = []
+        self._oldest: float | None = None
+        # Threaded I/O workers record from several threads at once.
+        self._lock = threading.Lock()
+        self._flusher_pid: int | None = None
+        if self.enabled:
+            instrument_engine(engine.sync_engine)
+
+    def record(self, call: StageCall, timer: StageTimer, started: float, finished: float, outcome: str) -> None:
+        if not self.enabled or not call.job_id:
+            return
+        row = {
+            "job_id": call.job_id,
+            "page_id": None if call.stage in JOB_STAGES else call.key,
+            "stage": call.stage,
+            "outcome": outcome,
+            "worker": self.worker,
+            "enqueued_at": datetime.utcfromtimestamp(call.enqueued_at) if call.enqueued_at else None,
+            "started_at": datetime.utcfromtimestamp(started),
+            "finished_at": datetime.utcfromtimestamp(finished),
+            "db_ms": round(timer.db_seconds * 1000, 2),
+            "storage_ms": round(timer.storage_seconds * 1000, 2),
+            "bytes_in": timer.bytes_in,
+            "bytes_out": timer.bytes_out,
+        }
+        self.extend([row])
+
+    def drain(self) -> List[dict]:
+        with self._lock:
+            rows, self._buffer, self._oldest = self._buffer, [], None
+        return rows
+
+    def extend(self, rows: List[dict]) -> None:
+        if rows:
+            with self._lock:
+                if self._oldest is None:
+                    self._oldest = time.monotonic()
+                self._buffer.extend(rows)
+
+    def due(self) -> bool:
+        if not self._buffer:
+            return False
+        return (
+            len(self._buffer) >= self.settings.stage_timing_batch_size
+            or time.monotonic() - (self._oldest or 0) >= self.settings.stage_timing_flush_seconds
+        )
+
+    async def flush_if_due(self) -> None:
+        if self.due():
+            await self.flush()
+
+    def start_flusher(self) -> None:
+        """Check :meth:`due` on a timer from a daemon thread; once per worker process."""
+        with self._lock:
+            if not self.enabled or self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        threading.Thread(target=self._flush_periodically, name="stage-timing-flush", daemon=True).start()
+
+    def _flush_periodically(self) -> None:
+        # The tasks' event loops own the shared engine's connections; this thread opens its own.
+        sessionmaker = async_sessionmaker(
+            bind=create_async_engine(self.settings.database_url, poolclass=NullPool), expire_on_commit=False
+        )
+        while True:
+            time.sleep(self.settings.stage_timing_flush_seconds)
+            if self.due():
+                asyncio.run(self.flush(sessionmaker))
+
+    async def flush(self, sessionmaker: async_sessionmaker[AsyncSession] = AsyncSessionLocal) -> int:
+        rows = self.drain()
+        if not rows:
+            return 0
+        try:
+            async with sessionmaker() as session:
+                await session.execute(insert(StageTiming), rows)
+                await session.commit()
+        except Exception:
+            # Timings are diagnostics: keep them for the next flush, but never fail the stage.
+            kept = rows[-self.settings.stage_timing_buffer_max :]
+            with self._lock:
+                self._buffer = kept + self._buffer
+                self._oldest = time.monotonic()
+            logger.exception("stage_timing.flush_failed", rows=len(rows), kept=len(kept))
+            return 0
+        logger.debug("stage_timing.flushed", rows=len(rows))
+        return len(rows)
+
+    async def timeline(self, session: AsyncSession, job_id: str) -> TimelineResponse:
+        stages = await self._stage_stats(session, job_id)
+        window = await session.execute(
+            select(
+                func.min(func.coalesce(StageTiming.enqueued_at, StageTiming.started_at)),
+                func.max(StageTiming.finished_at),
+            ).where(StageTiming.job_id == job_id)
+        )
+        first, last = window.one()
+        path = await self._critical_path(session, job_id)
+        bottleneck, recommendation = _bottleneck(path)
+        return TimelineResponse(
+            job_id=job_id,
+            wall_ms=_ms(last - first) if first and last else None,
+            stages=stages,
+            critical_path=path,
+            bottleneck=bottleneck,
+            recommendation=recommendation,
+        )
+
+    async def _stage_stats(self, session: AsyncSession, job_id: str) -> List[StageTimeline]:
+        wait = func.extract("epoch", StageTiming.started_at - StageTiming.enqueued_at) * 1000
+        run = func.extract("epoch", StageTiming.finished_at - StageTiming.started_at) * 1000
+        rows = await session.execute(
+            select(
+                StageTiming.stage,
+                func.count(),
+                func.count().filter(StageTiming.outcome == StageOutcomeEnum.FAILED.value),
+                func.count(func.distinct(StageTiming.worker)),
+                *_duration_columns(wait),
+                *_duration_columns(run),
+                func.sum(run),
+                func.sum(StageTiming.db_ms),
+                func.sum(StageTiming.storage_ms),
+                func.sum(StageTiming.bytes_in),
+                func.sum(StageTiming.bytes_out),
+                func.min(StageTiming.started_at),
+                func.max(StageTiming.finished_at),
+            )
+            .where(StageTiming.job_id == job_id)
+            .group_by(StageTiming.stage)
+        )
+        stats: List[StageTimeline] = []
+        for row in rows.tuples():
+            stage, calls, failed, workers = row[:4]
+            wait_stats, run_stats = _duration_stats(row[4:8]), _duration_stats(row[8:12])
+            run_total, db_total, storage_total = (float(value or 0) for value in row[12:15])
+            bytes_in, bytes_out, first, last = row[15:]
+            stats.append(
+                StageTimeline(
+                    stage=stage,
+                    calls=calls,
+                    failed=failed,
+                    workers=workers,
+                    wait_ms=wait_stats,
+                    run_ms=run_stats,
+                    run_ms_total=round(run_total, 1),
+                    db_ms_total=round(db_total, 1),
+                    storage_ms_total=round(storage_total, 1),
+                    compute_ms_total=round(max(run_total - db_total - storage_total, 0.0), 1),
+                    bytes_in=int(bytes_in or 0),
+                    bytes_out=int(bytes_out or 0),
+                    first_started_at=first,
+                    last_finished_at=last,
+                )
+            )
+        return sorted(stats, key=lambda stat: stat.first_started_at)
+
+    async def _critical_path(self, session: AsyncSession, job_id: str) -> List[CriticalPathStep]:
+        """The chain of calls behind the page that finished last, from process to snapshot.
+
+        Pages run in parallel, so the job cannot finish before its slowest page: that page's
+        waits and runs are what any extra capacity has to shorten.
+        """
+        completed = StageTiming.outcome == StageOutcomeEnum.COMPLETED.value
+        last_page = await session.scalar(
+            select(StageTiming.page_id)
+            .where(StageTiming.job_id == job_id, StageTiming.stage == DEID_STAGE, completed)
+            .order_by(StageTiming.finished_at.desc())
+            .limit(1)
+        )
+        rows = (
+            await session.scalars(
+                select(StageTiming)
+                .where(
+                    StageTiming.job_id == job_id,
+                    completed,
+                    (StageTiming.page_id == last_page) | StageTiming.stage.in_([PROCESS_STAGE, SNAPSHOT_STAGE]),
+                )
+                .order_by(StageTiming.started_at)
+            )
+        ).all()
+        # A resumed stage runs again; the latest run is the one the page went through.
+        latest: Dict[str, StageTiming] = {}
+        for timing in rows:
+            latest[timing.stage] = timing
+        chain = sorted(latest.values(), key=lambda timing: timing.started_at)
+
+        steps: List[CriticalPathStep] = []
+        for index, timing in enumerate(chain):
+            run = timing.finished_at - timing.started_at
+            share = 1.0
+            if timing.stage == PROCESS_STAGE and index + 1 < len(chain) and chain[index + 1].enqueued_at:
+                # The page leaves process_job as soon as it is rasterized, not when the whole job is.
+                handoff = min(max(chain[index + 1].enqueued_at - timing.started_at, timedelta(0)), run)
+                share = handoff / run if run.total_seconds() else 1.0
+                run = handoff
+            run_ms = _ms(run)
+            db_ms, storage_ms = timing.db_ms * share, timing.storage_ms * share
+            steps.append(
+                CriticalPathStep(
+                    stage=timing.stage,
+                    page_id=timing.page_id,
+                    worker=timing.worker,
+                    wait_ms=_ms(timing.started_at - timing.enqueued_at) if timing.enqueued_at else 0.0,
+                    run_ms=run_ms,
+                    db_ms=round(db_ms, 1),
+                    storage_ms=round(storage_ms, 1),
+                    compute_ms=round(max(run_ms - db_ms - storage_ms, 0.0), 1),
+                )
+            )
+        return steps
+
+
+def _duration_columns(expression) -> list:
+    return [
+        func.avg(expression),
+        *(func.percentile_cont(fraction).within_group(expression) for fraction in _PERCENTILES),
+        func.max(expression),
+    ]
+
+
+def _duration_stats(values) -> DurationStats:
+    avg, p50, p95, maximum = (round(float(value), 1) if value is not None else None for value in values)
+    return DurationStats(avg=avg, p50=p50, p95=p95, max=maximum)
+
+
+def _ms(delta) -> float:
+    return round(delta.total_seconds() * 1000, 1)
+
+
+def _bottleneck(path: List[CriticalPathStep]) -> tuple[str | None, str | None]:
+    """Name the largest share of the critical path and what capacity would shorten it."""
+    shares: Dict[str, float] = {}
+    for step in path:
+        shares[f"wait:{step.stage}"] = shares.get(f"wait:{step.stage}", 0.0) + step.wait_ms
+        shares[f"compute:{step.stage}"] = shares.get(f"compute:{step.stage}", 0.0) + step.compute_ms
+        shares["db"] = shares.get("db", 0.0) + step.db_ms
+        shares["storage"] = shares.get("storage", 0.0) + step.storage_ms
+    if not shares or max(shares.values()) <= 0:
+        return None, None
+    name = max(shares, key=shares.__getitem__)
+    kind, _, stage = name.partition(":")
+    if kind == "wait":
+        return name, f"Calls queue longest before the {stage} stage: add {stage} workers."
+    if kind == "compute":
+        return name, f"The {stage} stage's own processing dominates: add CPU for {stage} workers."
+    if kind == "db":
+        return name, "SQL time dominates: add database capacity or connections."
+    return name, "Object storage transfers dominate: add storage bandwidth."
+
+
+_stage_timing_service: StageTimingService | None = None
+
+
+def get_stage_timing_service() -> StageTimingService:
+    global _stage_timing_service
+    if _stage_timing_service is None:
+        _stage_timing_service = StageTimingService()
+    return _stage_timing_service
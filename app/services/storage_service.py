@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Tuple
+import os
+from datetime import datetime
+from typing import BinaryIO, List, Tuple
 
 from app.utils.minio_client import get_minio_client
 from app.utils.logger import get_logger
+from app.utils.stage_timer import add_bytes, storage_call
 
 logger = get_logger(__name__)
 
@@ -15,16 +18,42 @@ class StorageService:
 
     async def store_file(self, path: str, data: bytes, content_type: str) -> str:
         logger.info("storage.upload.start", path=path)
-        await self.client.upload(path, data, content_type)
+        with storage_call():
+            await self.client.upload(path, data, content_type)
+        add_bytes(bytes_out=len(data))
         logger.info("storage.upload.completed", path=path)
         return path
 
+    async def store_stream(self, path: str, stream: BinaryIO, content_type: str, length: int = -1) -> str:
+        logger.info("storage.upload.start", path=path, streamed=True)
+        with storage_call():
+            await self.client.upload_stream(path, stream, content_type, length)
+        add_bytes(bytes_out=max(length, 0))
+        logger.info("storage.upload.completed", path=path)
+        return path
+
+    async def retrieve_to_file(self, path: str, file_path: str) -> None:
+        logger.info("storage.download.start", path=path, file_path=file_path)
+        with storage_call():
+            await self.client.download_to_file(path, file_path)
+        add_bytes(bytes_in=os.path.getsize(file_path))
+        logger.info("storage.download.completed", path=path)
+
     async def retrieve_file(self, path: str) -> bytes:
         logger.info("storage.download.start", path=path)
-        content = await self.client.download(path)
+        with storage_call():
+            content = await self.client.download(path)
+        add_bytes(bytes_in=len(content))
         logger.info("storage.download.completed", path=path)
         return content
 
+    async def list_files(self, prefix: str) -> List[Tuple[str, int, datetime | None]]:
+        return await self.client.list_objects(prefix)
+
+    async def ensure_tiering(self, rule_id: str, prefix: str, days: int, tier: str) -> None:
+        await self.client.ensure_transition_rule(rule_id, prefix, days, tier)
+        logger.info("storage.tiering.configured", rule_id=rule_id, prefix=prefix, days=days, tier=tier)
+
 
 def get_storage_service() -> StorageService:
     return StorageService()
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, Sequence, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import get_settings
+from app.db.models.document_page import DocumentPage
+from app.db.models.ocr_deidentified_text import SEARCH_CONFIG, OcrDeidentifiedText
+from app.db.models.ocr_raw_text import OcrRawText
+from app.db.models.ocr_spellchecked_text import OcrSpellcheckedText
+from app.utils import text_codec
+
+COMPACT_MODE = "compact"
+
+
+@dataclass
+class PageTexts:
+    raw: str | None = None
+    spellchecked: str | None = None
+    deid: str | None = None
+
+
+class TextStoreService:
+    """Reads and writes the per-page stage texts in either storage mode.
+
+    ``plain`` keeps three full copies. ``compact`` keeps the raw text zstd-compressed and the
+    spellchecked and de-identified texts as deltas against their predecessor. Rows written in
+    either mode decode the same way, so the mode can be switched at any time.
+    """
+
+    def __init__(self) -> None:
+        self.compact = get_settings().text_storage_mode == COMPACT_MODE
+
+    async def save_raw(self, session: AsyncSession, page_id: str, text: str) -> None:
+        row = await session.scalar(select(OcrRawText).where(OcrRawText.page_id == page_id))
+        if not row:
+            row = OcrRawText(page_id=page_id)
+            session.add(row)
+        row.raw_text, row.raw_text_zstd = (None, text_codec.compress(text)) if self.compact else (text, None)
+
+    async def save_spellchecked(self, session: AsyncSession, page_id: str, text: str, raw_text: str) -> None:
+        row = await session.scalar(select(OcrSpellcheckedText).where(OcrSpellcheckedText.page_id == page_id))
+        if not row:
+            row = OcrSpellcheckedText(page_id=page_id)
+            session.add(row)
+        if self.compact:
+            row.spellchecked_text, row.spellchecked_delta = None, text_codec.make_delta(raw_text, text)
+        else:
+            row.spellchecked_text, row.spellchecked_delta = text, None
+
+    async def save_deidentified(self, session: AsyncSession, page_id: str, text: str, spellchecked_text: str) -> None:
+        row = await session.scalar(select(OcrDeidentifiedText).where(OcrDeidentifiedText.page_id == page_id))
+        if not row:
+            row = OcrDeidentifiedText(page_id=page_id)
+            session.add(row)
+        if self.compact:
+            row.deid_text, row.deid_delta = None, text_codec.make_delta(spellchecked_text, text)
+        else:
+            row.deid_text, row.deid_delta = text, None
+        row.deid_tsv = func.to_tsvector(SEARCH_CONFIG, text)
+
+    async def save_spellchecked_many(self, session: AsyncSession, pages: Sequence[Tuple[str, str, str]]) -> None:
+        """Upsert ``(page_id, text, raw_text)`` for a batch of pages in one statement."""
+        if not pages:
+            return
+        rows = []
+        for page_id, text, raw_text in pages:
+            if self.compact:
+                stored, delta = None, text_codec.make_delta(raw_text, text)
+            else:
+                stored, delta = text, None
+            rows.append({"page_id": page_id, "spellchecked_text": stored, "spellchecked_delta": delta})
+        statement = insert(OcrSpellcheckedText).values(rows)
+        await session.execute(
+            statement.on_conflict_do_update(
+                index_elements=[OcrSpellcheckedText.page_id],
+                set_={
+                    "spellchecked_text": statement.excluded.spellchecked_text,
+                    "spellchecked_delta": statement.excluded.spellchecked_delta,
+                },
+            )
+        )
+
+    async def save_deidentified_many(self, session: AsyncSession, pages: Sequence[Tuple[str, str, str]]) -> None:
+        """Upsert ``(page_id, text, spellchecked_text)`` for a batch of pages in one statement."""
+        if not pages:
+            return
+        rows = []
+        for page_id, text, spellchecked_text in pages:
+            if self.compact:
+                stored, delta = None, text_codec.make_delta(spellchecked_text, text)
+            else:
+                stored, delta = text, None
+            rows.append(
+                {
+                    "page_id": page_id,
+                    "deid_text": stored,
+                    "deid_delta": delta,
+                    "deid_tsv": func.to_tsvector(SEARCH_CONFIG, text),
+                }
+            )
+        statement = insert(OcrDeidentifiedText).values(rows)
+        await session.execute(
+            statement.on_conflict_do_update(
+                index_elements=[OcrDeidentifiedText.page_id],
+                set_={
+                    "deid_text": statement.excluded.deid_text,
+                    "deid_delta": statement.excluded.deid_delta,
+                    "deid_tsv": statement.excluded.deid_tsv,
+                },
+            )
+        )
+
+    async def load_stage_inputs(
+        self,
+        session: AsyncSession,
+        page_ids: Iterable[str],
+        spellchecked: bool = False,
+    ) -> Dict[str, Tuple[str, PageTexts]]:
+        """``(document id, texts)`` of each page with a raw text, in one query.
+
+        The inputs of a spellcheck batch, or with ``spellchecked`` of a de-identification batch.
+        """
+        page_ids = list(page_ids)
+        if not page_ids:
+            return {}
+        columns = [DocumentPage.page_id, DocumentPage.document_id, OcrRawText.raw_text, OcrRawText.raw_text_zstd]
+        statement = select(*columns)
+        if spellchecked:
+            statement = statement.add_columns(
+                OcrSpellcheckedText.spellchecked_text, OcrSpellcheckedText.spellchecked_delta
+            ).outerjoin(OcrSpellcheckedText, OcrSpellcheckedText.page_id == DocumentPage.page_id)
+        rows = await session.execute(
+            statement.join(OcrRawText, OcrRawText.page_id == DocumentPage.page_id).where(
+                DocumentPage.page_id.in_(page_ids)
+            )
+        )
+        inputs: Dict[str, Tuple[str, PageTexts]] = {}
+        for row in rows.tuples():
+            page_id, document_id, plain, packed = row[:4]
+            texts = PageTexts(raw=plain if plain is not None else text_codec.decompress(packed))
+            if spellchecked and (row[4] is not None or row[5] is not None):
+                texts.spellchecked = row[4] if row[4] is not None else text_codec.apply_delta(texts.raw, row[5])
+            inputs[page_id] = (document_id, texts)
+        return inputs
+
+    async def raw_text(self, session: AsyncSession, page_id: str) -> str | None:
+        return (await self.load_many(session, [page_id], deid=False)).get(page_id, PageTexts()).raw
+
+    async def spellchecked_text(self, session: AsyncSession, page_id: str) -> str | None:
+        return (await self.load_many(session, [page_id], deid=False)).get(page_id, PageTexts()).spellchecked
+
+    async def load_many(
+        self,
+        session: AsyncSession,
+        page_ids: Iterable[str],
+        deid: bool = True,
+    ) -> Dict[str, PageTexts]:
+        """Decoded texts for each page that has at least a raw text, in three queries."""
+        page_ids = list(page_ids)
+        if not page_ids:
+            return {}
+
+        texts: Dict[str, PageTexts] = {}
+        raw_rows = await session.execute(
+            select(OcrRawText.page_id, OcrRawText.raw_text, OcrRawText.raw_text_zstd).where(
+                OcrRawText.page_id.in_(page_ids)
+            )
+        )
+        for page_id, plain, packed in raw_rows:
+            texts[page_id] = PageTexts(raw=plain if plain is not None else text_codec.decompress(packed))
+
+        spell_rows = await session.execute(
+            select(
+                OcrSpellcheckedText.page_id,
+                OcrSpellcheckedText.spellchecked_text,
+                OcrSpellcheckedText.spellchecked_delta,
+            ).where(OcrSpellcheckedText.page_id.in_(page_ids))
+        )
+        for page_id, plain, delta in spell_rows:
+            page = texts.setdefault(page_id, PageTexts())
+            page.spellchecked = plain if plain is not None else text_codec.apply_delta(page.raw or "", delta)
+
+        if deid:
+            deid_rows = await session.execute(
+                select(OcrDeidentifiedText.page_id, OcrDeidentifiedText.deid_text, OcrDeidentifiedText.deid_delta).where(
+                    OcrDeidentifiedText.page_id.in_(page_ids)
+                )
+            )
+            for page_id, plain, delta in deid_rows:
+                page = texts.setdefault(page_id, PageTexts())
+                page.deid = plain if plain is not None else text_codec.apply_delta(page.spellchecked or "", delta)
+        return texts
+
+
+def get_text_store_service() -> TextStoreService:
+    return TextStoreService()
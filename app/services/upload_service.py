@@ -10,6 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.models.document import Document, DocumentStatusEnum
 from app.db.models.job import Job, JobStatusEnum
 from app.schemas.upload_schema import UploadMetadata
+from app.services.cache_service import job_tag, mark_changed, patient_tag
 from app.services.storage_service import get_storage_service
 from app.utils.image_utils import detect_file_kind
 from app.utils.logger import get_logger
@@ -26,9 +27,10 @@ class UploadService:
         session: AsyncSession,
         files: List[UploadFile],
         metadata: UploadMetadata,
+        callback_url: str | None = None,
     ) -> str:
         """Persist uploaded files and return the job identifier."""
-        job = Job(status=JobStatusEnum.PENDING.value)
+        job = Job(status=JobStatusEnum.PENDING.value, documents_pending=len(files), callback_url=callback_url)
         session.add(job)
         await session.flush()
 
@@ -64,6 +66,7 @@ class UploadService:
             )
             session.add(document)
 
+        mark_changed(session, job_tag(job.job_id), patient_tag(metadata.hospital_id, metadata.patient_id))
         await session.commit()
 
         logger.info("upload.ingested", job_id=job.job_id, documents=len(files))
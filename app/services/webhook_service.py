@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import hmac
+import json
+import random
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Dict, Iterable, List, Sequence
+
+from sqlalchemy import Row, func, insert, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import get_settings
+from app.db.models.document import Document
+from app.db.models.job import Job, JobStatusEnum
+from app.db.models.webhook_delivery import WebhookDelivery, WebhookStatusEnum
+from app.db.session import AsyncSessionLocal
+from app.utils.logger import get_logger
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = get_logger(__name__)
+
+SIGNATURE_HEADER = "X-Webhook-Signature"
+
+
+@dataclass
+class DeliveryReport:
+    requests: int = 0
+    delivered: int = 0
+    retried: int = 0
+    failed: int = 0
+
+
+class WebhookService:
+    """Completion webhooks through a transactional outbox.
+
+    :meth:`enqueue` adds the delivery in the transaction that completes or fails the job, so there
+    is a delivery exactly when that outcome commits. :meth:`deliver` claims due deliveries
+    (``FOR UPDATE SKIP LOCKED``, so any number of workers can run it), posts them to each endpoint
+    as ``{"events": [...]}`` batches, at most ``webhook_delivery_concurrency`` endpoints at a time,
+    and reschedules what failed with exponential backoff. Delivery is at least once: receivers
+    should ignore a ``delivery_id`` they have already seen.
+    """
+
+    def __init__(self) -> None:
+        self.settings = get_settings()
+
+    async def enqueue(self, session: AsyncSession, job_id: str, event: str) -> None:
+        """Queue the job's webhook, if it registered one, in the caller's transaction."""
+        await session.execute(
+            insert(WebhookDelivery).from_select(
+                ["job_id", "url", "event"],
+                select(Job.job_id, Job.callback_url, literal(event)).where(
+                    Job.job_id == job_id, Job.callback_url.is_not(None)
+                ),
+            )
+        )
+
+    async def deliver(self) -> DeliveryReport:
+        # Only the delivery task needs httpx; the services that enqueue are imported by the API.
+        import httpx
+
+        report = DeliveryReport()
+        async with AsyncSessionLocal() as session:
+            claimed = await self._claim(session)
+            if not claimed:
+                return report
+            summaries = await self._summaries(session, {row.job_id for row in claimed})
+            await session.commit()
+
+        by_url: Dict[str, List[Row]] = defaultdict(list)
+        for row in claimed:
+            by_url[row.url].append(row)
+        errors: Dict[int, str | None] = {}
+        semaphore = asyncio.Semaphore(max(self.settings.webhook_delivery_concurrency, 1))
+        batch_size = max(self.settings.webhook_batch_max_events, 1)
+
+        async with httpx.AsyncClient(timeout=self.settings.webhook_timeout_seconds) as client:
+
+            async def post_all(url: str, rows: List[Row]) -> None:
+                error = None
+                async with semaphore:
+                    for start in range(0, len(rows), batch_size):
+                        batch = rows[start : start + batch_size]
+                        # After a failed batch the endpoint's remaining deliveries wait for the retry too.
+                        if error is None:
+                            events = [_event(row, summaries.get(row.job_id, {})) for row in batch]
+                            error = await self._post(client, url, events)
+                            report.requests += 1
+                        errors.update((row.delivery_id, error) for row in batch)
+                if error is not None:
+                    logger.warning("webhooks.endpoint.failed", url=url, deliveries=len(rows), error=error)
+
+            await asyncio.gather(*(post_all(url, rows) for url, rows in by_url.items()))
+
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                update(WebhookDelivery),
+                [self._outcome(row, errors[row.delivery_id], report) for row in claimed],
+            )
+            await session.commit()
+        logger.info(
+            "webhooks.delivered",
+            endpoints=len(by_url),
+            requests=report.requests,
+            delivered=report.delivered,
+            retried=report.retried,
+            failed=report.failed,
+        )
+        return report
+
+    async def _claim(self, session: AsyncSession) -> Sequence[Row]:
+        """Take due deliveries for this run; if it dies, they are due again once the lease ends."""
+        due = (
+            select(WebhookDelivery.delivery_id)
+            .where(
+                WebhookDelivery.status == WebhookStatusEnum.PENDING.value,
+                WebhookDelivery.next_attempt_at <= func.now(),
+            )
+            .order_by(WebhookDelivery.next_attempt_at)
+            .limit(self.settings.webhook_claim_limit)
+            .with_for_update(skip_locked=True)
+        )
+        lease = timedelta(seconds=self.settings.webhook_claim_lease_seconds)
+        return (
+            await session.execute(
+                update(WebhookDelivery)
+                .where(WebhookDelivery.delivery_id.in_(due))
+                .values(attempts=WebhookDelivery.attempts + 1, next_attempt_at=func.now() + lease)
+                .returning(
+                    WebhookDelivery.delivery_id,
+                    WebhookDelivery.job_id,
+                    WebhookDelivery.url,
+                    WebhookDelivery.event,
+                    WebhookDelivery.attempts,
+                )
+                .execution_options(synchronize_session=False)
+            )
+        ).all()
+
+    async def _summaries(self, session: AsyncSession, job_ids: Iterable[str]) -> Dict[str, dict]:
+        rows = await session.execute(
+            select(
+                Job.job_id,
+                Job.updated_at,
+                func.count(Document.document_id),
+                func.coalesce(func.sum(Document.pages_total), 0),
+            )
+            .outerjoin(Document, Document.job_id == Job.job_id)
+            .where(Job.job_id.in_(list(job_ids)))
+            .group_by(Job.job_id)
+        )
+        return {
+            job_id: {
+                "documents": documents,
+                "pages": pages,
+                "finished_at": updated_at.isoformat() if updated_at else None,
+            }
+            for job_id, updated_at, documents, pages in rows.tuples()
+        }
+
+    async def _post(self, client: httpx.AsyncClient, url: str, events: List[dict]) -> str | None:
+        """POST one batch; returns why it failed, or None."""
+        import httpx
+
+        body = json.dumps({"events": events}, separators=(",", ":")).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if self.settings.webhook_signing_secret:
+            digest = hmac.new(self.settings.webhook_signing_secret.encode("utf-8"), body, hashlib.sha256)
+            headers[SIGNATURE_HEADER] = f"sha256={digest.hexdigest()}"
+        try:
+            response = await client.post(url, content=body, headers=headers)
+        except httpx.HTTPError as exc:
+            return f"{type(exc).__name__}: {exc}"[:500]
+        if response.is_success:
+            return None
+        return f"HTTP {response.status_code}"
+
+    def _outcome(self, row: Row, error: str | None, report: DeliveryReport) -> dict:
+        now = datetime.utcnow()
+        values = {"delivery_id": row.delivery_id, "last_error": error, "delivered_at": None, "next_attempt_at": now}
+        if error is None:
+            report.delivered += 1
+            return {**values, "status": WebhookStatusEnum.DELIVERED.value, "delivered_at": now}
+        if row.attempts >= self.settings.webhook_max_attempts:
+            report.failed += 1
+            return {**values, "status": WebhookStatusEnum.FAILED.value}
+        report.retried += 1
+        delay = min(
+            self.settings.webhook_retry_base_seconds * 2 ** (row.attempts - 1),
+            self.settings.webhook_retry_max_seconds,
+        )
+        # Jitter spreads the retries of a batch that failed together.
+        delay *= random.uniform(0.8, 1.2)
+        return {**values, "status": WebhookStatusEnum.PENDING.value, "next_attempt_at": now + timedelta(seconds=delay)}
+
+
+def _event(row: Row, summary: dict) -> dict:
+    event = {"delivery_id": row.delivery_id, "job_id": row.job_id, "status": row.event, **summary}
+    if row.event == JobStatusEnum.COMPLETED.value:
+        event["result"] = f"/result/{row.job_id}"
+    return event
+
+
+def get_webhook_service() -> WebhookService:
+    return WebhookService()
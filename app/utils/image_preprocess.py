@@ -0,0 +1,205 @@
+"""OCR image preprocessing: grayscale, border and margin cropping, deskew, adaptive thresholding.
+
+Everything after decoding is NumPy array work; the skew search runs on a 4x-reduced copy so the
+full raster is thresholded only once. The functions are pure and picklable so they can run in a
+process pool.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from io import BytesIO
+from typing import Any, Dict
+
+import numpy as np
+from PIL import Image
+
+_LUMA = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+_SKEW_REDUCTION = 4
+
+
+@dataclass(frozen=True)
+class PreprocessProfile:
+    grayscale: bool = True
+    # Adaptive (local mean) thresholding to a 1-bit image; ``block_size`` is the odd window side in
+    # pixels and ``threshold_offset`` how many grey levels below the local mean ink must be.
+    binarize: bool = True
+    block_size: int = 31
+    threshold_offset: int = 10
+    crop_margins: bool = True
+    # Fraction of the cropped side kept as white space around the content.
+    margin_padding: float = 0.02
+    deskew: bool = True
+    max_skew_degrees: float = 5.0
+    skew_step_degrees: float = 0.2
+    # Rasters come at 300 DPI; large clean print OCRs as well and faster when downscaled.
+    scale: float = 1.0
+
+    @classmethod
+    def from_dict(cls, values: Dict[str, Any], base: "PreprocessProfile | None" = None) -> "PreprocessProfile":
+        known = {f.name for f in fields(cls)}
+        merged = {f.name: getattr(base or cls(), f.name) for f in fields(cls)}
+        merged.update({key: value for key, value in values.items() if key in known})
+        return cls(**merged)
+
+
+DEFAULT_PROFILE = PreprocessProfile()
+
+# Built-in profiles per ``DocTypeEnum`` value; ``Settings.ocr_preprocess_profiles`` overrides fields.
+PROFILES: Dict[str, PreprocessProfile] = {
+    # Dense tables in small print: keep full resolution and a tight threshold window.
+    "lab_reports": PreprocessProfile(block_size=25, threshold_offset=8),
+    # Long typed prose in large fonts.
+    "radiology_reports": PreprocessProfile(scale=0.75),
+    # Often handwritten or faxed: wider window and stronger offset against paper texture.
+    "progress_notes": PreprocessProfile(block_size=51, threshold_offset=15),
+    "consultation_notes": PreprocessProfile(scale=0.75),
+}
+
+
+def preprocess_image(image_bytes: bytes, profile: PreprocessProfile) -> bytes:
+    """Preprocess one page image for OCR and return it as PNG."""
+    with Image.open(BytesIO(image_bytes)) as image:
+        image = image.convert("L" if image.mode in ("1", "L", "LA", "I;16") else "RGB")
+    if profile.scale < 1.0:
+        size = (max(1, round(image.width * profile.scale)), max(1, round(image.height * profile.scale)))
+        image = image.resize(size, Image.Resampling.BOX)
+
+    # Colour is only carried along when the profile asks to keep it.
+    pixels = None if profile.grayscale or profile.binarize or image.mode == "L" else np.asarray(image)
+    gray = np.asarray(image) if image.mode == "L" else to_grayscale(np.asarray(image))
+    top, bottom, left, right = dark_border_bounds(gray)
+    gray = gray[top:bottom, left:right]
+    if pixels is not None:
+        pixels = pixels[top:bottom, left:right]
+
+    if profile.deskew:
+        skew = estimate_skew(gray, profile)
+        if abs(skew) >= profile.skew_step_degrees / 2:
+            # Fill the corners the rotation opens up with paper colour so they don't read as edges.
+            paper = int(np.percentile(gray[:: _SKEW_REDUCTION, :: _SKEW_REDUCTION], 90))
+            gray = rotate(gray, -skew, paper)
+            if pixels is not None:
+                pixels = np.stack([rotate(pixels[..., channel], -skew, 255) for channel in range(3)], axis=-1)
+    ink = adaptive_threshold(gray, profile.block_size, profile.threshold_offset)
+
+    if profile.crop_margins:
+        top, bottom, left, right = content_bounds(ink, profile.margin_padding)
+        gray, ink = gray[top:bottom, left:right], ink[top:bottom, left:right]
+        if pixels is not None:
+            pixels = pixels[top:bottom, left:right]
+
+    if profile.binarize:
+        output = Image.fromarray(~ink)
+    elif pixels is None:
+        output = Image.fromarray(gray)
+    else:
+        output = Image.fromarray(pixels)
+    buffer = BytesIO()
+    output.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def to_grayscale(pixels: np.ndarray) -> np.ndarray:
+    return (pixels.astype(np.float32) @ _LUMA).clip(0, 255).astype(np.uint8)
+
+
+def adaptive_threshold(gray: np.ndarray, block_size: int, offset: int) -> np.ndarray:
+    """Ink mask: pixels whose 3x3 mean is darker than their ``block_size`` neighbourhood mean
+    minus ``offset``. The small window keeps sensor noise from turning into specks."""
+    return smooth3(gray) < box_mean(gray, block_size) - offset
+
+
+def smooth3(gray: np.ndarray) -> np.ndarray:
+    """3x3 mean as two separable sums of shifted slices."""
+    padded = np.pad(gray, 1, mode="edge").astype(np.uint16)
+    rows = padded[:-2] + padded[1:-1] + padded[2:]
+    return (rows[:, :-2] + rows[:, 1:-1] + rows[:, 2:]).astype(np.float32) * (1.0 / 9)
+
+
+def box_mean(gray: np.ndarray, size: int) -> np.ndarray:
+    """Mean over the ``size`` x ``size`` window centred on each pixel, from one integral image.
+
+    uint32 wraps around, but every true window sum fits in 32 bits, so the four-corner
+    difference is still exact.
+    """
+    block = size | 1
+    height, width = gray.shape
+    padded = np.pad(gray, block // 2, mode="edge")
+    integral = np.zeros((padded.shape[0] + 1, padded.shape[1] + 1), dtype=np.uint32)
+    np.cumsum(padded, axis=0, dtype=np.uint32, out=integral[1:, 1:])
+    np.cumsum(integral[1:, 1:], axis=1, dtype=np.uint32, out=integral[1:, 1:])
+    sums = (
+        integral[block : block + height, block : block + width]
+        - integral[:height, block : block + width]
+        - integral[block : block + height, :width]
+        + integral[:height, :width]
+    )
+    return sums.astype(np.float32) * (1.0 / (block * block))
+
+
+def dark_border_bounds(gray: np.ndarray) -> tuple[int, int, int, int]:
+    """Trim the solid dark bands a scanner leaves outside the paper."""
+    paper = np.percentile(gray[:: _SKEW_REDUCTION, :: _SKEW_REDUCTION], 90)
+    dark_rows = gray.mean(axis=1) < paper * 0.5
+    dark_cols = gray.mean(axis=0) < paper * 0.5
+    top, bottom = _edge_run(dark_rows), len(dark_rows) - _edge_run(dark_rows[::-1])
+    left, right = _edge_run(dark_cols), len(dark_cols) - _edge_run(dark_cols[::-1])
+    if bottom - top < gray.shape[0] // 2 or right - left < gray.shape[1] // 2:
+        # Mostly dark: a photo or inverted page rather than a border; leave it alone.
+        return 0, gray.shape[0], 0, gray.shape[1]
+    return top, bottom, left, right
+
+
+def _edge_run(flags: np.ndarray) -> int:
+    """Length of the run of True values at the start of ``flags``."""
+    clear = np.flatnonzero(~flags)
+    return int(clear[0]) if clear.size else len(flags)
+
+
+def content_bounds(ink: np.ndarray, padding: float) -> tuple[int, int, int, int]:
+    height, width = ink.shape
+    # A row or column needs more than stray specks to count as content.
+    rows = np.flatnonzero(ink.sum(axis=1) > max(2, width // 200))
+    cols = np.flatnonzero(ink.sum(axis=0) > max(2, height // 200))
+    if rows.size == 0 or cols.size == 0:
+        return 0, height, 0, width
+    pad_y, pad_x = int(height * padding), int(width * padding)
+    return (
+        max(0, rows[0] - pad_y),
+        min(height, rows[-1] + 1 + pad_y),
+        max(0, cols[0] - pad_x),
+        min(width, cols[-1] + 1 + pad_x),
+    )
+
+
+def estimate_skew(gray: np.ndarray, profile: PreprocessProfile) -> float:
+    """Counter-clockwise tilt of the text lines in degrees; rotating by its negative levels them.
+
+    Projection-profile search on a 4x-reduced ink mask: the ink is projected onto the vertical
+    axis for every candidate angle, and the angle whose row histogram is sharpest wins.
+    """
+    r = _SKEW_REDUCTION
+    height, width = (gray.shape[0] // r) * r, (gray.shape[1] // r) * r
+    small = gray[:height, :width].reshape(height // r, r, width // r, r).mean(axis=(1, 3)).astype(np.uint8)
+    reduced = adaptive_threshold(small, max(3, profile.block_size // r), profile.threshold_offset)
+    ys, xs = np.nonzero(reduced)
+    if ys.size < 100:
+        return 0.0
+
+    step = profile.skew_step_degrees
+    angles = np.arange(-profile.max_skew_degrees, profile.max_skew_degrees + step / 2, step)
+    radians = np.deg2rad(angles)
+    ys, xs = ys.astype(np.float32), xs.astype(np.float32) - reduced.shape[1] / 2
+    scores = np.empty(len(angles), dtype=np.float64)
+    for index, theta in enumerate(radians):
+        rows = np.rint(ys * np.cos(theta) + xs * np.sin(theta)).astype(np.int64)
+        counts = np.bincount(rows - rows.min())
+        scores[index] = np.dot(counts, counts)
+    return round(float(angles[int(np.argmax(scores))]), 3)
+
+
+def rotate(channel: np.ndarray, angle: float, fill: int) -> np.ndarray:
+    """Rotate one 8-bit channel counter-clockwise by ``angle`` degrees."""
+    image = Image.fromarray(channel).rotate(angle, resample=Image.Resampling.BILINEAR, expand=True, fillcolor=fill)
+    return np.asarray(image)
@@ -1,12 +1,41 @@
 from __future__ import annotations
 
+from io import BytesIO
 from typing import Literal
 
 ImageType = Literal["pdf", "image"]
 
+_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", ".png", "image/png"),
+    (b"\xff\xd8\xff", ".jpg", "image/jpeg"),
+    (b"II*\x00", ".tif", "image/tiff"),
+    (b"MM\x00*", ".tif", "image/tiff"),
+)
+
 
 def detect_file_kind(filename: str, content_type: str) -> ImageType:
     if filename.lower().endswith(".pdf") or content_type == "application/pdf":
         return "pdf"
     return "image"
 
+
+def image_format(data: bytes) -> tuple[str, str]:
+    """``(extension, content type)`` of an encoded page image, sniffed from its signature."""
+    for signature, extension, content_type in _SIGNATURES:
+        if data.startswith(signature):
+            return extension, content_type
+    return ".bin", "application/octet-stream"
+
+
+def downsample_image(data: bytes, max_dimension: int) -> bytes:
+    """Shrink the image so its longest side is at most ``max_dimension``; always returns a PNG."""
+    from PIL import Image
+
+    with Image.open(BytesIO(data)) as image:
+        image.load()
+        if image.mode not in ("1", "L", "RGB"):
+            image = image.convert("RGB")
+        image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+        output = BytesIO()
+        image.save(output, format="PNG", optimize=True)
+    return output.getvalue()
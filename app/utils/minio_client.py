@@ -1,35 +1,52 @@
 from __future__ import annotations
 
 import asyncio
+from datetime import datetime
 from functools import lru_cache
 from io import BytesIO
-from typing import BinaryIO
-
-from minio import Minio
+from typing import TYPE_CHECKING, BinaryIO, List, Tuple
 
 from app.config.settings import get_settings
 
+if TYPE_CHECKING:
+    from minio import Minio
+
+_PART_SIZE = 16 * 1024 * 1024
+
 
 class AsyncMinioClient:
     """Thin async wrapper around the MinIO SDK using thread executors."""
 
     def __init__(self) -> None:
-        settings = get_settings()
-        self.bucket = settings.minio_bucket
-        self._client = Minio(
-            endpoint=settings.minio_endpoint,
-            access_key=settings.minio_access_key,
-            secret_key=settings.minio_secret_key,
-            secure=settings.minio_secure,
-        )
+        self.settings = get_settings()
+        self.bucket = self.settings.minio_bucket
+        self._minio: Minio | None = None
+        self._bucket_ready = False
+
+    @property
+    def _client(self) -> Minio:
+        # The SDK is slow to import and only needed once a request actually touches storage.
+        if self._minio is None:
+            from minio import Minio
+
+            self._minio = Minio(
+                endpoint=self.settings.minio_endpoint,
+                access_key=self.settings.minio_access_key,
+                secret_key=self.settings.minio_secret_key,
+                secure=self.settings.minio_secure,
+            )
+        return self._minio
 
     async def ensure_bucket(self) -> None:
+        if self._bucket_ready:
+            return
         exists = await asyncio.to_thread(
             self._client.bucket_exists,
             bucket_name=self.bucket,
         )
         if not exists:
             await asyncio.to_thread(self._client.make_bucket, bucket_name=self.bucket)
+        self._bucket_ready = True
 
     async def upload(self, object_name: str, data: bytes, content_type: str) -> None:
         await self.ensure_bucket()
@@ -55,9 +72,60 @@ class AsyncMinioClient:
             response.close()
             response.release_conn()
 
-    async def upload_stream(self, object_name: str, stream: BinaryIO, content_type: str) -> None:
-        data = stream.read()
-        await self.upload(object_name, data, content_type)
+    async def upload_stream(self, object_name: str, stream: BinaryIO, content_type: str, length: int = -1) -> None:
+        """Upload from a file-like object without reading it into memory (multipart if ``length`` is unknown)."""
+        await self.ensure_bucket()
+        await asyncio.to_thread(
+            self._client.put_object,
+            bucket_name=self.bucket,
+            object_name=object_name,
+            data=stream,
+            length=length,
+            content_type=content_type,
+            part_size=_PART_SIZE,
+        )
+
+    async def download_to_file(self, object_name: str, file_path: str) -> None:
+        await asyncio.to_thread(
+            self._client.fget_object,
+            bucket_name=self.bucket,
+            object_name=object_name,
+            file_path=file_path,
+        )
+
+    async def list_objects(self, prefix: str) -> List[Tuple[str, int, datetime | None]]:
+        """``(object name, size, last modified)`` of every object under ``prefix``."""
+
+        def _list() -> List[Tuple[str, int, datetime | None]]:
+            objects = self._client.list_objects(bucket_name=self.bucket, prefix=prefix, recursive=True)
+            return [(obj.object_name, obj.size or 0, obj.last_modified) for obj in objects]
+
+        return await asyncio.to_thread(_list)
+
+    async def ensure_transition_rule(self, rule_id: str, prefix: str, days: int, storage_class: str) -> None:
+        """Add or replace one bucket lifecycle rule moving objects under ``prefix`` to a tier.
+
+        Other rules of the bucket are kept as they are.
+        """
+        from minio.commonconfig import ENABLED, Filter
+        from minio.lifecycleconfig import LifecycleConfig, Rule, Transition
+
+        await self.ensure_bucket()
+
+        def _apply() -> None:
+            current = self._client.get_bucket_lifecycle(self.bucket)
+            rules = [rule for rule in (current.rules if current else []) if rule.rule_id != rule_id]
+            rules.append(
+                Rule(
+                    ENABLED,
+                    rule_filter=Filter(prefix=prefix),
+                    rule_id=rule_id,
+                    transition=Transition(days=days, storage_class=storage_class),
+                )
+            )
+            self._client.set_bucket_lifecycle(self.bucket, LifecycleConfig(rules))
+
+        await asyncio.to_thread(_apply)
 
 
 @lru_cache
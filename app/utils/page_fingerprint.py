@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+# Ink and the perceptual hash are judged on a small grayscale copy: fingerprinting costs a PNG
+# decode, a hash of its pixels and a few thousand-element array operations, nothing close to OCR.
+_SAMPLE_SIZE = 256
+_HASH_SIZE = 32
+# Scanner edges, punch holes and staple shadows are not ink.
+_MARGIN = 0.05
+
+
+def _dct_matrix(size: int) -> np.ndarray:
+    k = np.arange(size)[:, None]
+    n = np.arange(size)[None, :]
+    matrix = np.sqrt(2 / size) * np.cos(np.pi * (2 * n + 1) * k / (2 * size))
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+
+_DCT = _dct_matrix(_HASH_SIZE)
+_BITS = np.uint64(1) << np.arange(64, dtype=np.uint64)
+
+
+@dataclass
+class PageFingerprint:
+    # Fraction of the page (inside the margins) covered by ink.
+    ink: float
+    # 64-bit DCT perceptual hash, stored signed so it fits a BIGINT column. Similar pages share
+    # it, so it only picks candidates.
+    phash: int
+    # SHA-256 of the decoded full-resolution pixels: only a page with the same digest is a duplicate.
+    digest: str
+
+
+def fingerprint(image_bytes: bytes) -> PageFingerprint:
+    with Image.open(BytesIO(image_bytes)) as image:
+        image.load()
+        sample = np.asarray(
+            image.convert("L").resize((_SAMPLE_SIZE, _SAMPLE_SIZE), Image.Resampling.BOX), dtype=np.float32
+        )
+        return PageFingerprint(ink=ink_coverage(sample), phash=perceptual_hash(sample), digest=pixel_digest(image))
+
+
+def pixel_digest(image: Image.Image) -> str:
+    """Digest of what the page shows, independent of how its file was encoded."""
+    digest = hashlib.sha256(f"{image.mode}:{image.width}x{image.height}:".encode("ascii"))
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+def ink_coverage(sample: np.ndarray) -> float:
+    margin = int(sample.shape[0] * _MARGIN)
+    inner = sample[margin:-margin, margin:-margin]
+    # Relative to the paper's own brightness, so grey or yellowed scans are not all "ink".
+    paper = np.percentile(inner, 90)
+    return float(np.mean(inner < paper * 0.6))
+
+
+def perceptual_hash(sample: np.ndarray) -> int:
+    reduced = sample.reshape(_HASH_SIZE, sample.shape[0] // _HASH_SIZE, _HASH_SIZE, -1).mean(axis=(1, 3))
+    low = (_DCT @ reduced @ _DCT.T)[:8, :8].flatten()
+    # The DC term only encodes overall brightness.
+    bits = low > np.median(low[1:])
+    value = int(np.sum(_BITS[bits]))
+    return value - (1 << 64) if value >= 1 << 63 else value
+
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import asyncio
+import re
+from io import BytesIO
+from typing import Dict
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# NUL and the other C0 controls except tab and line breaks: Postgres text can't hold NUL, and the
+# rest only show up from broken font encodings.
+_CONTROL_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+async def extract_text_layer(pdf_bytes: bytes, min_chars: int) -> Dict[int, str]:
+    """Embedded text of every page whose text layer looks usable, keyed by 1-based page number."""
+    return await asyncio.to_thread(_extract_text_layer, pdf_bytes, min_chars)
+
+
+def _extract_text_layer(pdf_bytes: bytes, min_chars: int) -> Dict[int, str]:
+    # PyPDF2 is slow to import and only needed once a PDF is actually converted.
+    from PyPDF2 import PdfReader
+    from PyPDF2.errors import PyPdfError
+
+    try:
+        reader = PdfReader(BytesIO(pdf_bytes))
+        if reader.is_encrypted:
+            return {}
+        pages = reader.pages
+    except (PyPdfError, ValueError, OSError):
+        logger.warning("pdf.text_layer.unreadable", exc_info=True)
+        return {}
+
+    texts: Dict[int, str] = {}
+    for page_number, page in enumerate(pages, start=1):
+        try:
+            text = _CONTROL_CHARS.sub("", page.extract_text() or "")
+        except Exception:
+            # One malformed content stream only sends that page to OCR.
+            logger.warning("pdf.text_layer.page_failed", page_number=page_number, exc_info=True)
+            continue
+        if is_usable_text(text, min_chars):
+            texts[page_number] = text
+    return texts
+
+
+def is_usable_text(text: str, min_chars: int) -> bool:
+    """Whether a text layer carries real content rather than a scan's empty or garbled overlay."""
+    stripped = "".join(text.split())
+    if len(stripped) < min_chars:
+        return False
+    # Broken font encodings come out as replacement characters or control/private-use codepoints.
+    readable = sum(
+        1 for char in stripped if char.isprintable() and char != "\ufffd" and not "\ue000" <= char <= "\uf8ff"
+    )
+    alphanumeric = sum(1 for char in stripped if char.isalnum())
+    return readable / len(stripped) >= 0.95 and alphanumeric / len(stripped) >= 0.5
@@ -6,9 +6,6 @@ from io import BytesIO
 from tempfile import TemporaryDirectory
 from typing import List
 
-from pdf2image import convert_from_bytes
-from pdf2image.exceptions import PDFInfoNotInstalledError
-
 
 class PopplerNotInstalledError(Exception):
     """Raised when Poppler is not installed."""
@@ -17,6 +14,9 @@ class PopplerNotInstalledError(Exception):
 
 async def pdf_bytes_to_images(pdf_bytes: bytes) -> List[bytes]:
     """Convert PDF bytes into a list of PNG image bytes."""
+    from pdf2image import convert_from_bytes
+    from pdf2image.exceptions import PDFInfoNotInstalledError
+
     try:
         with TemporaryDirectory() as temp_dir:
             images = await asyncio.to_thread(
@@ -33,13 +33,52 @@ async def pdf_bytes_to_images(pdf_bytes: bytes) -> List[bytes]:
                 byte_images.append(buffer.getvalue())
             return byte_images
     except PDFInfoNotInstalledError:
-        raise PopplerNotInstalledError(
-            "Poppler is required for PDF conversion. "
-            "Install it on Windows by:\n"
-            "1. Download from: https://github.com/oschwartz10612/poppler-windows/releases/\n"
-            "2. Extract and add the 'bin' folder to your PATH environment variable\n"
-            "3. Or install via conda: conda install -c conda-forge poppler"
+        raise _poppler_missing()
+
+
+async def pdf_page_count(pdf_bytes: bytes) -> int:
+    from pdf2image import pdfinfo_from_bytes
+    from pdf2image.exceptions import PDFInfoNotInstalledError
+
+    try:
+        info = await asyncio.to_thread(pdfinfo_from_bytes, pdf_bytes)
+    except PDFInfoNotInstalledError:
+        raise _poppler_missing()
+    return int(info.get("Pages", 0))
+
+
+async def render_pdf_pages(pdf_bytes: bytes, first_page: int, last_page: int, output_folder: str) -> List[str]:
+    """Render a page range straight to PNG files and return their paths in page order.
+
+    Poppler already produces PNG, so the files can be stored as-is without decoding them.
+    """
+    from pdf2image import convert_from_bytes
+    from pdf2image.exceptions import PDFInfoNotInstalledError
+
+    try:
+        paths = await asyncio.to_thread(
+            convert_from_bytes,
+            pdf_bytes,
+            dpi=300,
+            fmt="png",
+            output_folder=output_folder,
+            first_page=first_page,
+            last_page=last_page,
+            paths_only=True,
         )
+    except PDFInfoNotInstalledError:
+        raise _poppler_missing()
+    return sorted(paths)
+
+
+def _poppler_missing() -> PopplerNotInstalledError:
+    return PopplerNotInstalledError(
+        "Poppler is required for PDF conversion. "
+        "Install it on Windows by:\n"
+        "1. Download from: https://github.com/oschwartz10612/poppler-windows/releases/\n"
+        "2. Extract and add the 'bin' folder to your PATH environment variable\n"
+        "3. Or install via conda: conda install -c conda-forge poppler"
+    )
 
 
 def image_bytes_to_base64(image_bytes: bytes) -> str:
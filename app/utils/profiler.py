@@ -0,0 +1,104 @@
+"""Profilers for on-demand diagnostics of single requests and stage calls.
+
+* ``cprofile`` - deterministic ``cProfile`` of the calling thread, saved in the binary format
+  ``pstats.Stats`` and snakeviz read. Precise call counts, but slows the profiled code down and
+  misses work handed to threads (``asyncio.to_thread``).
+* ``sample`` - a background thread snapshots every thread's stack at a fixed interval and saves
+  the counts as folded stacks (``flamegraph.pl`` / speedscope input). Low overhead and it sees
+  thread-pool work, at the cost of statistical rather than exact numbers.
+
+On an event loop both also record whatever other coroutines ran while the profiler was active.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import marshal
+import sys
+import threading
+from collections import Counter
+
+CPROFILE = "cprofile"
+SAMPLE = "sample"
+PROFILE_MODES = (CPROFILE, SAMPLE)
+
+# cProfile hooks the thread's profile function; only one may be active per thread at a time.
+_cprofile_lock = threading.Lock()
+
+
+class Profiler:
+    extension = ""
+
+    def start(self) -> bool:
+        """Begin profiling; returns False if this profiler cannot run right now."""
+        raise NotImplementedError
+
+    def stop(self) -> bytes:
+        """End profiling and return the serialized profile."""
+        raise NotImplementedError
+
+
+class CProfiler(Profiler):
+    extension = "prof"
+
+    def __init__(self) -> None:
+        self._profile = cProfile.Profile()
+
+    def start(self) -> bool:
+        if not _cprofile_lock.acquire(blocking=False):
+            return False
+        self._profile.enable()
+        return True
+
+    def stop(self) -> bytes:
+        try:
+            self._profile.disable()
+        finally:
+            _cprofile_lock.release()
+        self._profile.create_stats()
+        return marshal.dumps(self._profile.stats)
+
+
+class SamplingProfiler(Profiler):
+    extension = "folded"
+
+    def __init__(self, interval_seconds: float) -> None:
+        self.interval = interval_seconds
+        self._stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> bool:
+        self._thread = threading.Thread(target=self._sample, name="profile-sampler", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self) -> bytes:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        lines = [f"{stack} {count}" for stack, count in self._stacks.most_common()]
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+    def _sample(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self._stacks[";".join(reversed(stack))] += 1
+
+
+def create_profiler(mode: str, sample_interval_seconds: float) -> Profiler:
+    if mode == CPROFILE:
+        return CProfiler()
+    if mode == SAMPLE:
+        return SamplingProfiler(sample_interval_seconds)
+    raise ValueError(f"Unknown profile mode {mode!r}; expected one of {', '.join(PROFILE_MODES)}")
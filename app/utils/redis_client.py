@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from app.config.settings import get_settings
+
+if TYPE_CHECKING:
+    from redis import Redis
+
+
+@lru_cache
+def get_redis_client() -> Redis:
+    """Shared synchronous client; async callers wrap calls in ``asyncio.to_thread``."""
+    from redis import Redis
+
+    settings = get_settings()
+    return Redis.from_url(settings.redis_url, decode_responses=True)
+
+
+@lru_cache
+def get_broker_client() -> Redis | None:
+    """Client for the Celery broker database, or ``None`` when the broker isn't Redis."""
+    settings = get_settings()
+    if not settings.celery_broker_url.startswith(("redis://", "rediss://")):
+        return None
+    from redis import Redis
+
+    return Redis.from_url(settings.celery_broker_url, decode_responses=True)
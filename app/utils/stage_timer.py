@@ -0,0 +1,89 @@
+"""Where a stage call spends its time, collected without threading a timer through every call.
+
+``run_stage`` opens a ``StageTimer`` in a context variable; storage calls, SQL statements and
+the handlers' own byte counts add to whichever timer is current. Outside a stage nothing is
+recorded. The context follows ``asyncio.to_thread`` and SQLAlchemy's greenlet bridge.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@dataclass
+class StageTimer:
+    db_seconds: float = 0.0
+    storage_seconds: float = 0.0
+    bytes_in: int = 0
+    bytes_out: int = 0
+
+    def share(self, parts: int) -> "StageTimer":
+        """Each call's equal part of a timer that covered a batch of ``parts`` calls."""
+        parts = max(parts, 1)
+        return StageTimer(
+            self.db_seconds / parts,
+            self.storage_seconds / parts,
+            self.bytes_in // parts,
+            self.bytes_out // parts,
+        )
+
+
+_current: ContextVar[StageTimer | None] = ContextVar("stage_timer", default=None)
+_instrumented: set[int] = set()
+
+
+@contextmanager
+def timing(timer: StageTimer | None = None) -> Iterator[StageTimer]:
+    timer = timer or StageTimer()
+    token = _current.set(timer)
+    try:
+        yield timer
+    finally:
+        _current.reset(token)
+
+
+def add_bytes(bytes_in: int = 0, bytes_out: int = 0) -> None:
+    timer = _current.get()
+    if timer is not None:
+        timer.bytes_in += bytes_in
+        timer.bytes_out += bytes_out
+
+
+@contextmanager
+def storage_call() -> Iterator[None]:
+    timer = _current.get()
+    if timer is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.storage_seconds += time.perf_counter() - started
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Add the duration of every SQL statement on ``engine`` to the current timer."""
+    if id(engine) in _instrumented:
+        return
+    _instrumented.add(id(engine))
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        if _current.get() is not None:
+            # Statements on one connection run one at a time, so a single slot is enough.
+            conn.info["stage_timer_started"] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        timer = _current.get()
+        started = conn.info.pop("stage_timer_started", None)
+        if timer is not None and started is not None:
+            timer.db_seconds += time.perf_counter() - started
@@ -0,0 +1,67 @@
+"""Compact encodings for page text: zstd for full text, token edit scripts for derived versions.
+
+A delta is the list of non-equal opcodes from ``difflib`` over whitespace-preserving tokens of
+the predecessor, so ``apply_delta(base, make_delta(base, target)) == target`` byte for byte.
+Spellcheck and de-identification typically touch a handful of tokens, which makes the delta a
+few dozen bytes instead of a full copy of the page.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import List
+
+_TOKEN = re.compile(r"(\s+)")
+ZSTD_LEVEL = 6
+
+
+@lru_cache
+def _compressor():
+    import zstandard
+
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+
+
+@lru_cache
+def _decompressor():
+    import zstandard
+
+    return zstandard.ZstdDecompressor()
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN.split(text) if token]
+
+
+def compress(text: str) -> bytes:
+    return _compressor().compress(text.encode("utf-8"))
+
+
+def decompress(blob: bytes) -> str:
+    return _decompressor().decompress(blob).decode("utf-8")
+
+
+def make_delta(base: str, target: str) -> bytes:
+    source = tokenize(base)
+    matcher = SequenceMatcher(None, source, tokenize(target), autojunk=False)
+    ops = [
+        [i1, i2, "".join(matcher.b[j1:j2])]
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != "equal"
+    ]
+    return compress(json.dumps(ops, separators=(",", ":"), ensure_ascii=False))
+
+
+def apply_delta(base: str, delta: bytes) -> str:
+    source = tokenize(base)
+    parts: List[str] = []
+    position = 0
+    for start, end, replacement in json.loads(decompress(delta)):
+        parts.extend(source[position:start])
+        parts.append(replacement)
+        position = end
+    parts.extend(source[position:])
+    return "".join(parts)
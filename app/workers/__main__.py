@@ -0,0 +1,61 @@
+"""Start a Celery worker for one resource class.
+
+    python -m app.workers cpu                      # process + ocr, prefork, one process per core
+    python -m app.workers io                       # text stages, snapshots, compaction, ingest, control
+    python -m app.workers cpu --queues ocr --concurrency 16
+
+Arguments after the known ones are passed to ``celery worker`` unchanged. See
+app.workers.routing for the queues and the sizing model.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from typing import List
+
+from app.workers.routing import CPU, IO, queues_for
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.workers")
+    parser.add_argument("resource_class", choices=[CPU, IO])
+    parser.add_argument("--queues", help="comma-separated stages to consume, default all of the class")
+    parser.add_argument("--concurrency", type=int, help="worker processes (cpu) or threads (io)")
+    parser.add_argument("--loglevel", default="INFO")
+    args, passthrough = parser.parse_known_args(argv)
+
+    if args.resource_class == IO:
+        # Must be set before the settings are first read (the engine is built on import).
+        os.environ.setdefault("DATABASE_NULL_POOL", "true")
+
+    from app.config.settings import get_settings
+    from app.workers.celery_app import celery_app
+
+    settings = get_settings()
+    stages = args.queues.split(",") if args.queues else None
+    try:
+        specs = queues_for(args.resource_class, stages)
+    except ValueError as exc:
+        parser.error(str(exc))
+    name = f"{args.resource_class}-{'-'.join(stages)}" if stages else args.resource_class
+    options = [
+        "worker",
+        f"--loglevel={args.loglevel}",
+        f"--hostname={name}@%h",
+        f"--queues={','.join(spec.name for spec in specs)}",
+        f"--prefetch-multiplier={min(spec.prefetch for spec in specs)}",
+    ]
+    if args.resource_class == CPU:
+        options += [
+            "--pool=prefork",
+            f"--concurrency={args.concurrency or settings.celery_cpu_concurrency or os.cpu_count() or 1}",
+            f"--max-tasks-per-child={settings.celery_cpu_max_tasks_per_child}",
+        ]
+    else:
+        options += ["--pool=threads", f"--concurrency={args.concurrency or settings.celery_io_concurrency}"]
+    celery_app.worker_main([*options, *passthrough])
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import asyncio
+
 from celery import Celery
+from celery.signals import task_prerun, worker_process_shutdown, worker_shutdown
 
 from app.config.settings import get_settings
+from app.workers.routing import CONTROL_QUEUE, task_annotations, task_routes
 
 settings = get_settings()
 
@@ -10,9 +14,97 @@ celery_app = Celery(
     "medical_pipeline",
     broker=settings.celery_broker_url,
     backend=settings.celery_result_backend,
+    include=[
+        "app.workers.tasks.process_document_task",
+        "app.workers.tasks.ocr_task",
+        "app.workers.tasks.spellcheck_task",
+        "app.workers.tasks.deid_task",
+        "app.workers.tasks.resume_task",
+        "app.workers.tasks.snapshot_task",
+        "app.workers.tasks.ingest_task",
+        "app.workers.tasks.log_retention_task",
+        "app.workers.tasks.compact_task",
+        "app.workers.tasks.batch_task",
+        "app.workers.tasks.webhook_task",
+    ],
 )
 
-celery_app.conf.update(task_serializer="json", result_serializer="json", accept_content=["json"])
+celery_app.conf.update(
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],
+    # Priorities are only honoured if workers don't prefetch a backlog of low-priority messages.
+    # Worker entry points (python -m app.workers) set the prefetch of their queues.
+    worker_prefetch_multiplier=1,
+    # One queue per stage, consumed by the worker pool of the stage's resource class (see routing).
+    task_routes=task_routes(),
+    task_annotations=task_annotations(),
+    task_default_queue=CONTROL_QUEUE,
+    broker_transport_options={
+        "priority_steps": list(range(10)),
+        "sep": ":",
+        "queue_order_strategy": "priority",
+        # Late-acked messages return to the queue if unacknowledged this long: above the longest task.
+        "visibility_timeout": settings.celery_visibility_timeout_seconds,
+    },
+    beat_schedule={
+        "resume-stalled-jobs": {
+            "task": "resume_stalled_jobs_task",
+            "schedule": settings.resume_sweep_interval_seconds,
+        },
+        "maintain-log-partitions": {
+            "task": "maintain_log_partitions_task",
+            "schedule": settings.log_maintenance_interval_seconds,
+        },
+        "sweep-page-images": {
+            "task": "sweep_page_images_task",
+            "schedule": settings.page_compaction_interval_seconds,
+        },
+        "deliver-webhooks": {
+            "task": "deliver_webhooks_task",
+            "schedule": settings.webhook_delivery_interval_seconds,
+        },
+    },
+)
 
 celery_app.autodiscover_tasks(["app.workers.tasks"])
 
+
+@task_prerun.connect
+def start_stage_timing_flusher(**_: object) -> None:
+    """Flush buffered timing rows on a timer in every process that runs tasks, even once it idles."""
+    from app.services.stage_timing_service import get_stage_timing_service
+
+    get_stage_timing_service().start_flusher()
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def flush_stage_timings(**_: object) -> None:
+    """Write the timing rows this worker process still buffers (see StageTimingService)."""
+    from app.db.session import engine
+    from app.services.stage_timing_service import get_stage_timing_service
+
+    async def _flush() -> None:
+        try:
+            await get_stage_timing_service().flush()
+        finally:
+            await engine.dispose()
+
+    asyncio.run(_flush())
+
+
+def message_priority(priority: int) -> int:
+    """Map a job priority (0-9, 9 most urgent) to the broker's message priority.
+
+    AMQP brokers treat higher numbers as more urgent; the Redis transport consumes 0 first.
+    """
+    priority = min(max(priority, 0), 9)
+    if settings.celery_broker_url.startswith(("redis://", "rediss://")):
+        return 9 - priority
+    return priority
+
+
+def stage_task_id(stage: str, key: str) -> str:
+    """Deterministic task id so queued work for a job or page can be revoked without bookkeeping."""
+    return f"{stage}:{key}"
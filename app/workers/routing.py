@@ -0,0 +1,122 @@
+"""Queues, task routes and worker pools per pipeline stage.
+
+Every stage has its own queue, and every queue belongs to one resource class:
+
+``cpu``  rasterization (``process``) and ``ocr``: seconds of CPU per call. Prefork pool, one
+         process per core, prefetch 1 so a worker never sits on OCR calls another idle worker
+         could take (and broker priorities still decide what runs next).
+``io``   ``spellcheck``, ``deid``, ``snapshot``, ``compact``, ``ingest`` and the ``control``
+         queue (resume sweeps, partition maintenance, batch flushes, webhooks): mostly waiting on Postgres,
+         Redis and object storage. Thread pool, many slots per process, prefetch 4.
+
+Each resource class runs as its own deployment (``python -m app.workers cpu`` / ``... io``),
+and ``--queues`` narrows a worker to some stages, so OCR or de-identification capacity can be
+added on its own. Stage tasks are acknowledged after they ran: a worker lost mid-task returns its
+message to the queue, which the stages tolerate because every write is conditional or an upsert.
+
+Sizing model
+------------
+With ``λ`` pages/s arriving and ``S_stage`` the mean seconds a page spends in a stage's call
+(``GET /status/{job_id}/timeline`` reports both run and wait times per stage):
+
+* CPU slots needed = ``λ × (S_ocr + S_process / pages per job) / ρ``, with ``ρ ≈ 0.7`` target
+  utilization so queueing delay stays bounded. One slot per physical core; keep Tesseract
+  single-threaded (``OMP_THREAD_LIMIT=1``) so slots don't contend.
+* ``scheduler_max_inflight_pages`` ≈ 1.5 × total OCR slots: enough to keep every slot busy
+  between dispatches, small enough that newly arriving interactive pages overtake a backfill.
+* I/O slots = ``λ / stage_batch_max_pages × S_batch`` per batched stage (Little's law on batches)
+  plus a few for snapshots, compaction and ingest; a batch's ``S`` is dominated by its SQL
+  round trips, so it grows slowly with the batch size.
+* Postgres connections: every CPU process keeps its own pool (``pool_size`` + overflow), while
+  I/O threads open one connection per session (``NullPool``). Keep
+  ``cpu processes × (pool_size + max_overflow) + io slots + API pool`` under ``max_connections``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from app.pipeline.base import (
+    COMPACT_STAGE,
+    DEID_STAGE,
+    INGEST_STAGE,
+    OCR_STAGE,
+    PROCESS_STAGE,
+    SNAPSHOT_STAGE,
+    SPELLCHECK_STAGE,
+)
+
+QUEUE_PREFIX = "pipeline"
+CONTROL_QUEUE = f"{QUEUE_PREFIX}.control"
+
+CPU = "cpu"
+IO = "io"
+
+
+@dataclass(frozen=True)
+class QueueSpec:
+    name: str
+    resource_class: str
+    # Prefetch multiplier; a worker consuming several queues uses the smallest of theirs.
+    prefetch: int
+    acks_late: bool
+    tasks: Tuple[str, ...]
+
+
+def _stage_queue(stage: str, resource_class: str, prefetch: int, *tasks: str) -> QueueSpec:
+    return QueueSpec(f"{QUEUE_PREFIX}.{stage}", resource_class, prefetch, True, tasks)
+
+
+QUEUES: Dict[str, QueueSpec] = {
+    spec.name: spec
+    for spec in (
+        _stage_queue(PROCESS_STAGE, CPU, 1, "process_job_task"),
+        _stage_queue(OCR_STAGE, CPU, 1, "ocr_task"),
+        _stage_queue(SPELLCHECK_STAGE, IO, 4, "spellcheck_task", "spellcheck_batch_task"),
+        _stage_queue(DEID_STAGE, IO, 4, "deid_task", "deid_batch_task"),
+        _stage_queue(SNAPSHOT_STAGE, IO, 4, "snapshot_result_task"),
+        _stage_queue(COMPACT_STAGE, IO, 1, "compact_pages_task"),
+        _stage_queue(INGEST_STAGE, IO, 1, "ingest_archive_task"),
+        # Periodic and bookkeeping tasks; anything not routed elsewhere lands here too.
+        QueueSpec(
+            CONTROL_QUEUE,
+            IO,
+            4,
+            False,
+            (
+                "resume_stalled_jobs_task",
+                "maintain_log_partitions_task",
+                "sweep_page_images_task",
+                "flush_stage_batches_task",
+                "deliver_webhooks_task",
+            ),
+        ),
+    )
+}
+
+
+def task_routes() -> Dict[str, dict]:
+    return {task: {"queue": spec.name} for spec in QUEUES.values() for task in spec.tasks}
+
+
+def task_annotations() -> Dict[str, dict]:
+    """Late acknowledgement for the stage tasks, so a lost worker's message is redelivered."""
+    return {
+        task: {"acks_late": True, "reject_on_worker_lost": True}
+        for spec in QUEUES.values()
+        if spec.acks_late
+        for task in spec.tasks
+    }
+
+
+def queues_for(resource_class: str, stages: List[str] | None = None) -> List[QueueSpec]:
+    """The resource class's queues, optionally narrowed to some stages (``ocr``, ``deid``, ``control``...)."""
+    specs = [spec for spec in QUEUES.values() if spec.resource_class == resource_class]
+    if stages:
+        wanted = {f"{QUEUE_PREFIX}.{stage}" for stage in stages}
+        unknown = wanted - {spec.name for spec in specs}
+        if unknown:
+            raise ValueError(f"Not {resource_class} queues: {', '.join(sorted(unknown))}")
+        specs = [spec for spec in specs if spec.name in wanted]
+    return specs
@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+import asyncio
+
+from app.services.batching_service import FLUSH_TASK, get_stage_batching_service
+from app.workers.celery_app import celery_app
+
+
+@celery_app.task(name=FLUSH_TASK)
+def flush_stage_batches_task(stage: str) -> None:
+    asyncio.run(get_stage_batching_service().flush(stage))
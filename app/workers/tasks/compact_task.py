@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import asyncio
+
+from app.db.models.job import DEFAULT_PRIORITY
+from app.db.session import engine
+from app.pipeline.base import COMPACT_STAGE, StageCall
+from app.pipeline.executors import get_celery_executor
+from app.services.page_lifecycle_service import get_page_lifecycle_service
+from app.workers.celery_app import celery_app
+
+
+@celery_app.task(name="compact_pages_task")
+def compact_pages_task(
+    job_id: str,
+    priority: int = DEFAULT_PRIORITY,
+    enqueued_at: float | None = None,
+    profile: str | None = None,
+) -> None:
+    get_celery_executor().run(
+        StageCall(COMPACT_STAGE, job_id, job_id=job_id, priority=priority, enqueued_at=enqueued_at, profile=profile)
+    )
+
+
+@celery_app.task(name="sweep_page_images_task")
+def sweep_page_images_task() -> None:
+    asyncio.run(_sweep())
+
+
+async def _sweep() -> None:
+    try:
+        await get_page_lifecycle_service().sweep()
+    finally:
+        await engine.dispose()
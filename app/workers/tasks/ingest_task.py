@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from app.db.models.job import DEFAULT_PRIORITY
+from app.pipeline.base import INGEST_STAGE, StageCall
+from app.pipeline.executors import get_celery_executor
+from app.workers.celery_app import celery_app
+
+
+@celery_app.task(name="ingest_archive_task")
+def ingest_archive_task(
+    batch_id: str,
+    priority: int = DEFAULT_PRIORITY,
+    enqueued_at: float | None = None,
+) -> None:
+    get_celery_executor().run(StageCall(INGEST_STAGE, batch_id, priority=priority, enqueued_at=enqueued_at))
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+import asyncio
+
+from app.db.session import engine
+from app.services.log_retention_service import get_log_retention_service
+from app.workers.celery_app import celery_app
+
+
+@celery_app.task(name="maintain_log_partitions_task")
+def maintain_log_partitions_task() -> None:
+    asyncio.run(_maintain())
+
+
+async def _maintain() -> None:
+    try:
+        await get_log_retention_service().maintain()
+    finally:
+        await engine.dispose()
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import asyncio
+
+from app.config.settings import get_settings
+from app.db.session import AsyncSessionLocal, engine
+from app.pipeline.executors import get_celery_executor
+from app.services.ingest_service import get_ingest_service
+from app.services.resume_service import get_resume_planner
+from app.utils.logger import get_logger
+from app.workers.celery_app import celery_app
+
+logger = get_logger(__name__)
+
+
+@celery_app.task(name="resume_stalled_jobs_task")
+def resume_stalled_jobs_task() -> None:
+    asyncio.run(_resume_stalled_jobs())
+
+
+async def _resume_stalled_jobs() -> None:
+    """Re-plan pages of running jobs and ingest batches that have not advanced for a while (lost tasks, redeploys)."""
+    settings = get_settings()
+    executor = get_celery_executor()
+    try:
+        async with AsyncSessionLocal() as session:
+            calls = await get_resume_planner().stalled_calls(session, settings.resume_stale_after_seconds)
+            ingests = await get_ingest_service().unfinished_calls(session, settings.resume_stale_after_seconds)
+        # A page that waits its turn in the scheduler or a batch queue is slow, not lost.
+        waiting = await executor.waiting(calls)
+        calls = [call for call in calls if call.key not in waiting]
+        await executor.submit([*calls, *ingests])
+    finally:
+        await engine.dispose()
+    if calls or ingests:
+        logger.info("resume.sweep.completed", pages=len(calls), ingest_batches=len(ingests))
@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from app.db.models.job import DEFAULT_PRIORITY
+from app.pipeline.base import SNAPSHOT_STAGE, StageCall
+from app.pipeline.executors import get_celery_executor
+from app.workers.celery_app import celery_app
+
+
+@celery_app.task(name="snapshot_result_task")
+def snapshot_result_task(
+    job_id: str,
+    priority: int = DEFAULT_PRIORITY,
+    enqueued_at: float | None = None,
+    profile: str | None = None,
+) -> None:
+    get_celery_executor().run(
+        StageCall(SNAPSHOT_STAGE, job_id, job_id=job_id, priority=priority, enqueued_at=enqueued_at, profile=profile)
+    )
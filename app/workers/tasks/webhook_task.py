@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+import asyncio
+
+from app.db.session import engine
+from app.services.webhook_service import get_webhook_service
+from app.workers.celery_app import celery_app
+
+
+@celery_app.task(name="deliver_webhooks_task")
+def deliver_webhooks_task() -> None:
+    asyncio.run(_deliver())
+
+
+async def _deliver() -> None:
+    try:
+        await get_webhook_service().deliver()
+    finally:
+        await engine.dispose()
@@ -0,0 +1,73 @@
+"""Measure API cold-start time: importing ``main`` and, optionally, running the lifespan.
+
+Every sample runs in a fresh interpreter so module caches don't hide import costs:
+
+    python benchmarks/bench_startup.py --runs 10
+    python benchmarks/bench_startup.py --runs 10 --lifespan   # needs the database reachable
+
+The default budget is set for a single-core container, where importing ``main`` takes 1.1-1.2 s
+(median) and peaks at about 1.35 s. Pass a lower ``--budget`` on faster hosts.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+_PROBE = """
+import asyncio, json, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+ready = imported
+if {lifespan}:
+    async def _boot():
+        async with main.app.router.lifespan_context(main.app):
+            return time.perf_counter()
+    ready = asyncio.run(_boot())
+print(json.dumps({{"import": imported - started, "ready": ready - started}}))
+"""
+
+
+def sample(lifespan: bool) -> dict[str, float]:
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(lifespan=lifespan)],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--lifespan", action="store_true", help="also run startup hooks (schema check, executor)")
+    parser.add_argument("--budget", type=float, default=1.5, help="readiness target in seconds")
+    args = parser.parse_args()
+
+    samples = [sample(args.lifespan) for _ in range(args.runs)]
+    for metric in ("import", "ready"):
+        values = sorted(s[metric] for s in samples)
+        print(
+            f"{metric:>6}: median {statistics.median(values) * 1000:7.1f} ms  "
+            f"min {values[0] * 1000:7.1f} ms  max {values[-1] * 1000:7.1f} ms"
+        )
+
+    ready = statistics.median(s["ready"] for s in samples)
+    if ready > args.budget:
+        print(f"FAIL: median readiness {ready:.3f}s exceeds budget {args.budget:.3f}s")
+        return 1
+    print(f"OK: median readiness {ready:.3f}s within budget {args.budget:.3f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,27 +4,51 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
+from app.api.cache_routes import router as cache_router
 from app.api.document_routes import router as document_router
+from app.api.ingest_routes import router as ingest_router
+from app.api.middleware import ProfilingMiddleware
+from app.api.processing_routes import router as processing_router
 from app.api.result_routes import router as result_router
+from app.api.search_routes import router as search_router
 from app.api.status_routes import router as status_router
 from app.api.upload_routes import router as upload_router
-from app.db.base import Base
+from app.config.settings import get_settings
+from app.db.migrations import check_schema
 from app.db.session import engine
+from app.pipeline.executors import get_executor
+from app.services.cache_service import get_response_cache
+from app.services.progress_feed_service import get_progress_feed
 from app.utils.logger import configure_logging
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     configure_logging()
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    if get_settings().db_schema_check_on_startup:
+        async with engine.connect() as conn:
+            await check_schema(conn)
+    response_cache = get_response_cache()
+    response_cache.start()
+    progress_feed = get_progress_feed()
+    progress_feed.start()
+    executor = get_executor()
+    await executor.start()
     yield
+    await executor.shutdown()
+    await progress_feed.shutdown()
+    response_cache.shutdown()
 
 
 app = FastAPI(title="Medical Document Pipeline", lifespan=lifespan)
+app.add_middleware(ProfilingMiddleware)
 
 app.include_router(upload_router)
+app.include_router(ingest_router)
 app.include_router(document_router)
+app.include_router(processing_router)
 app.include_router(result_router)
 app.include_router(status_router)
+app.include_router(search_router)
+app.include_router(cache_router)
 
@@ -0,0 +1,105 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 09:00:00.000000
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "jobs",
+        sa.Column("job_id", sa.String(length=36), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("job_id"),
+    )
+    op.create_table(
+        "documents",
+        sa.Column("document_id", sa.String(length=36), nullable=False),
+        sa.Column("job_id", sa.String(length=36), nullable=False),
+        sa.Column("patient_id", sa.String(length=64), nullable=False),
+        sa.Column("hospital_id", sa.String(length=64), nullable=False),
+        sa.Column("doc_type", sa.String(length=64), nullable=False),
+        sa.Column("file_path", sa.String(length=255), nullable=False),
+        sa.Column("original_file_path", sa.String(length=255), nullable=True),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["job_id"], ["jobs.job_id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("document_id"),
+    )
+    op.create_table(
+        "document_pages",
+        sa.Column("page_id", sa.String(length=36), nullable=False),
+        sa.Column("document_id", sa.String(length=36), nullable=False),
+        sa.Column("page_number", sa.Integer(), nullable=False),
+        sa.Column("image_base64", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["document_id"], ["documents.document_id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("page_id"),
+    )
+    op.create_table(
+        "logs",
+        sa.Column("log_id", sa.String(length=36), nullable=False),
+        sa.Column("job_id", sa.String(length=36), nullable=True),
+        sa.Column("document_id", sa.String(length=36), nullable=True),
+        sa.Column("level", sa.String(length=20), nullable=False),
+        sa.Column("message", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["document_id"], ["documents.document_id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["job_id"], ["jobs.job_id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("log_id"),
+    )
+    op.create_table(
+        "ocr_raw_texts",
+        sa.Column("id", sa.String(length=36), nullable=False),
+        sa.Column("page_id", sa.String(length=36), nullable=False),
+        sa.Column("raw_text", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["page_id"], ["document_pages.page_id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("page_id"),
+    )
+    op.create_table(
+        "ocr_spellchecked_texts",
+        sa.Column("id", sa.String(length=36), nullable=False),
+        sa.Column("page_id", sa.String(length=36), nullable=False),
+        sa.Column("spellchecked_text", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["page_id"], ["document_pages.page_id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("page_id"),
+    )
+    op.create_table(
+        "ocr_deidentified_texts",
+        sa.Column("id", sa.String(length=36), nullable=False),
+        sa.Column("page_id", sa.String(length=36), nullable=False),
+        sa.Column("deid_text", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["page_id"], ["document_pages.page_id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("page_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("ocr_deidentified_texts")
+    op.drop_table("ocr_spellchecked_texts")
+    op.drop_table("ocr_raw_texts")
+    op.drop_table("logs")
+    op.drop_table("document_pages")
+    op.drop_table("documents")
+    op.drop_table("jobs")
@@ -0,0 +1,98 @@
+"""pipeline progress columns
+
+Revision ID: 0001a
+Revises: 0001
+Create Date: 2026-10-19 09:30:00.000000
+
+Priority, per-page stages, progress counters and full-text search on top of the baseline schema.
+Databases created by ``create_all`` after these columns were added already have some of them, so
+every change is conditional; existing rows are backfilled from the stage texts they have.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "0001a"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE jobs ADD COLUMN IF NOT EXISTS priority INTEGER NOT NULL DEFAULT 5")
+    op.execute("ALTER TABLE jobs ADD COLUMN IF NOT EXISTS documents_pending INTEGER NOT NULL DEFAULT 0")
+    for column in ("pages_total", "pages_ocr_done", "pages_spellchecked", "pages_done"):
+        op.execute(f"ALTER TABLE documents ADD COLUMN IF NOT EXISTS {column} INTEGER NOT NULL DEFAULT 0")
+    op.execute("ALTER TABLE document_pages ADD COLUMN IF NOT EXISTS stage VARCHAR(20) NOT NULL DEFAULT 'rasterized'")
+    op.execute(
+        "ALTER TABLE ocr_deidentified_texts ADD COLUMN IF NOT EXISTS deid_tsv tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('english', coalesce(deid_text, ''))) STORED"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_documents_hospital_patient_doc_type "
+        "ON documents (hospital_id, patient_id, doc_type)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_document_pages_document_stage ON document_pages (document_id, stage)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_ocr_deidentified_texts_deid_tsv "
+        "ON ocr_deidentified_texts USING gin (deid_tsv)"
+    )
+
+    # Baseline rows: a page's stage is the last text it has, and the counters are counts of pages.
+    op.execute(
+        """
+        UPDATE document_pages p SET stage = CASE
+            WHEN EXISTS (SELECT 1 FROM ocr_deidentified_texts t WHERE t.page_id = p.page_id) THEN 'deidentified'
+            WHEN EXISTS (SELECT 1 FROM ocr_spellchecked_texts t WHERE t.page_id = p.page_id) THEN 'spellchecked'
+            WHEN EXISTS (SELECT 1 FROM ocr_raw_texts t WHERE t.page_id = p.page_id) THEN 'ocr_done'
+            ELSE 'rasterized'
+        END
+        WHERE p.stage = 'rasterized'
+        """
+    )
+    op.execute(
+        """
+        UPDATE documents d SET
+            pages_total = c.total,
+            pages_ocr_done = c.ocr_done,
+            pages_spellchecked = c.spellchecked,
+            pages_done = c.done
+        FROM (
+            SELECT
+                document_id,
+                count(*) AS total,
+                count(*) FILTER (WHERE stage IN ('ocr_done', 'spellchecked', 'deidentified')) AS ocr_done,
+                count(*) FILTER (WHERE stage IN ('spellchecked', 'deidentified')) AS spellchecked,
+                count(*) FILTER (WHERE stage = 'deidentified') AS done
+            FROM document_pages
+            GROUP BY document_id
+        ) c
+        WHERE d.document_id = c.document_id AND d.pages_total = 0
+        """
+    )
+    op.execute(
+        """
+        UPDATE jobs j SET documents_pending = c.pending
+        FROM (
+            SELECT job_id, count(*) FILTER (WHERE status NOT IN ('completed', 'cancelled')) AS pending
+            FROM documents
+            GROUP BY job_id
+        ) c
+        WHERE j.job_id = c.job_id AND j.documents_pending = 0
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_ocr_deidentified_texts_deid_tsv", table_name="ocr_deidentified_texts")
+    op.drop_index("ix_document_pages_document_stage", table_name="document_pages")
+    op.drop_index("ix_documents_hospital_patient_doc_type", table_name="documents")
+    op.drop_column("ocr_deidentified_texts", "deid_tsv")
+    op.drop_column("document_pages", "stage")
+    for column in ("pages_done", "pages_spellchecked", "pages_ocr_done", "pages_total"):
+        op.drop_column("documents", column)
+    op.drop_column("jobs", "documents_pending")
+    op.drop_column("jobs", "priority")
@@ -0,0 +1,56 @@
+"""compact text storage
+
+Revision ID: 0002
+Revises: 0001a
+Create Date: 2026-10-19 10:00:00.000000
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0002"
+down_revision = "0001a"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.alter_column("ocr_raw_texts", "raw_text", existing_type=sa.Text(), nullable=True)
+    op.add_column("ocr_raw_texts", sa.Column("raw_text_zstd", sa.LargeBinary(), nullable=True))
+    op.alter_column("ocr_spellchecked_texts", "spellchecked_text", existing_type=sa.Text(), nullable=True)
+    op.add_column("ocr_spellchecked_texts", sa.Column("spellchecked_delta", sa.LargeBinary(), nullable=True))
+    op.alter_column("ocr_deidentified_texts", "deid_text", existing_type=sa.Text(), nullable=True)
+    op.add_column("ocr_deidentified_texts", sa.Column("deid_delta", sa.LargeBinary(), nullable=True))
+    # Keep the existing vectors but stop deriving them from deid_text, which compact rows leave empty.
+    op.execute("ALTER TABLE ocr_deidentified_texts ALTER COLUMN deid_tsv DROP EXPRESSION")
+
+
+def downgrade() -> None:
+    # Compact rows cannot be expanded in SQL; rewrite them in plain mode before downgrading.
+    op.drop_index("ix_ocr_deidentified_texts_deid_tsv", table_name="ocr_deidentified_texts")
+    op.drop_column("ocr_deidentified_texts", "deid_tsv")
+    op.add_column(
+        "ocr_deidentified_texts",
+        sa.Column(
+            "deid_tsv",
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('english', coalesce(deid_text, ''))", persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_ocr_deidentified_texts_deid_tsv",
+        "ocr_deidentified_texts",
+        ["deid_tsv"],
+        unique=False,
+        postgresql_using="gin",
+    )
+    op.drop_column("ocr_deidentified_texts", "deid_delta")
+    op.alter_column("ocr_deidentified_texts", "deid_text", existing_type=sa.Text(), nullable=False)
+    op.drop_column("ocr_spellchecked_texts", "spellchecked_delta")
+    op.alter_column("ocr_spellchecked_texts", "spellchecked_text", existing_type=sa.Text(), nullable=False)
+    op.drop_column("ocr_raw_texts", "raw_text_zstd")
+    op.alter_column("ocr_raw_texts", "raw_text", existing_type=sa.Text(), nullable=False)
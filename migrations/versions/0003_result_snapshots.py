@@ -0,0 +1,24 @@
+"""result snapshots
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 11:00:00.000000
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("jobs", sa.Column("result_etag", sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("jobs", "result_etag")
@@ -0,0 +1,46 @@
+"""page screening
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 12:00:00.000000
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("document_pages", sa.Column("ink_coverage", sa.Float(), nullable=True))
+    op.add_column("document_pages", sa.Column("phash", sa.BigInteger(), nullable=True))
+    op.add_column("document_pages", sa.Column("skip_reason", sa.String(length=16), nullable=True))
+    op.add_column("document_pages", sa.Column("duplicate_of", sa.String(length=36), nullable=True))
+    op.create_foreign_key(
+        "fk_document_pages_duplicate_of",
+        "document_pages",
+        "document_pages",
+        ["duplicate_of"],
+        ["page_id"],
+        ondelete="SET NULL",
+    )
+    op.create_index(
+        "ix_document_pages_duplicate_of",
+        "document_pages",
+        ["duplicate_of"],
+        postgresql_where=sa.text("duplicate_of IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_document_pages_duplicate_of", table_name="document_pages")
+    op.drop_constraint("fk_document_pages_duplicate_of", "document_pages", type_="foreignkey")
+    op.drop_column("document_pages", "duplicate_of")
+    op.drop_column("document_pages", "skip_reason")
+    op.drop_column("document_pages", "phash")
+    op.drop_column("document_pages", "ink_coverage")
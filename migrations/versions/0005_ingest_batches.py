@@ -0,0 +1,55 @@
+"""ingest batches
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 13:00:00.000000
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ingest_batches",
+        sa.Column("batch_id", sa.String(length=36), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("archive_path", sa.String(length=255), nullable=False),
+        sa.Column("manifest_path", sa.String(length=255), nullable=True),
+        sa.Column("priority", sa.Integer(), nullable=False),
+        sa.Column("auto_start", sa.Boolean(), nullable=False),
+        sa.Column("rows_total", sa.Integer(), nullable=False),
+        sa.Column("rows_done", sa.Integer(), nullable=False),
+        sa.Column("documents_ingested", sa.Integer(), nullable=False),
+        sa.Column("documents_failed", sa.Integer(), nullable=False),
+        sa.Column("jobs_created", sa.Integer(), nullable=False),
+        sa.Column("errors", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("batch_id"),
+    )
+    op.add_column("jobs", sa.Column("batch_id", sa.String(length=36), nullable=True))
+    op.create_foreign_key(
+        "fk_jobs_batch_id",
+        "jobs",
+        "ingest_batches",
+        ["batch_id"],
+        ["batch_id"],
+        ondelete="SET NULL",
+    )
+    op.create_index("ix_jobs_batch_id", "jobs", ["batch_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_jobs_batch_id", table_name="jobs")
+    op.drop_constraint("fk_jobs_batch_id", "jobs", type_="foreignkey")
+    op.drop_column("jobs", "batch_id")
+    op.drop_table("ingest_batches")
@@ -0,0 +1,24 @@
+"""job profile mode
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 14:00:00.000000
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("jobs", sa.Column("profile_mode", sa.String(length=16), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("jobs", "profile_mode")
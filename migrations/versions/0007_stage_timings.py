@@ -0,0 +1,43 @@
+"""stage timings
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 15:00:00.000000
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stage_timings",
+        sa.Column("timing_id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("job_id", sa.String(length=36), nullable=False),
+        sa.Column("page_id", sa.String(length=36), nullable=True),
+        sa.Column("stage", sa.String(length=16), nullable=False),
+        sa.Column("outcome", sa.String(length=16), nullable=False),
+        sa.Column("worker", sa.String(length=64), nullable=False),
+        sa.Column("enqueued_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("db_ms", sa.Float(), nullable=False),
+        sa.Column("storage_ms", sa.Float(), nullable=False),
+        sa.Column("bytes_in", sa.BigInteger(), nullable=False),
+        sa.Column("bytes_out", sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(["job_id"], ["jobs.job_id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("timing_id"),
+    )
+    op.create_index("ix_stage_timings_job_stage", "stage_timings", ["job_id", "stage"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_stage_timings_job_stage", table_name="stage_timings")
+    op.drop_table("stage_timings")
@@ -0,0 +1,94 @@
+"""partitioned logs
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 16:00:00.000000
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+# Daily partitions named logs_pYYYYMMDD with UTC bounds; LogRetentionService keeps them ahead
+# of time and drops expired ones. Rows outside every partition land in logs_default.
+_CREATE_PARTITIONS = """
+DO $$
+DECLARE
+    first_day date := COALESCE(
+        (SELECT min(created_at AT TIME ZONE 'UTC')::date FROM logs_unpartitioned),
+        (now() AT TIME ZONE 'UTC')::date
+    );
+    day date;
+BEGIN
+    FOR day IN SELECT generate_series(first_day, (now() AT TIME ZONE 'UTC')::date + 7, interval '1 day')::date LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF logs FOR VALUES FROM (%L) TO (%L)',
+            'logs_p' || to_char(day, 'YYYYMMDD'),
+            day::timestamp AT TIME ZONE 'UTC',
+            (day + 1)::timestamp AT TIME ZONE 'UTC'
+        );
+    END LOOP;
+END $$
+"""
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE logs RENAME TO logs_unpartitioned")
+    op.execute("ALTER TABLE logs_unpartitioned RENAME CONSTRAINT logs_pkey TO logs_unpartitioned_pkey")
+    op.execute(
+        """
+        CREATE TABLE logs (
+            log_id VARCHAR(36) NOT NULL,
+            job_id VARCHAR(36),
+            document_id VARCHAR(36),
+            level VARCHAR(20) NOT NULL,
+            message TEXT NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            PRIMARY KEY (log_id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute("CREATE TABLE logs_default PARTITION OF logs DEFAULT")
+    op.execute(_CREATE_PARTITIONS)
+    op.execute(
+        """
+        INSERT INTO logs (log_id, job_id, document_id, level, message, created_at)
+        SELECT log_id, job_id, document_id, level, message, COALESCE(created_at, now())
+        FROM logs_unpartitioned
+        """
+    )
+    op.execute("DROP TABLE logs_unpartitioned")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE logs RENAME TO logs_partitioned")
+    op.execute(
+        """
+        CREATE TABLE logs (
+            log_id VARCHAR(36) NOT NULL,
+            job_id VARCHAR(36) REFERENCES jobs (job_id) ON DELETE CASCADE,
+            document_id VARCHAR(36) REFERENCES documents (document_id) ON DELETE CASCADE,
+            level VARCHAR(20) NOT NULL,
+            message TEXT NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            CONSTRAINT logs_unpartitioned_pkey PRIMARY KEY (log_id)
+        )
+        """
+    )
+    # Jobs and documents may have been deleted without cascading into the partitions.
+    op.execute(
+        """
+        INSERT INTO logs (log_id, job_id, document_id, level, message, created_at)
+        SELECT log_id, job_id, document_id, level, message, created_at
+        FROM logs_partitioned p
+        WHERE (p.job_id IS NULL OR EXISTS (SELECT 1 FROM jobs j WHERE j.job_id = p.job_id))
+          AND (p.document_id IS NULL OR EXISTS (SELECT 1 FROM documents d WHERE d.document_id = p.document_id))
+        """
+    )
+    op.execute("DROP TABLE logs_partitioned CASCADE")
+    op.execute("ALTER TABLE logs RENAME CONSTRAINT logs_unpartitioned_pkey TO logs_pkey")
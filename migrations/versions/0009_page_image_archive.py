@@ -0,0 +1,32 @@
+"""page image archive
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 18:00:00.000000
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("document_pages", sa.Column("image_path", sa.String(length=255), nullable=True))
+    op.create_index(
+        "ix_document_pages_image_inline",
+        "document_pages",
+        ["document_id"],
+        postgresql_where=sa.text("image_base64 IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    # Pages compacted by then only exist in object storage: rehydrate their documents first.
+    op.drop_index("ix_document_pages_image_inline", table_name="document_pages")
+    op.drop_column("document_pages", "image_path")
@@ -0,0 +1,92 @@
+"""Local receiver for completion webhooks, to try callbacks without the real integration.
+
+Prints every job event it receives, once per ``delivery_id``:
+
+    python scripts/webhook_receiver.py --port 9100
+    python scripts/webhook_receiver.py --port 9100 --secret "$WEBHOOK_SIGNING_SECRET" --fail-rate 0.3
+
+and register it for a job with ``POST /upload?...&callback_url=http://localhost:9100/hooks`` or
+``POST /process/{job_id} {"callback_url": "http://localhost:9100/hooks"}``. ``--fail-rate`` answers
+that share of batches with a 503, ``--delay`` holds every response, to watch retries and timeouts.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SIGNATURE_HEADER = "X-Webhook-Signature"
+
+
+def make_handler(args: argparse.Namespace) -> type[BaseHTTPRequestHandler]:
+    seen: set[int] = set()
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if args.secret:
+                expected = "sha256=" + hmac.new(args.secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+                if not hmac.compare_digest(expected, self.headers.get(SIGNATURE_HEADER, "")):
+                    self._reply(401, "bad signature")
+                    return
+            if args.delay:
+                time.sleep(args.delay)
+            if random.random() < args.fail_rate:
+                self._reply(503, "simulated failure")
+                return
+
+            events = json.loads(body)["events"]
+            with lock:
+                fresh = [event for event in events if event["delivery_id"] not in seen]
+                seen.update(event["delivery_id"] for event in fresh)
+            for event in fresh:
+                print(json.dumps(event), flush=True)
+            print(
+                f"# {self.path}: batch of {len(events)}, {len(events) - len(fresh)} repeated",
+                file=sys.stderr,
+                flush=True,
+            )
+            self._reply(204)
+
+        def _reply(self, status: int, message: str = "") -> None:
+            self.send_response(status)
+            self.end_headers()
+            if message:
+                print(f"# {self.path}: {status} {message}", file=sys.stderr, flush=True)
+
+        def log_message(self, format: str, *log_args: object) -> None:
+            pass
+
+    return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--secret", default=os.environ.get("WEBHOOK_SIGNING_SECRET"), help="verify signatures")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of batches answered with 503")
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds to hold every response")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args))
+    print(f"# listening on http://{args.host}:{args.port}/", file=sys.stderr, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import asyncio
+from io import BytesIO
+
+from PIL import Image, ImageDraw
+
+from app.services.page_screening_service import DuplicateIndex, PageScreeningService
+from app.utils.page_fingerprint import fingerprint
+
+PATIENT = ("hospital-1", "patient-1")
+
+
+def _lab_report(results: list[str]) -> bytes:
+    image = Image.new("L", (1240, 1754), 255)
+    draw = ImageDraw.Draw(image)
+    draw.text((100, 80), "CLINICAL LABORATORY REPORT", fill=0)
+    for row, (name, value) in enumerate(zip(["Hemoglobin", "Glucose", "Creatinine"], results)):
+        draw.text((100, 200 + row * 40), name, fill=0)
+        draw.text((600, 200 + row * 40), value, fill=0)
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _find(index: DuplicateIndex, patient: tuple[str, str], image: bytes) -> str | None:
+    # Every original here has a known digest, so no database access happens.
+    return asyncio.run(PageScreeningService().find_duplicate(None, index, patient, fingerprint(image)))
+
+
+def _index(image: bytes) -> DuplicateIndex:
+    fp = fingerprint(image)
+    index = DuplicateIndex()
+    index.add(PATIENT, "original", fp.phash, fp.digest)
+    return index
+
+
+def test_pages_differing_in_a_few_digits_are_not_duplicates():
+    first = _lab_report(["12.5", "88.1", "0.9"])
+    second = _lab_report(["47.9", "88.1", "0.9"])
+
+    assert fingerprint(first).digest != fingerprint(second).digest
+    assert _find(_index(first), PATIENT, second) is None
+
+
+def test_identical_page_of_the_same_patient_is_a_duplicate():
+    page = _lab_report(["12.5", "88.1", "0.9"])
+
+    assert _find(_index(page), PATIENT, page) == "original"
+
+
+def test_identical_page_of_another_patient_is_not_a_duplicate():
+    page = _lab_report(["12.5", "88.1", "0.9"])
+
+    assert _find(_index(page), ("hospital-1", "patient-2"), page) is None